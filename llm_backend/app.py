@@ -1,45 +1,33 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
 from flask_cors import CORS, cross_origin
 import os
 import json
 import uuid
-from service.resume_parser import extract_text
-from service.interview_session import start_interview_session, handle_interview_session
-from service.ai_model import generate_final_report
+import time
+from service.resume_cache import get_resume_cache, content_digest
+from service.ingest_queue import submit_resume, wait_for_resume, STATUS_PROCESSING, STATUS_FAILED
+from service.interview_session import start_interview_session, handle_interview_session, stream_interview_session
+from service.session_store import get_store, reset_round_trips, round_trips
+from service import codec
+from service.llm_provider import get_llm_router
+from service.metrics import snapshot, span, set_endpoint, observe_request, render_prometheus
+from service.question_cache import get_question_cache
+from service.question_bank import load_bank
+from service.warmup import start_warmup, readiness
+from service.report_store import init_report_store, load_report
+from service.report_jobs import submit_report, report_status, wait_for_report
+from service.report_jobs import STATUS_PENDING as REPORT_PENDING, STATUS_READY as REPORT_READY
+from service.report_jobs import STATUS_FAILED as REPORT_FAILED, STATUS_MISSING as REPORT_MISSING
+from config import Config
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SimpleRedis:
-    def __init__(self): 
-        self.data = {}
-    def get(self, key): return self.data.get(key)
-    def set(self, key, value, ex=None): 
-        self.data[key] = value
-        return True
-    def delete(self, key): 
-        self.data.pop(key, None)
-        return True
-    def expire(self, key, seconds): return True
-    def ping(self): return True
-    def hset(self, key, field, value):
-        if key not in self.data: self.data[key] = {}
-        self.data[key][field] = value
-        return 1
-    def hgetall(self, key): return self.data.get(key, {})
-
-# Redis setup
-try:
-    if os.getenv('UPSTASH_REDIS_REST_URL'):
-        from upstash_redis import Redis
-        r = Redis(url=os.getenv('UPSTASH_REDIS_REST_URL'), token=os.getenv('UPSTASH_REDIS_REST_TOKEN'))
-    else:
-        r = SimpleRedis()
-except:
-    r = SimpleRedis()
-
 app = Flask(__name__)
+app.config.from_object(Config)
+# Reports are written behind to SQL; the engine connects on first use
+init_report_store(app)
 
 # 🔥 NUCLEAR CORS - Fix ALL preflight issues
 @app.before_request
@@ -50,19 +38,62 @@ def handle_preflight():
         response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
         return response, 200
+    reset_round_trips()
+    set_endpoint(request.endpoint)
+    g.started = time.perf_counter()
+
+@app.after_request
+def report_round_trips(response):
+    # Store round trips made while serving this request
+    response.headers['X-Store-Round-Trips'] = str(round_trips())
+    logger.debug(f"{request.path}: {round_trips()} store round trips")
+    if 'started' in g:
+        endpoint, started = request.endpoint, g.started
+        if response.is_streamed:
+            # SSE bodies are produced after this hook: time them when the server closes the response
+            response.call_on_close(lambda: observe_request(endpoint, time.perf_counter() - started))
+        else:
+            observe_request(endpoint, time.perf_counter() - started)
+    return response
 
 CORS(app, origins=["*"], supports_credentials=False)
 
 def save_resume_file(file):
-    upload_dir = "uploads/"
-    os.makedirs(upload_dir, exist_ok=True)
-    file_path = os.path.join(upload_dir, file.filename)
-    file.save(file_path)
-    return file_path
+    """Save under a content-addressed name; returns (file_path, sha256)"""
+    with span("file_save"):
+        content = file.read()
+        digest = content_digest(content)
+        upload_dir = "uploads/"
+        os.makedirs(upload_dir, exist_ok=True)
+        file_path = os.path.join(upload_dir, digest + os.path.splitext(file.filename)[1].lower())
+        if not os.path.exists(file_path):
+            with open(file_path, 'wb') as f:
+                f.write(content)
+    return file_path, digest
 
 @app.route('/', methods=['GET'])
 def health():
-    return jsonify({"status": "AI Interviewer LIVE!"})
+    # Liveness: always 200; readiness reported alongside
+    return jsonify({"status": "AI Interviewer LIVE!", **readiness()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint (this worker's counters and histograms)"""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/flask/latency', methods=['GET'])
+def latency_stats():
+    """p50/p95/p99 per endpoint and per stage (this worker only)"""
+    return jsonify({
+        "requests": snapshot("request_seconds"),
+        "stages": snapshot("stage_seconds"),
+    })
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    """503 until background warm-up finished (for load balancer readiness probes)"""
+    state = readiness()
+    return jsonify(state), 200 if state["ready"] else 503
 
 @app.route('/api/flask/upload_resume', methods=['POST', 'OPTIONS'])
 @cross_origin()
@@ -74,25 +105,70 @@ def upload_resume():
     except:
         return jsonify({"error": "Missing file or form data"}), 400
 
-    file_path = save_resume_file(file)
-    resume_text = extract_text(file_path)
+    file_path, digest = save_resume_file(file)
     
     user_id = str(uuid.uuid4())[:8]
-    for field, value in {"name": name, "email": email, "resume_text": resume_text, "resume_path": file_path}.items():
-        r.hset(f"user:{user_id}", field, value)
-    r.expire(f"user:{user_id}", 86400 * 7)
+    # User hash + TTL in one round trip
+    pipe = get_store().pipeline()
+    pipe.hset(f"user:{user_id}", mapping={"name": name, "email": email, "resume_path": file_path, "status": STATUS_PROCESSING})
+    pipe.expire(f"user:{user_id}", 86400 * 7)
+    pipe.execute()
+
+    # Text extraction happens in the ingestion queue
+    status = submit_resume(user_id, file_path, digest)
+
+    return jsonify({"user_id": user_id, "status": status, "message": "Resume uploaded"})
 
-    return jsonify({"user_id": user_id, "message": "Resume uploaded"})
+@app.route('/api/flask/resume_status/<user_id>', methods=['GET', 'OPTIONS'])
+@cross_origin()
+def resume_status(user_id):
+    user_data = get_store().hgetall(f"user:{user_id}")
+    if not user_data:
+        return jsonify({"error": "User not found"}), 404
+    return jsonify({
+        "user_id": user_id,
+        "status": user_data.get('status', 'ready'),
+        "error": user_data.get('error'),
+        "resume_tokens": user_data.get('resume_tokens'),
+        "profile_tokens": user_data.get('profile_tokens'),
+        "question_bank_size": len(load_bank(user_data.get('question_bank')))
+    })
+
+def resume_context(user_data):
+    """Resume context for question prompts: the compact profile, raw text for older records"""
+    if not user_data:
+        return ""
+    return user_data.get('profile') or user_data.get('resume_text', '')
+
+@app.route('/api/flask/resume_cache/stats', methods=['GET'])
+def resume_cache_stats():
+    return jsonify(get_resume_cache().stats())
+
+@app.route('/api/flask/llm/stats', methods=['GET'])
+def llm_stats():
+    """Provider breaker state, OpenAI latency histograms and question-cache hit rate (this worker only)"""
+    return jsonify({
+        "providers": get_llm_router().status(),
+        "latency": snapshot("openai_request_seconds"),
+        "question_cache": get_question_cache().stats(),
+    })
 
 @app.route('/api/flask/start_interview', methods=['POST', 'OPTIONS'])
 @cross_origin()
 def start_interview():
     user_id = request.json.get('user_id')
-    user_data = r.hgetall(f"user:{user_id}")
+    user_data = get_store().hgetall(f"user:{user_id}")
     
     if not user_data:
         return jsonify({"error": "User not found"}), 404
 
+    if user_data.get('status') == STATUS_PROCESSING:
+        user_data = wait_for_resume(user_id, float(os.getenv('INGEST_WAIT_SECONDS', 30)))
+    if user_data.get('status') == STATUS_PROCESSING:
+        return jsonify({"user_id": user_id, "status": STATUS_PROCESSING, "message": "Resume still processing"}), 202
+    if user_data.get('status') == STATUS_FAILED:
+        return jsonify({"error": "Resume could not be processed", "detail": user_data.get('error')}), 422
+
     session_id, first_question = start_interview_session(user_id)
     return jsonify({"session_id": session_id, "first_question": first_question})
 
@@ -107,47 +183,88 @@ def submit_answer(user_id):
     if not session_id or not answer:
         return jsonify({"error": "session_id and answer required"}), 400
 
-    user_data = r.hgetall(f"user:{user_id}")
-    resume_data = user_data.get('resume_text', '') if user_data else ""
+    user_data = get_store().hgetall(f"user:{user_id}")
+    resume_data = resume_context(user_data)
 
-    result = handle_interview_session(session_id, answer, resume_data)
+    result = handle_interview_session(session_id, answer, resume_data, user_data.get('question_bank'))
 
     if result.get("stop"):
-        session_data = r.get(session_id)
-        if session_data:
-            session = json.loads(session_data)
-            final_report_data = generate_final_report(session)
-            report_key = f"report:{user_id}"
-            r.setex(report_key, 86400, json.dumps(final_report_data))
-            r.delete(session_id)
-            
-            return jsonify({
-                "message": "Interview Finished!",
-                "final_report": final_report_data,
-                "user_id": user_id
-            })
+        return jsonify(finish_interview(user_id, session_id))
 
     return jsonify(result)
 
+def finish_interview(user_id, session_id):
+    """Queue the final report; the candidate does not wait for it"""
+    submit_report(user_id, session_id)
+    return {
+        "message": "Interview Finished!",
+        "stop": True,
+        "report_status": REPORT_PENDING,
+        "user_id": user_id
+    }
+
+@app.route('/api/flask/submit_answer_stream/<user_id>', methods=['POST', 'OPTIONS'])
+@cross_origin()
+def submit_answer_stream(user_id):
+    """Same as submit_answer, but streams the next question as server-sent events"""
+    data = request.json
+    session_id = data.get('session_id')
+    answer = data.get('answer')
+
+    if not session_id or not answer:
+        return jsonify({"error": "session_id and answer required"}), 400
+
+    user_data = get_store().hgetall(f"user:{user_id}")
+    resume_data = resume_context(user_data)
+
+    def events():
+        for event, payload in stream_interview_session(session_id, answer, resume_data, user_data.get('question_bank')):
+            if event == "done" and payload.get("stop"):
+                payload = finish_interview(user_id, session_id)
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/flask/get_report/<user_id>', methods=['GET', 'OPTIONS'])
 @cross_origin()
 def get_report(user_id):
-    report_key = f"report:{user_id}"
-    report = r.get(report_key)
-    
-    if not report:
-        return jsonify({"error": "Report not found"}), 404
+    """Report plus status (pending/ready/failed); ?wait=N long-polls up to N seconds while pending"""
+    wait = min(float(request.args.get('wait', 0) or 0), float(os.getenv('REPORT_MAX_WAIT_SECONDS', 30)))
+    if wait > 0:
+        status, report = wait_for_report(user_id, wait)
+    else:
+        status, report = report_status(user_id)
+
+    if status in (REPORT_PENDING, REPORT_FAILED):
+        return jsonify({"user_id": user_id, "status": status}), 202 if status == REPORT_PENDING else 500
+
+    if status == REPORT_MISSING:
+        # Redis copy expired: read through to SQL and re-cache it
+        stored = load_report(user_id)
+        if not stored:
+            return jsonify({"error": "Report not found"}), 404
+        get_store().setex(f"report:{user_id}", 86400, codec.dumps(stored["report"]))
+        return jsonify({
+            "user_id": user_id,
+            "status": REPORT_READY,
+            "name": stored["name"],
+            "email": stored["email"],
+            "report_text": stored["report"]
+        })
     
-    user_data = r.hgetall(f"user:{user_id}")
+    user_data = get_store().hgetall(f"user:{user_id}")
     
     return jsonify({
         "user_id": user_id,
+        "status": REPORT_READY,
         "name": user_data.get('name', 'Unknown'),
         "email": user_data.get('email', 'Unknown'),
-        "report_text": json.loads(report)
+        "report_text": report
     })
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     host = '0.0.0.0'
+    start_warmup()
     app.run(host=host, port=port, debug=False)
@@ -0,0 +1,123 @@
+"""
+Encode/decode time and bytes stored per interview for each session codec.
+
+Builds synthetic interviews (header, one value per turn, one evaluation per
+turn, final report) and encodes every value the way the store holds it.
+Answers are drawn from a fixed vocabulary with a seeded RNG, so they compress
+like prose rather than like repeated strings.
+
+    encode/decode us - total for all values of one interview
+    bytes            - total stored bytes of one interview
+    turn us          - decode of the per-answer read (header + current turn)
+
+Codecs whose packages are not installed are skipped.
+
+    python -m benchmarks.bench_codec --interviews 200 --turns 8
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service import codec  # noqa: E402
+
+VOCABULARY = (
+    "i we built designed the a api service flask redis cache latency request queue worker model "
+    "python react node database index query schema migration test deploy docker kubernetes team "
+    "because then so it was with for to of in on and users data pipeline feature bug fixed "
+    "measured improved reduced throughput memory cpu async thread lock retry timeout error log"
+).split()
+
+
+def make_interview(rng, turns, answer_words):
+    header = {"user_id": f"{rng.getrandbits(32):08x}", "question_no": turns, "max_questions": 8}
+    turn_values, evaluations = [], []
+    for i in range(turns):
+        answer = " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(answer_words // 2, answer_words)))
+        turn_values.append({
+            "question": f"Question {i}: walk me through how you handled {rng.choice(VOCABULARY)} in your last project?",
+            "answer": answer,
+            "timestamp": time.time(),
+        })
+        evaluations.append({
+            "score": rng.randint(3, 10),
+            "feedback": " ".join(rng.choice(VOCABULARY) for _ in range(25)),
+        })
+    report = {
+        "candidate_overview": {"name": "Candidate", "summary": " ".join(rng.choice(VOCABULARY) for _ in range(40))},
+        "overall_performance": {"average_score": 7.5, "performance_level": "Advanced"},
+        "strengths": [rng.choice(VOCABULARY) for _ in range(5)],
+        "final_recommendation": {"decision": "Hire", "justification": " ".join(rng.choice(VOCABULARY) for _ in range(60))},
+    }
+    return [header] + turn_values + evaluations + [report]
+
+
+def legacy_json(values):
+    """Pre-codec format: stdlib json.dumps of every value."""
+    return [json.dumps(v) for v in values]
+
+
+def run(name, interviews, encode, compress_min_bytes):
+    encode_us, decode_us, turn_us, sizes = [], [], [], []
+    for values in interviews:
+        start = time.perf_counter()
+        stored = encode(values)
+        encode_us.append((time.perf_counter() - start) * 1e6)
+        sizes.append(sum(len(v.encode("utf-8")) for v in stored))
+
+        start = time.perf_counter()
+        decoded = [codec.loads(v) for v in stored]
+        decode_us.append((time.perf_counter() - start) * 1e6)
+        assert decoded == values, name
+
+        start = time.perf_counter()
+        codec.loads(stored[0])
+        codec.loads(stored[1])
+        turn_us.append((time.perf_counter() - start) * 1e6)
+    return {
+        "codec": name,
+        "zstd_min_bytes": compress_min_bytes,
+        "encode_us": round(statistics.median(encode_us), 1),
+        "decode_us": round(statistics.median(decode_us), 1),
+        "turn_us": round(statistics.median(turn_us), 2),
+        "bytes": int(statistics.median(sizes)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interviews", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--answer-words", type=int, default=150)
+    parser.add_argument("--zstd-min-bytes", type=int, default=2048)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    interviews = [make_interview(rng, args.turns, args.answer_words) for _ in range(args.interviews)]
+
+    results = [run("legacy json", interviews, legacy_json, 0)]
+    available = [name for name in codec.CODECS
+                 if not (name == "orjson" and codec.orjson is None) and not (name == "msgpack" and codec.msgpack is None)]
+    thresholds = [0] + ([args.zstd_min_bytes] if codec.zstandard is not None else [])
+    for name in available:
+        for threshold in thresholds:
+            encode = lambda values, n=name, t=threshold: [codec.dumps(v, n, t) for v in values]  # noqa: E731
+            results.append(run(name + ("+zstd" if threshold else ""), interviews, encode, threshold))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'codec':<14}{'encode us':>11}{'decode us':>11}{'turn us':>9}{'bytes':>9}"
+          f"   (median per interview, {args.turns} turns, {args.interviews} interviews)")
+    for r in results:
+        print(f"{r['codec']:<14}{r['encode_us']:>11}{r['decode_us']:>11}{r['turn_us']:>9}{r['bytes']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Load test for llama_server.py: throughput with 1, 8 and 32 concurrent
+interview sessions, each sending several question turns.
+
+Start the server first (it loads the GGUF), then:
+
+    python llama_server.py &
+    python -m benchmarks.bench_llama_server --turns 3
+
+Reports generated tokens/sec across all sessions, turn latency p50/p95 and
+time-to-first-chunk p50.
+"""
+import os
+import sys
+import json
+import math
+import time
+import socket
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_prefix_cache import prefix_for, ANSWERS  # noqa: E402
+
+SOCKET_PATH = os.getenv("LLAMA_SERVER_SOCKET", "/tmp/interview-llama.sock")
+
+
+def request(prompt, session_id, max_tokens):
+    """(latency, time to first chunk, generated tokens) for one completion."""
+    start = time.perf_counter()
+    first = None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(SOCKET_PATH)
+        sock.sendall(json.dumps({"prompt": prompt, "session_id": session_id, "max_tokens": max_tokens,
+                                 "temperature": 0.0, "stop": ["</s>", "[/INST]"]}).encode() + b"\n")
+        for line in sock.makefile("rb"):
+            message = json.loads(line)
+            if first is None:
+                first = time.perf_counter()
+            if "error" in message:
+                raise RuntimeError(message["error"])
+            if "done" in message:
+                return time.perf_counter() - start, first - start, message["tokens"]
+    raise RuntimeError("connection closed")
+
+
+def interview(session_no, turns, max_tokens):
+    results = []
+    for turn in range(turns):
+        prompt = f"{prefix_for(session_no % 6)}\n# Candidate's Last Answer:\n{ANSWERS[turn % len(ANSWERS)]} [/INST]"
+        results.append(request(prompt, f"load-{session_no}", max_tokens))
+    return results
+
+
+def run(sessions, turns, max_tokens):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = [r for rs in pool.map(lambda n: interview(n, turns, max_tokens), range(sessions)) for r in rs]
+    elapsed = time.perf_counter() - start
+    latencies = sorted(r[0] for r in results)
+    return {
+        "sessions": sessions,
+        "tokens_per_sec": sum(r[2] for r in results) / elapsed,
+        "turns_per_sec": len(results) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[math.ceil(len(latencies) * 0.95) - 1] * 1000,
+        "ttfc_p50_ms": statistics.median(r[1] for r in results) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--max-tokens", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"{'sessions':>8}{'tokens/s':>10}{'turns/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'TTFC ms':>9}")
+    for sessions in args.sessions:
+        r = run(sessions, args.turns, args.max_tokens)
+        print(f"{r['sessions']:>8}{r['tokens_per_sec']:>10.1f}{r['turns_per_sec']:>9.2f}"
+              f"{r['p50_ms']:>9.0f}{r['p95_ms']:>9.0f}{r['ttfc_p50_ms']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+End-to-end load test: N simulated candidates against one app instance.
+
+Every candidate runs the whole flow over HTTP, all of them concurrently:
+
+    upload_resume -> start_interview -> submit_answer until stop -> get_report?wait=
+
+app.py is served in-process by a threaded werkzeug server on a local port.
+It talks to benchmarks/mock_openai.py (LLM_PROVIDER=openai, OPENAI_BASE_URL)
+with the given latency and token rate, and to the in-memory session store,
+which speaks the same command subset as Redis (--store redis uses REDIS_URL
+instead). Each candidate uploads a different resume, so ingestion really
+runs.
+
+Reported:
+    interviews/s, requests/s      - over the wall time of the load phase
+    p50/p95/p99 per endpoint      - client-side, milliseconds
+    memory per session            - tracemalloc growth per live session, with
+                                    --memory-sessions interviews held open
+                                    after their first answer
+
+--out writes the results with the git commit and the config; --compare
+prints the change against an earlier results file and exits 1 when
+throughput, an endpoint p95 or memory per session regresses by more than
+--tolerance.
+
+    python -m benchmarks.bench_load --candidates 50 --out load.json
+    python -m benchmarks.bench_load --candidates 50 --compare load.json
+"""
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import mock_openai  # noqa: E402
+from benchmarks.sample_resumes import resume_lines, write_pdf  # noqa: E402
+
+ENDPOINTS = ["upload_resume", "start_interview", "submit_answer", "get_report"]
+ANSWERS = [
+    "I built a Flask API with Redis caching for {name}'s team and cut p95 latency by forty percent.",
+    "The hardest bug was a race in our job queue; I reproduced it with a stress test and added a lock.",
+    "I would shard the workers, batch store round trips and put a CDN in front of the static assets.",
+    "We disagreed on SQL versus NoSQL; I benchmarked both on our real workload and we went with data.",
+]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else None
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+        self._lock = threading.Lock()
+
+    def call(self, endpoint, method, *args, **kwargs):
+        start = time.perf_counter()
+        response = method(*args, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.samples[endpoint].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[endpoint] += 1
+        return response
+
+
+def write_candidate_resume(directory, index, pages):
+    """A distinct PDF per candidate, so the resume cache doesn't short-circuit ingestion."""
+    lines = resume_lines(pages)
+    lines[0].insert(0, f"Candidate {index} - candidate{index}@example.com")
+    return write_pdf(os.path.join(directory, f"candidate_{index}.pdf"), lines)
+
+
+def run_candidate(client, base, recorder, index, resume_path, report_wait):
+    name = f"Candidate {index}"
+    with open(resume_path, "rb") as f:
+        response = recorder.call("upload_resume", client.post, f"{base}/api/flask/upload_resume",
+                                 data={"name": name, "email": f"candidate{index}@example.com"},
+                                 files={"resume": (os.path.basename(resume_path), f, "application/pdf")})
+    user_id = response.json()["user_id"]
+
+    for _ in range(10):
+        response = recorder.call("start_interview", client.post, f"{base}/api/flask/start_interview",
+                                 json={"user_id": user_id})
+        if response.status_code != 202:
+            break
+    session_id = response.json()["session_id"]
+
+    for turn in range(20):
+        answer = ANSWERS[(index + turn) % len(ANSWERS)].format(name=name)
+        result = recorder.call("submit_answer", client.post, f"{base}/api/flask/submit_answer/{user_id}",
+                               json={"session_id": session_id, "answer": answer}).json()
+        if result.get("stop") or "error" in result:
+            break
+
+    for _ in range(10):
+        response = recorder.call("get_report", client.get, f"{base}/api/flask/get_report/{user_id}",
+                                 params={"wait": report_wait})
+        if response.status_code != 202:
+            return response.status_code == 200
+    return False
+
+
+def load_phase(base, candidates, pages, report_wait, directory):
+    import httpx
+
+    resumes = [write_candidate_resume(directory, i, pages) for i in range(candidates)]
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=candidates * 2, max_keepalive_connections=candidates * 2)
+    with httpx.Client(timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=candidates) as pool:
+            finished = list(pool.map(lambda i: run_candidate(client, base, recorder, i, resumes[i], report_wait),
+                                     range(candidates)))
+        wall = time.perf_counter() - start
+
+    requests = sum(len(s) for s in recorder.samples.values())
+    return {
+        "wall_seconds": round(wall, 3),
+        "interviews_completed": sum(finished),
+        "interviews_per_second": round(sum(finished) / wall, 3),
+        "requests_per_second": round(requests / wall, 2),
+        "endpoints": {
+            name: {
+                "requests": len(samples),
+                "errors": recorder.errors[name],
+                "p50_ms": round(percentile(samples, 50), 2) if samples else None,
+                "p95_ms": round(percentile(samples, 95), 2) if samples else None,
+                "p99_ms": round(percentile(samples, 99), 2) if samples else None,
+            }
+            for name, samples in recorder.samples.items()
+        },
+    }
+
+
+def memory_phase(app, sessions, directory):
+    """Python heap growth per interview held open after its first answer."""
+    from service.evaluation_pipeline import wait_for_evaluations
+
+    client = app.test_client()
+    with open(write_candidate_resume(directory, "memory", 1), "rb") as f:
+        user_id = client.post("/api/flask/upload_resume", data={"name": "Memory", "email": "memory@example.com",
+                                                                "resume": (f, "memory.pdf")},
+                              content_type="multipart/form-data").get_json()["user_id"]
+    client.post("/api/flask/start_interview", json={"user_id": user_id})  # waits for ingestion
+
+    def open_session(i):
+        client = app.test_client()
+        session_id = client.post("/api/flask/start_interview", json={"user_id": user_id}).get_json()["session_id"]
+        client.post(f"/api/flask/submit_answer/{user_id}",
+                    json={"session_id": session_id, "answer": ANSWERS[i % len(ANSWERS)].format(name="Memory")})
+        return session_id
+
+    with ThreadPoolExecutor(max_workers=min(sessions, 32)) as pool:
+        # Unmeasured round first: thread pools, connections and caches grow once, not per session
+        warm = list(pool.map(open_session, range(min(sessions, 32))))
+        for session_id in warm:
+            wait_for_evaluations(session_id)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        session_ids = list(pool.map(open_session, range(sessions)))
+    for session_id in session_ids:
+        wait_for_evaluations(session_id)
+    gc.collect()
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return int(grown / sessions)
+
+
+def compare(results, baseline, tolerance):
+    """Print deltas against baseline; returns the list of regressions."""
+    if baseline.get("config") != results["config"]:
+        print(f"⚠️  config differs from baseline ({baseline.get('commit')}): {baseline.get('config')}")
+    checks = [("interviews_per_second", results["interviews_per_second"],
+               baseline.get("interviews_per_second"), True),
+              ("memory_per_session_bytes", results["memory_per_session_bytes"],
+               baseline.get("memory_per_session_bytes"), False)]
+    for name in ENDPOINTS:
+        checks.append((f"{name} p95_ms", results["endpoints"][name]["p95_ms"],
+                       baseline.get("endpoints", {}).get(name, {}).get("p95_ms"), False))
+
+    regressions = []
+    print(f"\n{'vs ' + str(baseline.get('commit')):<30}{'baseline':>12}{'now':>12}{'change':>10}")
+    for name, now, before, higher_is_better in checks:
+        if not now or not before:
+            continue
+        change = (now - before) / before
+        worse = -change if higher_is_better else change
+        flag = "  ❌" if worse > tolerance else ""
+        print(f"{name:<30}{before:>12}{now:>12}{change:>+10.1%}{flag}")
+        if worse > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=2, help="resume pages per candidate")
+    parser.add_argument("--latency-ms", type=float, default=300, help="mock OpenAI time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=60, help="mock OpenAI output token rate")
+    parser.add_argument("--store", default="memory", choices=["memory", "redis"])
+    parser.add_argument("--question-bank", action="store_true", help="run with QUESTION_BANK=on")
+    parser.add_argument("--report-wait", type=float, default=30, help="get_report long-poll seconds")
+    parser.add_argument("--memory-sessions", type=int, default=100)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression (fraction)")
+    args = parser.parse_args()
+
+    out = os.path.abspath(args.out) if args.out else None
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    config = {k: getattr(args, k) for k in ("candidates", "pages", "latency_ms", "tokens_per_second",
+                                            "store", "question_bank", "memory_sessions")}
+    workdir = tempfile.mkdtemp(prefix="bench_load_")
+    mock_server, mock = mock_openai.start(0, args.latency_ms, args.tokens_per_second)
+
+    # Must be in place before app (and its lazily built clients) are imported
+    os.environ.update({
+        "LLM_PROVIDER": "openai",
+        "LLM_FALLBACK_PROVIDER": "",
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{mock_server.server_port}/v1",
+        "SESSION_STORE": args.store,
+        "QUESTION_BANK": "on" if args.question_bank else "off",
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'load.db')}",
+        "RESUME_CACHE_PATH": os.path.join(workdir, "resume_cache.sqlite3"),
+        "WARMUP": "eager",
+    })
+    os.chdir(workdir)  # uploads/ lands in the scratch directory
+
+    import logging
+    logging.disable(logging.INFO)
+    from werkzeug.serving import make_server
+    from app import app
+    from service.warmup import start_warmup
+    start_warmup()
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="app", daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    results = {"commit": git_commit(), "config": config}
+    results.update(load_phase(base, args.candidates, args.pages, args.report_wait, workdir))
+    results["memory_per_session_bytes"] = memory_phase(app, args.memory_sessions, workdir)
+    results["llm_requests"] = mock.requests
+    server.shutdown()
+    mock_server.shutdown()
+
+    print(f"{args.candidates} candidates, mock LLM {args.latency_ms:.0f} ms + {args.tokens_per_second:.0f} tok/s, "
+          f"store={args.store}, commit {results['commit']}")
+    print(f"interviews/s {results['interviews_per_second']}   requests/s {results['requests_per_second']}   "
+          f"completed {results['interviews_completed']}/{args.candidates} in {results['wall_seconds']} s")
+    print(f"\n{'endpoint':<18}{'requests':>9}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in results["endpoints"].items():
+        print(f"{name:<18}{row['requests']:>9}{row['errors']:>8}{row['p50_ms']!s:>10}{row['p95_ms']!s:>10}"
+              f"{row['p99_ms']!s:>10}")
+    print(f"\nmemory per session: {results['memory_per_session_bytes'] / 1024:.1f} KiB "
+          f"({args.memory_sessions} live sessions)")
+
+    if out:
+        with open(out, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\nRegressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
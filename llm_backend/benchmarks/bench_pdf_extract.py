@@ -0,0 +1,59 @@
+"""
+PDF extraction: serial vs page-parallel, full vs budgeted.
+
+Generates synthetic 2/5/10/20-page resumes and times extract_text_from_pdf
+in each mode. "budgeted" stops once LLM_CONTEXT_CHARS characters are in hand.
+
+    python -m benchmarks.bench_pdf_extract --workers 4 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sample_resumes import make_resume  # noqa: E402
+from service.resume_parser import extract_text_from_pdf, LLM_CONTEXT_CHARS  # noqa: E402
+
+
+def time_mode(path, workers, budget, repeat):
+    samples = []
+    chars = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chars = len(extract_text_from_pdf(path, workers=workers, budget=budget))
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 5, 10, 20])
+    args = parser.parse_args()
+
+    modes = [
+        ("serial/full", 1, None),
+        ("parallel/full", args.workers, None),
+        ("serial/budget", 1, LLM_CONTEXT_CHARS),
+        ("parallel/budget", args.workers, LLM_CONTEXT_CHARS),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Warm the process pool so its start-up cost is not billed to the first row
+        extract_text_from_pdf(make_resume(tmp, 1), workers=args.workers)
+
+        print(f"{'pages':>5}  {'mode':<16}{'median ms':>10}{'chars':>8}")
+        for pages in args.pages:
+            path = make_resume(tmp, pages)
+            for name, workers, budget in modes:
+                median_ms, chars = time_mode(path, workers, budget, args.repeat)
+                print(f"{pages:>5}  {name:<16}{median_ms:>10.1f}{chars:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Local llama.cpp model: time-to-first-token and tokens/sec with the per-session
+prefix cache on and off.
+
+Interleaves turns from several simulated interviews (different resumes), the
+way concurrent candidates hit one worker. Without the cache each turn has to
+re-evaluate its instructions + resume prefix; with it only the new answer is
+evaluated. Needs the GGUF model (downloaded by llama_models.get_llm).
+
+    python -m benchmarks.bench_prefix_cache --sessions 3 --turns 4
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sample_resumes import resume_lines  # noqa: E402
+from llama_models import generate, forget_session  # noqa: E402
+
+ANSWERS = [
+    "I built the checkout service in Node.js and moved sessions to Redis.",
+    "We cut p95 latency by batching database writes and adding an index.",
+    "I disagreed with a teammate about a schema change and we prototyped both.",
+    "I profile first, then fix the hottest path, then measure again.",
+]
+
+
+def prefix_for(session_no):
+    lines = [line for page in resume_lines(2) for line in page]
+    resume = "\n".join(lines[session_no * 7:session_no * 7 + 60])
+    return f"[INST] You are an expert technical interviewer. Ask ONE hard follow-up question.\n\n# Resume Data:\n{resume}\n"
+
+
+def run(sessions, turns, use_cache, max_tokens):
+    ttft, rates = [], []
+    for turn in range(turns):
+        for session_no in range(sessions):
+            suffix = f"\n# Candidate's Last Answer:\n{ANSWERS[turn % len(ANSWERS)]} [/INST]"
+            start = time.perf_counter()
+            first, count = None, 0
+            for _ in generate(prefix_for(session_no), suffix, session_id=f"bench-{session_no}",
+                              stream=True, use_cache=use_cache, max_tokens=max_tokens, temperature=0.0):
+                count += 1
+                if first is None:
+                    first = time.perf_counter()
+            end = time.perf_counter()
+            if turn > 0:  # first turn pays the prefix either way
+                ttft.append((first - start) * 1000)
+                rates.append(count / (end - start))
+    for session_no in range(sessions):
+        forget_session(f"bench-{session_no}")
+    return statistics.median(ttft), statistics.median(rates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--max-tokens", type=int, default=48)
+    args = parser.parse_args()
+
+    print(f"{'cache':<6}{'TTFT ms (p50)':>15}{'tokens/s (p50)':>16}")
+    for use_cache in (False, True):
+        ttft, rate = run(args.sessions, args.turns, use_cache, args.max_tokens)
+        print(f"{'on' if use_cache else 'off':<6}{ttft:>15.0f}{rate:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+parse_resume12 throughput microbenchmark over the golden corpus.
+
+benchmarks/golden/resume_corpus.json holds resume texts with the structure
+parse_resume12 must produce for them; tests/test_resume_parser.py checks it.
+This script reports resumes parsed per second, and rewrites the expected
+structures after an intended change.
+
+    python -m benchmarks.bench_resume_parser --seconds 3
+    python -m benchmarks.bench_resume_parser --update-golden   # after an intended change
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.resume_parser import parse_resume12  # noqa: E402
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "resume_corpus.json")
+
+
+def load_corpus():
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update(corpus):
+    for case in corpus:
+        case["expected"] = parse_resume12(case["text"])
+    with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+        json.dump(corpus, f, indent=1, ensure_ascii=False)
+    print(f"Rewrote {len(corpus)} golden cases")
+
+
+def throughput(texts, seconds):
+    parsed = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for text in texts:
+            parse_resume12(text)
+        parsed += len(texts)
+    return parsed / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--update-golden", action="store_true")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if args.update_golden:
+        update(corpus)
+        return
+    texts = [case["text"] for case in corpus if "error" not in case["expected"]]
+    print(f"{throughput(texts, args.seconds):,.0f} resumes/sec over {len(texts)} corpus resumes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Per-request latency of each session store backend.
+
+Replays the store traffic of one submit_answer request (read the user hash,
+read the session, write it back with a TTL) and reports latency percentiles.
+The memory backend always runs; redis and upstash run when REDIS_URL /
+UPSTASH_REDIS_REST_URL are set.
+
+    python -m benchmarks.bench_session_store --requests 500
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.session_store import create_store, reset_round_trips, round_trips  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def one_request(store, user_key, session_key, session_blob):
+    store.hgetall(user_key)
+    store.get(session_key)
+    store.set(session_key, session_blob, ex=86400)
+
+
+def run(backend, requests):
+    store = create_store(backend)
+    user_key, session_key = "bench:user", "bench:session"
+    store.hset(user_key, mapping={"name": "Bench", "email": "bench@example.com", "resume_text": "x" * 4000})
+    session_blob = json.dumps({"question_no": 3, "data": [{"question": "q" * 80, "answer": "a" * 600}] * 3})
+
+    for _ in range(min(20, requests)):
+        one_request(store, user_key, session_key, session_blob)
+
+    reset_round_trips()
+    one_request(store, user_key, session_key, session_blob)
+    trips = round_trips()
+
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        one_request(store, user_key, session_key, session_blob)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    store.delete(user_key)
+    store.delete(session_key)
+    return {
+        "backend": backend,
+        "requests": requests,
+        "round_trips": trips,
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    backends = ["memory"]
+    if os.getenv("REDIS_URL"):
+        backends.append("redis")
+    if os.getenv("UPSTASH_REDIS_REST_URL"):
+        backends.append("upstash")
+
+    print(f"{'backend':<10}{'trips':>6}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms per request)")
+    for backend in backends:
+        result = run(backend, args.requests)
+        print(f"{backend:<10}{result['round_trips']:>6}{result['mean_ms']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
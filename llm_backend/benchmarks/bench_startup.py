@@ -0,0 +1,67 @@
+"""
+Cold-start benchmark: fresh interpreter per run, for each WARMUP mode.
+
+    import   - `import app` (nothing should connect or load models here)
+    ready    - import + warm-up until /ready would answer 200
+    first    - first question-generation call after that
+    total    - wall clock of the whole child process, interpreter included
+
+Uses whatever SESSION_STORE / LLM_PROVIDER the environment sets; with
+neither set it measures the in-memory store and the mock provider.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import time, json
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+from service.warmup import start_warmup, readiness
+start_warmup()
+while not readiness()["ready"]:
+    time.sleep(0.002)
+t2 = time.perf_counter()
+from service.llm_model import dynamic_questions_gen_model
+dynamic_questions_gen_model("Skills: Python, Redis", {"data": []}, "I built a Flask API.")
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "ready": t2 - t0, "first": t3 - t2}))
+"""
+
+
+def run_once(mode):
+    env = dict(os.environ, WARMUP=mode)
+    env.setdefault("LLM_PROVIDER", "mock")
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    total = time.perf_counter() - start
+    result = json.loads(out.strip().splitlines()[-1])
+    result["total"] = total
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=["background", "eager", "off"])
+    args = parser.parse_args()
+
+    print(f"{'WARMUP':<12}{'import ms':>10}{'ready ms':>10}{'first ms':>10}{'total ms':>10}   (median of {args.runs})")
+    for mode in args.modes:
+        runs = [run_once(mode) for _ in range(args.runs)]
+        med = {k: statistics.median(r[k] for r in runs) * 1000 for k in ("import", "ready", "first", "total")}
+        print(f"{mode:<12}{med['import']:>10.0f}{med['ready']:>10.0f}{med['first']:>10.1f}{med['total']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Local stand-in for the OpenAI chat completions API, for load tests.
+
+Serves POST /v1/chat/completions (plain and stream=true) with the same
+deterministic answers as the mock LLM provider, picked by recognising which
+prompt the app sent (question, evaluation, question bank, report,
+summary). Latency is modelled as a fixed time to first token plus a
+token rate, so a 150-token question at 50 tokens/s takes latency + 3 s.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any
+OPENAI_API_KEY.
+
+    python -m benchmarks.mock_openai --port 8099 --latency-ms 300 --tokens-per-second 60
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.llm_provider import MockProvider  # noqa: E402
+
+# Phrase in the prompt -> MockProvider kind; first match wins
+PROMPT_KINDS = [
+    ("keeping notes on a job interview", "summary"),
+    ("preparing a professional job interview", "question_bank"),
+    ("HIRE/NO-HIRE", "report"),
+    ("Score this answer", "evaluation"),
+    ("Return ONLY JSON", "question"),
+]
+
+
+def classify(prompt):
+    for phrase, kind in PROMPT_KINDS:
+        if phrase in prompt:
+            return kind
+    return "text"
+
+
+def count_tokens(text):
+    # ~4 characters per token is close enough for pacing
+    return max(1, len(text) // 4)
+
+
+class MockOpenAI:
+    def __init__(self, latency_ms=300, tokens_per_second=60):
+        self.latency = latency_ms / 1000
+        self.tokens_per_second = tokens_per_second
+        self._provider = MockProvider()
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def answer(self, messages):
+        prompt = "".join(m.get("content") or "" for m in messages)
+        with self._lock:
+            self.requests += 1
+        return self._provider._text(prompt, "", classify(prompt)), count_tokens(prompt)
+
+    def token_delay(self, tokens):
+        return tokens / self.tokens_per_second if self.tokens_per_second else 0.0
+
+
+def _handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            text, prompt_tokens = mock.answer(request.get("messages", []))
+            completion_tokens = count_tokens(text)
+            created, model = int(time.time()), request.get("model", "mock")
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            time.sleep(mock.latency)
+
+            if not request.get("stream"):
+                time.sleep(mock.token_delay(completion_tokens))
+                self._send_json(200, {
+                    "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def event(delta, finish_reason=None):
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                         "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+                self._chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+
+            event({"role": "assistant", "content": ""})
+            for word in text.split(" "):
+                time.sleep(mock.token_delay(count_tokens(word + " ")))
+                event({"content": word + " "})
+            event({}, "stop")
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+
+        def _chunk(self, data):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+
+def start(port=0, latency_ms=300, tokens_per_second=60):
+    """Run the mock on a background thread; returns (server, mock). server.server_port is the port."""
+    mock = MockOpenAI(latency_ms, tokens_per_second)
+    server = _Server(("127.0.0.1", port), _handler(mock))
+    threading.Thread(target=server.serve_forever, name="mock-openai", daemon=True).start()
+    return server, mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=60)
+    args = parser.parse_args()
+    server, _ = start(args.port, args.latency_ms, args.tokens_per_second)
+    print(f"Mock OpenAI on http://127.0.0.1:{server.server_port}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
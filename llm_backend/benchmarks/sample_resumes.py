@@ -0,0 +1,78 @@
+"""
+Synthetic multi-page resumes for the benchmarks.
+
+Writes minimal, valid PDFs (Helvetica text only) so the benchmarks need no
+fixture files and no PDF-writing dependency.
+"""
+import os
+
+SECTIONS = [
+    ("Objective", ["Seeking a backend engineering role building reliable, low-latency services."]),
+    ("Education", ["BE Computer Science | 8.5 CGPA | 2021-2025 | ABC Institute of Technology"]),
+    ("Technical Skills", ["Languages: Python, JavaScript, TypeScript, SQL",
+                          "Frameworks: Flask, React, Node.js, Express",
+                          "Tools: Docker, Redis, PostgreSQL, Git"]),
+    ("Projects", ["E-commerce Platform (React, Node.js)",
+                  "- Built a full-stack store with cart, checkout and payments for 2k users.",
+                  "Interview Bot (Flask, OpenAI)",
+                  "- Generated adaptive interview questions from parsed resumes."]),
+    ("Experience", ["Software Intern, Example Labs (2024)",
+                    "- Cut API p95 latency by 40% by batching Redis round trips."]),
+    ("Achievements", ["- Winner, National Hackathon 2023", "- 500+ LeetCode problems solved"]),
+]
+
+LINES_PER_PAGE = 48
+
+
+def resume_lines(pages):
+    """Enough resume-like lines to fill the requested number of pages."""
+    lines = []
+    round_no = 0
+    while len(lines) < pages * LINES_PER_PAGE:
+        for header, body in SECTIONS:
+            lines.append(header if not round_no else f"{header} (cont. {round_no})")
+            lines.extend(body)
+            lines.append("")
+        round_no += 1
+    return [lines[i:i + LINES_PER_PAGE] for i in range(0, pages * LINES_PER_PAGE, LINES_PER_PAGE)]
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """Write one PDF page per list of lines."""
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>",
+               3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    for index, lines in enumerate(pages):
+        page_id, content_id = 4 + index * 2, 5 + index * 2
+        text = " ".join(f"({_escape(line)}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 50 800 Td {text} ET".encode("latin-1")
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>").encode()
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (obj_id, objects[obj_id])
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for obj_id in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+
+    with open(path, "wb") as f:
+        f.write(bytes(out))
+    return path
+
+
+def make_resume(directory, pages):
+    os.makedirs(directory, exist_ok=True)
+    return write_pdf(os.path.join(directory, f"resume_{pages}p.pdf"), resume_lines(pages))
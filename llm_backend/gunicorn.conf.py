@@ -0,0 +1,9 @@
+# Loaded automatically by gunicorn from the working directory; the Procfile
+# flags still apply on top of it.
+
+
+def post_worker_init(worker):
+    # Warm the session store, tokenizer and LLM clients after fork
+    # (threads started in the --preload master would not survive it)
+    from service.warmup import start_warmup
+    start_warmup()
@@ -1,6 +1,10 @@
 # llama_models.py (ROOT LEVEL - next to app.py)
 import os
 import json
+import socket
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
 from huggingface_hub import hf_hub_download
@@ -9,25 +13,42 @@ import logging
 
 logger = logging.getLogger(__name__)
 _model = None
+# llama.cpp contexts are not thread-safe
+_model_lock = threading.RLock()
 
-def get_llm() -> Optional[Llama]:
-    global _model
-    if _model is not None:
-        return _model
-    
-    model_path = "models/mistral-7b-instruct-v0.1.Q4_K_M.gguf"
-    model_repo = "TheBloke/Mistral-7B-Instruct-v0.1-GGUF"
-    
-    if not Path(model_path).exists():
+MODEL_REPO = "TheBloke/Mistral-7B-Instruct-v0.1-GGUF"
+MODEL_FILE = "mistral-7b-instruct-v0.1.Q4_K_M.gguf"
+MODEL_PATH = f"models/{MODEL_FILE}"
+
+# Set to use the shared batching server (llama_server.py) instead of an
+# in-process model
+SERVER_SOCKET = os.getenv("LLAMA_SERVER_SOCKET")
+# Socket timeout for each connect/send/read when the caller gives none
+SERVER_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 20))
+
+# JSON schema -> LlamaGrammar, built once (building parses the whole grammar)
+_grammars = {}
+
+
+def ensure_model() -> str:
+    if not Path(MODEL_PATH).exists():
         print("📥 Downloading Mistral model (4GB, ~15 mins)...")
         os.makedirs("models", exist_ok=True)
         hf_hub_download(
-            repo_id=model_repo,
-            filename="mistral-7b-instruct-v0.1.Q4_K_M.gguf",
+            repo_id=MODEL_REPO,
+            filename=MODEL_FILE,
             local_dir="models",
             local_dir_use_symlinks=False
         )
         print("✅ Model downloaded!")
+    return MODEL_PATH
+
+def get_llm() -> Optional[Llama]:
+    global _model
+    if _model is not None:
+        return _model
+    
+    model_path = ensure_model()
     
     try:
         print("🚀 Loading Mistral model...")
@@ -37,3 +58,146 @@ def get_llm() -> Optional[Llama]:
     except Exception as e:
         print(f"❌ Model error: {e}")
         return None
+
+
+class PrefixStateCache:
+    """
+    LRU of llama.cpp states captured right after a session's prompt prefix
+    (instructions + resume) was evaluated, bounded by total state bytes.
+    Restoring one lets the next turn skip re-evaluating that prefix.
+    """
+
+    def __init__(self, capacity_bytes):
+        self.capacity_bytes = capacity_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._states = OrderedDict()
+
+    def get(self, key):
+        state = self._states.get(key)
+        if state is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._states.move_to_end(key)
+        return state
+
+    def put(self, key, state):
+        if key in self._states:
+            self.size -= self._states.pop(key).llama_state_size
+        self._states[key] = state
+        self.size += state.llama_state_size
+        while self.size > self.capacity_bytes and len(self._states) > 1:
+            _, evicted = self._states.popitem(last=False)
+            self.size -= evicted.llama_state_size
+
+    def forget(self, session_id):
+        for key in [k for k in self._states if k[0] == session_id]:
+            self.size -= self._states.pop(key).llama_state_size
+
+
+_prefix_cache = PrefixStateCache(int(os.getenv("LLAMA_PREFIX_CACHE_MB", 1024)) * 1024 * 1024)
+
+
+def _restore_prefix(llm, session_id, prefix):
+    """Load (or build and remember) the evaluated state of this session's prefix."""
+    key = (session_id, hashlib.sha1(prefix.encode("utf-8")).hexdigest())
+    state = _prefix_cache.get(key)
+    if state is not None:
+        llm.load_state(state)
+        return
+    llm.reset()
+    llm.eval(llm.tokenize(prefix.encode("utf-8"), add_bos=True))
+    _prefix_cache.put(key, llm.save_state())
+
+
+def _server_generate(prompt, session_id, stream, max_tokens=150, temperature=0.3, stop=None, timeout=None,
+                     **kwargs):
+    """
+    Send one completion to llama_server.py; yields text chunks if stream.
+    A server that stays silent for timeout seconds raises LLMError.
+    """
+    timeout = timeout or SERVER_TIMEOUT_SECONDS
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    request = {"prompt": prompt, "session_id": session_id, "max_tokens": max_tokens,
+               "temperature": temperature, "stop": stop or []}
+    try:
+        with sock:
+            sock.connect(SERVER_SOCKET)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as replies:
+                for line in replies:
+                    message = json.loads(line)
+                    if "error" in message:
+                        raise RuntimeError(f"llama server: {message['error']}")
+                    if "done" in message:
+                        if not stream:
+                            yield message["text"]
+                        return
+                    if stream:
+                        yield message["text"]
+    except socket.timeout:
+        from service.llm_provider import LLMError
+        raise LLMError(f"llama server: no reply within {timeout}s") from None
+    raise RuntimeError("llama server closed the connection")
+
+
+def _grammar(json_schema):
+    key = json.dumps(json_schema, sort_keys=True)
+    if key not in _grammars:
+        from llama_cpp import LlamaGrammar
+        _grammars[key] = LlamaGrammar.from_json_schema(key, verbose=False)
+    return _grammars[key]
+
+
+def generate(prefix, suffix, session_id=None, stream=False, use_cache=True, json_schema=None, timeout=None,
+             **kwargs):
+    """
+    Complete prefix + suffix on the local model.
+    With a session_id the evaluated prefix is cached per session, so later
+    turns only evaluate the suffix (llama.cpp reuses the matching tokens).
+    Through llama_server.py the server's slots do the same.
+    json_schema constrains the in-process model's output with a grammar; the
+    batching server samples unconstrained and relies on the tolerant parser.
+    timeout bounds each socket operation to the server; the in-process model
+    is bounded by the caller (llm_provider) instead.
+    """
+    if SERVER_SOCKET:
+        chunks = _server_generate(prefix + suffix, session_id if use_cache else None, stream,
+                                  timeout=timeout, **kwargs)
+        if stream:
+            return ({"choices": [{"text": text}]} for text in chunks)
+        text = next(chunks)
+        chunks.close()
+        return {"choices": [{"text": text}]}
+
+    with _model_lock:
+        llm = get_llm()
+    if llm is None:
+        raise RuntimeError("Local model unavailable")
+    if json_schema:
+        with _model_lock:
+            kwargs["grammar"] = _grammar(json_schema)
+    if stream:
+        return _generate_stream(llm, prefix, suffix, session_id if use_cache else None, **kwargs)
+
+    with _model_lock:
+        if session_id and use_cache:
+            _restore_prefix(llm, session_id, prefix)
+        return llm(prefix + suffix, echo=False, **kwargs)
+
+
+def _generate_stream(llm, prefix, suffix, session_id, **kwargs):
+    # The lock is held until the caller finishes consuming the stream
+    with _model_lock:
+        if session_id:
+            _restore_prefix(llm, session_id, prefix)
+        yield from llm(prefix + suffix, stream=True, echo=False, **kwargs)
+
+
+def forget_session(session_id):
+    """Drop cached prefix states once an interview is over."""
+    with _model_lock:
+        _prefix_cache.forget(session_id)
@@ -0,0 +1,284 @@
+"""
+Local inference server for the llama.cpp model.
+
+One process loads the GGUF (mmap'd, so the page cache holds the weights once
+however many processes map them) and serves every web worker over a unix
+socket. Concurrent prompts are decoded together: each interview gets a slot
+(a KV-cache sequence id) and every llama_decode step carries the pending
+prompt tokens of newly admitted requests plus one sampled token for each
+generating slot (continuous batching). Slots remember their tokens and
+prefer the session that used them last, so a later turn only evaluates the
+part of the prompt after the common prefix.
+
+    python llama_server.py                  # LLAMA_SERVER_SOCKET, default /tmp/interview-llama.sock
+
+Protocol: one JSON request per connection,
+    {"prompt": "...", "session_id": "...", "max_tokens": 150,
+     "temperature": 0.3, "stop": ["</s>"]}
+answered by JSON lines {"text": "..."} and a final
+    {"done": true, "text": <full>, "tokens": <generated>}
+(or {"error": "..."}). max_tokens is capped at half of a slot's share of the
+context (LLAMA_SERVER_CTX / LLAMA_SERVER_SLOTS); the prompt is cut to fit the rest.
+"""
+import os
+import json
+import time
+import codecs
+import queue
+import logging
+import threading
+import socketserver
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SOCKET_PATH = os.getenv("LLAMA_SERVER_SOCKET", "/tmp/interview-llama.sock")
+SLOTS = int(os.getenv("LLAMA_SERVER_SLOTS", 8))
+# KV cache shared by all slots
+N_CTX = int(os.getenv("LLAMA_SERVER_CTX", 16384))
+N_BATCH = int(os.getenv("LLAMA_SERVER_BATCH", 512))
+TOP_K = 40
+
+
+def fit_to_slot(tokens, max_tokens, budget):
+    """
+    (prompt tokens, max_tokens) that fit one slot's share of the KV cache.
+    The completion gets at most half of it; a longer prompt keeps its BOS and
+    its end, where the question being asked is.
+    """
+    max_tokens = max(1, min(max_tokens, budget // 2))
+    if len(tokens) + max_tokens > budget:
+        tokens = tokens[:1] + tokens[-(budget - max_tokens - 1):]
+    return tokens, max_tokens
+
+
+class Request:
+    def __init__(self, payload):
+        self.prompt = payload["prompt"]
+        self.session_id = payload.get("session_id")
+        self.max_tokens = int(payload.get("max_tokens", 150))
+        self.temperature = float(payload.get("temperature", 0.3))
+        self.stop = [s for s in payload.get("stop") or [] if s]
+        self.output = queue.Queue()
+        self.cancelled = False
+
+
+class Slot:
+    def __init__(self, seq_id):
+        self.seq_id = seq_id
+        self.session_id = None
+        self.tokens = []  # tokens already evaluated into this sequence's KV cache
+        self.last_used = 0.0
+        self.request = None
+
+    def start(self, request, prompt_tokens, n_keep):
+        self.request = request
+        self.session_id = request.session_id
+        self.tokens = self.tokens[:n_keep]
+        self.pending = prompt_tokens[n_keep:]
+        self.next_token = None
+        self.generated = 0
+        self.text = ""
+        self.sent = 0
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.logits_index = None
+
+    def finish(self):
+        self.request = None
+        self.last_used = time.monotonic()
+
+
+class BatchScheduler:
+    """Owns the llama context; all decoding happens on its thread."""
+
+    def __init__(self, llm, slots=SLOTS):
+        import llama_cpp
+        self.lib = llama_cpp
+        self.llm = llm
+        self.ctx = llm._ctx.ctx
+        self.n_vocab = llm.n_vocab()
+        self.eos = llm.token_eos()
+        self.slots = [Slot(i) for i in range(slots)]
+        self.batch = llama_cpp.llama_batch_init(N_BATCH, 0, 1)
+        self.queue = queue.Queue()
+        self._waiting = []
+        self.rng = np.random.default_rng()
+
+    def submit(self, request):
+        self.queue.put(request)
+
+    # --- admission -------------------------------------------------------
+
+    def _pick_slot(self, request):
+        idle = [s for s in self.slots if s.request is None]
+        if not idle:
+            return None
+        for slot in idle:
+            if request.session_id and slot.session_id == request.session_id:
+                return slot
+        return min(idle, key=lambda s: s.last_used)
+
+    def _admit(self, block):
+        try:
+            while True:
+                self._waiting.append(self.queue.get(block=block and not self._waiting))
+                block = False
+        except queue.Empty:
+            pass
+        while self._waiting:
+            slot = self._pick_slot(self._waiting[0])
+            if slot is None:
+                return
+            request = self._waiting.pop(0)
+            tokens = self.llm.tokenize(request.prompt.encode("utf-8"), add_bos=True)
+            tokens, request.max_tokens = fit_to_slot(tokens, request.max_tokens, N_CTX // len(self.slots))
+            n_keep = 0
+            for a, b in zip(slot.tokens, tokens[:-1]):  # always evaluate at least one token
+                if a != b:
+                    break
+                n_keep += 1
+            self.lib.llama_kv_cache_seq_rm(self.ctx, slot.seq_id, n_keep, -1)
+            slot.start(request, tokens, n_keep)
+
+    # --- decoding --------------------------------------------------------
+
+    def _add(self, token, pos, seq_id, logits):
+        batch, i = self.batch, self.batch.n_tokens
+        batch.token[i] = token
+        batch.pos[i] = pos
+        batch.n_seq_id[i] = 1
+        batch.seq_id[i][0] = seq_id
+        batch.logits[i] = logits
+        batch.n_tokens += 1
+        return i
+
+    def _fill_batch(self):
+        self.batch.n_tokens = 0
+        active = [s for s in self.slots if s.request is not None]
+        # Generating slots first: one token each keeps their latency flat
+        for slot in active:
+            slot.logits_index = None
+            if slot.next_token is not None:
+                slot.logits_index = self._add(slot.next_token, len(slot.tokens), slot.seq_id, True)
+                slot.tokens.append(slot.next_token)
+                slot.next_token = None
+        for slot in active:
+            room = N_BATCH - self.batch.n_tokens
+            if not slot.pending or room <= 0:
+                continue
+            chunk, slot.pending = slot.pending[:room], slot.pending[room:]
+            for j, token in enumerate(chunk):
+                last = not slot.pending and j == len(chunk) - 1
+                index = self._add(token, len(slot.tokens), slot.seq_id, last)
+                slot.tokens.append(token)
+                if last:
+                    slot.logits_index = index
+        return active
+
+    def _sample(self, index, temperature):
+        logits = np.ctypeslib.as_array(self.lib.llama_get_logits_ith(self.ctx, index), shape=(self.n_vocab,))
+        if temperature <= 0:
+            return int(np.argmax(logits))
+        top = np.argpartition(logits, -TOP_K)[-TOP_K:]
+        scaled = logits[top] / temperature
+        probs = np.exp(scaled - scaled.max())
+        return int(top[self.rng.choice(len(top), p=probs / probs.sum())])
+
+    def _emit(self, slot, final=False):
+        request = slot.request
+        cut = min((slot.text.find(s) for s in request.stop if s in slot.text), default=-1)
+        if cut != -1:
+            slot.text, final = slot.text[:cut], True
+        # Hold back text that might be the start of a stop string
+        hold = 0 if final else max((len(s) - 1 for s in request.stop), default=0)
+        upto = max(slot.sent, len(slot.text) - hold)
+        if upto > slot.sent:
+            request.output.put({"text": slot.text[slot.sent:upto]})
+            slot.sent = upto
+        if final:
+            request.output.put({"done": True, "text": slot.text, "tokens": slot.generated})
+            slot.finish()
+
+    def step(self):
+        active = self._fill_batch()
+        if not active:
+            return
+        if self.lib.llama_decode(self.ctx, self.batch) != 0:
+            for slot in active:
+                slot.request.output.put({"error": "llama_decode failed"})
+                slot.tokens = []
+                self.lib.llama_kv_cache_seq_rm(self.ctx, slot.seq_id, 0, -1)
+                slot.finish()
+            return
+        for slot in active:
+            if slot.request.cancelled:
+                slot.finish()
+                continue
+            if slot.logits_index is None:
+                continue  # prompt still being evaluated
+            token = self._sample(slot.logits_index, slot.request.temperature)
+            slot.generated += 1
+            if token == self.eos:
+                slot.text += slot.decoder.decode(b"", final=True)
+                self._emit(slot, final=True)
+                continue
+            slot.next_token = token
+            slot.text += slot.decoder.decode(self.llm.detokenize([token]))
+            self._emit(slot, final=slot.generated >= slot.request.max_tokens)
+
+    def run(self):
+        while True:
+            busy = any(s.request is not None for s in self.slots)
+            self._admit(block=not busy)
+            self.step()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = Request(json.loads(self.rfile.readline()))
+        except (ValueError, KeyError) as e:
+            self.wfile.write(json.dumps({"error": f"bad request: {e}"}).encode() + b"\n")
+            return
+        self.server.scheduler.submit(request)
+        while True:
+            message = request.output.get()
+            try:
+                self.wfile.write(json.dumps(message).encode() + b"\n")
+            except OSError:
+                request.cancelled = True  # client went away; free the slot
+                return
+            if "done" in message or "error" in message:
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def load_model():
+    from llama_cpp import Llama
+    from llama_models import ensure_model
+    threads = int(os.getenv("LLAMA_THREADS", os.cpu_count() or 4))
+    print(f"🚀 Loading Mistral model for {SLOTS} slots...")
+    llm = Llama(model_path=ensure_model(), n_ctx=N_CTX, n_batch=N_BATCH, n_threads=threads,
+                use_mmap=True, verbose=False)
+    print("✅ Model loaded!")
+    return llm
+
+
+def serve(socket_path=SOCKET_PATH):
+    scheduler = BatchScheduler(load_model())
+    threading.Thread(target=scheduler.run, name="llama-batch", daemon=True).start()
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = _Server(socket_path, _Handler)
+    server.scheduler = scheduler
+    print(f"🧠 llama server listening on {socket_path}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve()
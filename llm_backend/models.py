@@ -1,19 +1,24 @@
 from flask_sqlalchemy import SQLAlchemy
-from datetime import datetime
+from datetime import datetime, timezone
 
 db = SQLAlchemy()
 
 
+def utcnow():
+    """Naive UTC timestamp: the DateTime columns carry no time zone."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 
 class Candidate(db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     resume_text = db.Column(db.Text, nullable=False)
     resume_path = db.Column(db.String(255), nullable=False) 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=utcnow)
 
     reports = db.relationship("FinalReport", backref="user", lazy=True)
 
@@ -25,9 +30,11 @@ class FinalReport(db.Model):
     __tablename__ = "final_reports"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    public_id = db.Column(db.String(64), index=True)  # user_id in the API / Redis keys
     report_text = db.Column(db.Text, nullable=False)  
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    transcript = db.Column(db.Text)  # JSON list of {question, answer, evaluation}
+    created_at = db.Column(db.DateTime, default=utcnow)
 
     def __repr__(self):
         return f"<FinalReport for User {self.user_id}>"
@@ -1,37 +1,20 @@
 import os
-import json
 import re
 from dotenv import load_dotenv
 
 load_dotenv()
 
-_client = None
-
-def get_openai_client():
-    """
-    Initialize and cache the OpenAI client safely.
-    No monkey patching of httpx is needed.
-    """
-    global _client
-    if _client is None:
-        api_key = os.getenv('OPENAI_API_KEY')
-        if api_key:
-            try:
-                from openai import OpenAI
-                _client = OpenAI(api_key=api_key)
-                print("✅ OpenAI client ready")
-                return _client
-            except Exception as e:
-                print(f"❌ OpenAI failed: {e}")
-                _client = None
-    return _client
-
-
-def evaluate_answer(question, answer, max_questions, current_index):
-    client = get_openai_client()
-
-    # ✅ FALLBACK if OpenAI fails or interview is complete
-    if not client or current_index + 1 >= max_questions:
+from service.llm_provider import complete, llm_available
+from service.metrics import span
+from service.structured_output import parse_json
+from service.token_budget import fit_question, fit_answer, format_transcript, max_tokens_for
+
+REPORT_TIMEOUT_SECONDS = float(os.getenv("LLM_REPORT_TIMEOUT_SECONDS", 60))
+
+
+def evaluate_answer(question, answer, max_questions, current_index, session_id=None):
+    # ✅ FALLBACK if no LLM is configured or interview is complete
+    if not llm_available() or current_index + 1 >= max_questions:
         return {
             "evaluation": {"score": 7, "feedback": "Interview completed successfully"},
             "next_question": {"question": "Thank you! Generating your report...", "type": "Final"},
@@ -41,8 +24,8 @@ def evaluate_answer(question, answer, max_questions, current_index):
     prompt = f"""
 You are a technical interviewer. Score this answer 0-10 + next question.
 
-Question: {question}
-Answer: {answer}
+Question: {fit_question(question)}
+Answer: {fit_answer(answer)}
 
 Return JSON only:
 {{
@@ -53,14 +36,10 @@ Return JSON only:
 """
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=200
-        )
-        content = response.choices[0].message.content.strip()
-        result = json.loads(content)
+        content = complete(prompt, kind="evaluation", temperature=0.3,
+                           max_tokens=max_tokens_for("evaluation"), usage_id=session_id)
+        with span("json_parse"):
+            result = parse_json(content, "evaluation")
         return result
     except Exception as e:
         print(f"Evaluation fallback: {e}")
@@ -71,11 +50,9 @@ Return JSON only:
         }
 
 
-def generate_final_report(candidate_session_data):
+def generate_final_report(candidate_session_data, session_id=None):
     """✅ PRODUCTION READY HIRE/NO-HIRE REPORT"""
-    client = get_openai_client()
-
-    if not client:
+    if not llm_available():
         # ✅ OFFLINE FALLBACK REPORT
         return {
             "candidate_overview": {
@@ -95,10 +72,12 @@ def generate_final_report(candidate_session_data):
             }
         }
 
+    transcript = format_transcript(candidate_session_data.get("data", []),
+                                   summary=candidate_session_data.get("summary"))
     prompt = f"""
-Generate professional HIRE/NO-HIRE report from this interview data:
+Generate professional HIRE/NO-HIRE report from this interview transcript:
 
-{candidate_session_data}
+{transcript}
 
 JSON structure only - no other text:
 {{
@@ -110,17 +89,10 @@ JSON structure only - no other text:
 """
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=1000
-        )
-
-        content = response.choices[0].message.content.strip()
-        content = re.sub(r'^```json|```$', '', content, flags=re.MULTILINE).strip()
-
-        report = json.loads(content)
+        content = complete(prompt, kind="report", temperature=0.1, max_tokens=max_tokens_for("report"),
+                           timeout=REPORT_TIMEOUT_SECONDS, usage_id=session_id)
+        with span("json_parse"):
+            report = parse_json(content, "report")
         return report
     except Exception as e:
         print(f"Report generation fallback: {e}")
@@ -0,0 +1,139 @@
+"""
+Codec for values kept in the session store (session header, turns,
+evaluations, question bank, reports).
+
+Every encoded value starts with a short versioned header, ``~1<codec><zstd>:``:
+
+    codec  j = stdlib json, o = orjson, m = msgpack
+    zstd   z = zstd-compressed payload, - = not compressed
+
+JSON payloads stay plain text. msgpack and compressed payloads are base64
+encoded, because the redis (decode_responses) and Upstash REST backends
+carry strings, not bytes. A value without the header is read as plain JSON,
+so entries written before this module existed (or by another worker still on
+the old code) stay readable.
+
+    SESSION_CODEC           orjson (default when installed) | msgpack | json
+    SESSION_ZSTD_MIN_BYTES  compress payloads at least this large with zstd
+                            when `zstandard` is installed (default 2048, 0 = never)
+    SESSION_ZSTD_LEVEL      zstd level (default 3)
+"""
+import os
+import json
+import base64
+import threading
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+VERSION = "1"
+MAGIC = "~"
+HEADER_LENGTH = 5  # "~1oz:"
+
+
+class CodecError(Exception):
+    pass
+
+
+def _json_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _json_loads(data):
+    return json.loads(data)
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj).decode("utf-8")
+
+
+def _orjson_loads(data):
+    # orjson writes plain JSON, so a worker without orjson can still read it
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _msgpack_dumps(obj):
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def _msgpack_loads(data):
+    if msgpack is None:
+        raise CodecError("msgpack payload but msgpack is not installed")
+    return msgpack.unpackb(data, raw=False)
+
+
+CODECS = {
+    "json": ("j", _json_dumps),
+    "orjson": ("o", _orjson_dumps),
+    "msgpack": ("m", _msgpack_dumps),
+}
+_LOADERS = {"j": _json_loads, "o": _orjson_loads, "m": _msgpack_loads}
+_TEXT_CODECS = ("j", "o")
+
+_local = threading.local()
+
+
+def _zstd():
+    """Per-thread (compressor, decompressor); zstandard objects are not thread-safe."""
+    if not hasattr(_local, "zstd"):
+        level = int(os.getenv("SESSION_ZSTD_LEVEL", 3))
+        _local.zstd = (zstandard.ZstdCompressor(level=level), zstandard.ZstdDecompressor())
+    return _local.zstd
+
+
+def default_codec():
+    name = os.getenv("SESSION_CODEC", "orjson" if orjson else "json").lower()
+    if name not in CODECS:
+        raise CodecError(f"Unknown SESSION_CODEC: {name}")
+    if (name == "orjson" and orjson is None) or (name == "msgpack" and msgpack is None):
+        raise CodecError(f"SESSION_CODEC={name} but the package is not installed")
+    return name
+
+
+def dumps(obj, codec=None, compress_min_bytes=None):
+    """Encode obj as a store value (str) with the versioned header."""
+    codec = codec or default_codec()
+    if compress_min_bytes is None:
+        compress_min_bytes = int(os.getenv("SESSION_ZSTD_MIN_BYTES", 2048))
+    tag, encode = CODECS[codec]
+    payload = encode(obj)  # str for the JSON codecs, bytes for msgpack
+    compressed = zstandard is not None and 0 < compress_min_bytes <= len(payload)
+    if compressed:
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        payload = _zstd()[0].compress(payload)
+    body = payload if isinstance(payload, str) else base64.b64encode(payload).decode("ascii")
+    return f"{MAGIC}{VERSION}{tag}{'z' if compressed else '-'}:{body}"
+
+
+def loads(value):
+    """Decode a store value written by dumps(), or a legacy plain-JSON string."""
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if not value.startswith(MAGIC):
+        return json.loads(value)
+    header, body = value[:HEADER_LENGTH], value[HEADER_LENGTH:]
+    version, tag, compression = header[1], header[2], header[3]
+    if version != VERSION or tag not in _LOADERS or header[4] != ":":
+        raise CodecError(f"Unsupported value header: {header!r}")
+    if compression == "z" or tag not in _TEXT_CODECS:
+        payload = base64.b64decode(body)
+        if compression == "z":
+            if zstandard is None:
+                raise CodecError("zstd payload but zstandard is not installed")
+            payload = _zstd()[1].decompress(payload)
+    else:
+        payload = body
+    return _LOADERS[tag](payload)
@@ -0,0 +1,119 @@
+"""
+Background answer evaluation.
+
+Each submitted answer is scored on a small thread pool while the request
+thread generates the next question, so evaluation adds no latency to the
+turn. Results land in a side hash ``{session_id}:evaluations`` (field = turn
+index) and are folded into ``session['data'][i]['evaluation']`` whenever the
+session is loaded; the final report waits a bounded time for stragglers.
+
+A failed evaluation still writes its field (null), so "every answered turn
+has a field" means nothing is in flight. wait_for_evaluations checks that in
+the store, so it also works in a report worker process that never saw the
+web worker's futures.
+"""
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from service.ai_model import evaluate_answer
+from service.session_store import get_store
+from service import codec
+
+logger = logging.getLogger(__name__)
+
+EVALUATION_TTL = 86400
+EVALUATION_WAIT_SECONDS = float(os.getenv("EVALUATION_WAIT_SECONDS", 20))
+EVALUATION_POLL_SECONDS = 0.1
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("EVALUATION_WORKERS", 8)),
+                               thread_name_prefix="evaluation")
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def evaluations_key(session_id):
+    """Side hash holding finished evaluations, one field per turn index."""
+    return f"{session_id}:evaluations"
+
+
+def _evaluate(session_id, index, question, answer, max_questions):
+    try:
+        result = evaluate_answer(question, answer, max_questions, index, session_id=session_id)
+        evaluation = result.get("evaluation") if isinstance(result, dict) else None
+    except Exception as e:
+        logger.error(f"Evaluation failed for {session_id}: {e}")
+        evaluation = None
+
+    # Written even when empty: marks the turn as no longer in flight
+    pipe = get_store().pipeline()
+    pipe.hset(evaluations_key(session_id), str(index), codec.dumps(evaluation))
+    pipe.expire(evaluations_key(session_id), EVALUATION_TTL)
+    pipe.execute()
+    return evaluation
+
+
+def _done(session_id, future):
+    with _pending_lock:
+        futures = _pending.get(session_id, [])
+        if future in futures:
+            futures.remove(future)
+        if not futures:
+            _pending.pop(session_id, None)
+    if future.exception():
+        logger.error(f"Evaluation failed for {session_id}: {future.exception()}")
+
+
+def submit_evaluation(session_id, index, question, answer, max_questions=8):
+    """Score one answer in the background; returns the future."""
+    future = _executor.submit(_evaluate, session_id, index, question, answer, max_questions)
+    with _pending_lock:
+        _pending.setdefault(session_id, []).append(future)
+    future.add_done_callback(lambda f: _done(session_id, f))
+    return future
+
+
+def _missing_evaluations(session_id):
+    """Indexes of answered turns with no field in evaluations_key yet (one round trip)."""
+    # Imported here: interview_session imports this module
+    from service.interview_session import turns_key
+    pipe = get_store().pipeline()
+    pipe.lrange(turns_key(session_id), 0, -1)
+    pipe.hgetall(evaluations_key(session_id))
+    turns, stored = pipe.execute()
+    missing = []
+    for index, turn in enumerate(codec.loads(turn) for turn in turns):
+        if turn.get('answer') is not None and turn.get('evaluation') is None and str(index) not in stored:
+            missing.append(index)
+    return missing
+
+
+def wait_for_evaluations(session_id, timeout=EVALUATION_WAIT_SECONDS):
+    """Block until every answered turn of the session is evaluated, in any process (or timeout)."""
+    deadline = time.monotonic() + timeout
+    # Evaluations running here: wait on their futures instead of polling
+    with _pending_lock:
+        futures = list(_pending.get(session_id, []))
+    if futures:
+        wait(futures, timeout=timeout)
+    while True:
+        missing = _missing_evaluations(session_id)
+        if not missing:
+            return True
+        if time.monotonic() >= deadline:
+            logger.warning(f"{len(missing)} evaluation(s) still running for {session_id} after {timeout}s")
+            return False
+        time.sleep(EVALUATION_POLL_SECONDS)
+
+
+def apply_evaluations(session, stored):
+    """Copy finished evaluations (an HGETALL of evaluations_key) into session['data'][i]."""
+    for index, evaluation in (stored or {}).items():
+        index = int(index)
+        evaluation = codec.loads(evaluation)
+        # null: the evaluation failed, keep whatever the turn had
+        if index < len(session['data']) and evaluation is not None:
+            session['data'][index]['evaluation'] = evaluation
+    return session
@@ -0,0 +1,209 @@
+"""
+Resume ingestion off the request path.
+
+upload_resume saves the file, records the user as "processing" and hands the
+extraction (PDF/DOCX text + parse_resume12) to a queue:
+
+    local  - a process pool inside each web worker (default)
+    redis  - jobs pushed to the shared session store and drained by
+             `python -m service.ingest_queue` worker processes
+             (which must see the same uploads/ directory)
+
+When a job finishes the user hash gets resume_text, the compact profile
+(service/resume_profile.py) and status "ready"
+(or "failed" plus an error). Cache hits complete synchronously. With
+QUESTION_BANK on, a question bank is then generated in the background
+(service/question_bank.py).
+"""
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from service.resume_cache import get_resume_cache
+from service.resume_profile import build_profile
+from service.question_bank import submit_question_bank
+from service.tokens import count_tokens
+from service.session_store import get_store
+from service.job_queue import StoreJobQueue
+from service.metrics import observe_stage
+
+logger = logging.getLogger(__name__)
+
+JOBS_KEY = "ingest:jobs"
+USER_TTL = 86400 * 7
+
+STATUS_PROCESSING = "processing"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+
+def extract_resume(file_path):
+    """Runs in the worker process: text + parse_resume12 structure + extract_text seconds."""
+    from service.resume_parser import extract_text, parse_resume12
+
+    start = time.perf_counter()
+    resume_text = extract_text(file_path,
+                               workers=int(os.getenv("PDF_EXTRACT_WORKERS", 1)),
+                               budget=int(os.getenv("RESUME_TEXT_BUDGET", 0)) or None)
+    return resume_text, parse_resume12(resume_text), time.perf_counter() - start
+
+
+def complete_ingestion(user_id, digest, resume_text, resume_parsed, cache=True):
+    # extract_text returns "" when extraction failed: don't pin that to the file's digest
+    if cache and resume_text.strip():
+        get_resume_cache().put(digest, resume_text, resume_parsed)
+    # Compact profile replaces the raw text in every question prompt
+    profile = build_profile(resume_parsed, resume_text)
+    resume_tokens, profile_tokens = count_tokens(resume_text), count_tokens(profile)
+    logger.info(f"Resume profile for {user_id}: {resume_tokens} -> {profile_tokens} prompt tokens per question")
+    pipe = get_store().pipeline()
+    pipe.hset(f"user:{user_id}", mapping={
+        "resume_text": resume_text,
+        "profile": profile,
+        "resume_tokens": resume_tokens,
+        "profile_tokens": profile_tokens,
+        "status": STATUS_READY,
+    })
+    pipe.expire(f"user:{user_id}", USER_TTL)
+    pipe.execute()
+    # Optional: questions for the whole interview in one LLM call
+    submit_question_bank(user_id, profile)
+
+
+def fail_ingestion(user_id, error):
+    logger.error(f"Resume ingestion failed for {user_id}: {error}")
+    pipe = get_store().pipeline()
+    pipe.hset(f"user:{user_id}", mapping={"status": STATUS_FAILED, "error": str(error)})
+    pipe.expire(f"user:{user_id}", USER_TTL)
+    pipe.execute()
+
+
+class LocalIngestQueue:
+    """
+    Process pool owned by this web worker. Completion (store writes, resume
+    cache, question bank) runs on a small thread pool: the pool's done
+    callbacks run on its result thread, which would otherwise stall delivery
+    of every other extraction.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._pool = None
+        self._completer = ThreadPoolExecutor(max_workers=int(os.getenv("INGEST_COMPLETION_WORKERS", 2)),
+                                             thread_name_prefix="ingest-complete")
+        # user_id -> extraction future, then the completion future
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn: forking a threaded gunicorn worker is not safe
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def submit(self, user_id, file_path, digest):
+        with self._lock:
+            future = self._get_pool().submit(extract_resume, file_path)
+            self._futures[user_id] = future
+        future.add_done_callback(lambda f: self._finished(user_id, digest, f))
+
+    def _finished(self, user_id, digest, future):
+        # Runs on the process pool's result thread: hand off and return
+        with self._lock:
+            completion = self._completer.submit(self._complete, user_id, digest, future)
+            if self._futures.get(user_id) is future:
+                self._futures[user_id] = completion
+        completion.add_done_callback(lambda f: self._forget(user_id, f))
+
+    def _forget(self, user_id, future):
+        with self._lock:
+            if self._futures.get(user_id) is future:
+                del self._futures[user_id]
+
+    def _complete(self, user_id, digest, future):
+        try:
+            resume_text, resume_parsed, seconds = future.result()
+            # Timed in the pool process; recorded here where /metrics can see it
+            observe_stage("extract_text", seconds, endpoint="upload_resume")
+            complete_ingestion(user_id, digest, resume_text, resume_parsed)
+        except Exception as e:
+            fail_ingestion(user_id, e)
+
+    def wait(self, user_id, timeout):
+        """Wait until extraction and completion are done (or timeout)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                future = self._futures.get(user_id)
+            remaining = deadline - time.monotonic()
+            if future is None or remaining <= 0:
+                return
+            try:
+                future.exception(timeout=remaining)
+            except Exception:
+                pass
+            with self._lock:
+                if self._futures.get(user_id) is future:
+                    return
+
+
+class RedisIngestQueue(StoreJobQueue):
+    jobs_key = JOBS_KEY
+    name = "Ingestion"
+
+    def submit(self, user_id, file_path, digest):
+        self.push(user_id=user_id, file_path=file_path, digest=digest)
+
+    def run(self, job):
+        try:
+            resume_text, resume_parsed, seconds = extract_resume(job["file_path"])
+            observe_stage("extract_text", seconds, endpoint="upload_resume")
+            complete_ingestion(job["user_id"], job["digest"], resume_text, resume_parsed)
+        except Exception as e:
+            fail_ingestion(job["user_id"], e)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_ingest_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                if os.getenv("INGEST_QUEUE", "local").lower() == "redis":
+                    _queue = RedisIngestQueue()
+                else:
+                    _queue = LocalIngestQueue(int(os.getenv("INGEST_WORKERS", 2)))
+    return _queue
+
+
+def submit_resume(user_id, file_path, digest):
+    """Queue extraction for an uploaded resume; returns the resulting status."""
+    cached = get_resume_cache().get(digest)
+    if cached:
+        complete_ingestion(user_id, digest, *cached, cache=False)
+        return STATUS_READY
+    get_ingest_queue().submit(user_id, file_path, digest)
+    return STATUS_PROCESSING
+
+
+def wait_for_resume(user_id, timeout, poll_interval=0.25):
+    """Wait up to timeout seconds for ingestion; returns the user hash."""
+    deadline = time.monotonic() + timeout
+    get_ingest_queue().wait(user_id, timeout)
+    while True:
+        user_data = get_store().hgetall(f"user:{user_id}")
+        if user_data.get("status", STATUS_READY) != STATUS_PROCESSING or time.monotonic() >= deadline:
+            return user_data
+        time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    RedisIngestQueue().run_worker()
@@ -186,89 +186,131 @@
 #     result = handle_interview_session(session_id, "I am a CS student...", "sample resume")
 #     print(f"Next: {result}")
 import uuid
-import json
 import time
 import logging
 import os  # ← THIS WAS MISSING!
-from typing import Dict, Any, Tuple
-from service.ai_model import evaluate_answer, get_openai_client
-from service.llm_model import dynamic_questions_gen_model
+from service.llm_model import dynamic_questions_gen_model, dynamic_questions_stream, fallback_question
+from service.session_store import get_store
+from service import codec
+from service.evaluation_pipeline import submit_evaluation, evaluations_key, apply_evaluations
+from service.question_bank import load_bank, next_bank_question
+from service.transcript_summary import summary_key, submit_summary, KEEP_TURNS
 
 # Production logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class SimpleRedis:
-    def __init__(self): 
-        self.data = {}
-    def get(self, key): 
-        return self.data.get(key)
-    def set(self, key, value, ex=None): 
-        self.data[key] = value
-        return True
-    def delete(self, key): 
-        self.data.pop(key, None)
-        return True
-    def expire(self, key, seconds): 
-        return True
-    def ping(self): 
-        return True
-
-# FIXED Redis initialization
-try:
-    if os.getenv('UPSTASH_REDIS_REST_URL'):
-        from upstash_redis import Redis
-        r = Redis(url=os.getenv('UPSTASH_REDIS_REST_URL'), token=os.getenv('UPSTASH_REDIS_REST_TOKEN'))
-        r.ping()
-        logger.info("✅ Upstash Redis connected")
-    else:
-        r = SimpleRedis()
-        logger.info("✅ Local Redis active")
-except Exception as e:
-    r = SimpleRedis()
-    logger.info(f"✅ Simple Redis fallback: {e}")
 
 
+SESSION_TTL = 86400
+# The interview stops when question_no reaches this, i.e. after MAX_QUESTIONS - 1 answers
+MAX_QUESTIONS = int(os.getenv("INTERVIEW_MAX_QUESTIONS", 3))
+
+
+def turns_key(session_id):
+    """List of turns ({question, answer}), one RPUSH per question."""
+    return f"{session_id}:turns"
+
+
+def _header(session):
+    """Session fields except the turns (stored under the session id)"""
+    return codec.dumps({k: v for k, v in session.items() if k not in ('data', 'current', 'recent', 'summary')})
+
 
 def start_interview_session(user_id):
     """Start interview with first question"""
     session_id = str(uuid.uuid4())
     first_question = "Tell me about yourself and your technical background."
-    
-    session_data = {
+
+    header = {
         "user_id": user_id,
         "question_no": 1,
         "max_questions": 8,
-        "data": [{
-            'question': first_question,
-            'answer': None,
-            'timestamp': time.time(),
-            'evaluation': None
-        }]
     }
-    
-    r.set(session_id, json.dumps(session_data))
-    r.expire(session_id, 86400)
+    first_turn = {
+        'question': first_question,
+        'answer': None,
+        'timestamp': time.time(),
+        'evaluation': None
+    }
+
+    pipe = get_store().pipeline()
+    pipe.set(session_id, codec.dumps(header), ex=SESSION_TTL)
+    pipe.rpush(turns_key(session_id), codec.dumps(first_turn))
+    pipe.expire(turns_key(session_id), SESSION_TTL)
+    pipe.execute()
     return session_id, first_question
 
-def handle_interview_session(session_id, answer,resume_data):
-    data = r.get(session_id)
+def _migrate_legacy(session_id, session):
+    """Split a pre-turns-list session blob into header + turns"""
+    pipe = get_store().pipeline()
+    pipe.set(session_id, _header(session), ex=SESSION_TTL)
+    pipe.delete(turns_key(session_id))
+    pipe.rpush(turns_key(session_id), *[codec.dumps(turn) for turn in session['data']])
+    pipe.expire(turns_key(session_id), SESSION_TTL)
+    pipe.execute()
+
+def load_session(session_id):
+    """Full session (header + every turn) with finished evaluations folded in (one round trip)"""
+    pipe = get_store().pipeline()
+    pipe.get(session_id)
+    pipe.lrange(turns_key(session_id), 0, -1)
+    pipe.hgetall(evaluations_key(session_id))
+    pipe.get(summary_key(session_id))
+    data, turns, evaluations, summary = pipe.execute()
     if not data:
-        return {"error": "Session not found."}
-    session = json.loads(data)
+        return None
+    session = codec.loads(data)
+    if 'data' not in session:
+        session['data'] = [codec.loads(turn) for turn in turns]
+    session['summary'] = codec.loads(summary) if summary else None
+    return apply_evaluations(session, evaluations)
+
+def load_current_turn(session_id):
+    """
+    Header plus the turn being answered (session['current']), the KEEP_TURNS
+    turns before it (session['recent']) and the rolling summary, for the
+    per-answer path
+    """
+    pipe = get_store().pipeline()
+    pipe.get(session_id)
+    pipe.lrange(turns_key(session_id), -(KEEP_TURNS + 1), -1)
+    pipe.get(summary_key(session_id))
+    data, last, summary = pipe.execute()
+    if not data:
+        return None
+    session = codec.loads(data)
+    if 'data' in session:
+        _migrate_legacy(session_id, session)
+        last = session.pop('data')[-(KEEP_TURNS + 1):]
+    else:
+        last = [codec.loads(turn) for turn in last]
+    session['current'] = last[-1]
+    session['recent'] = last[:-1]
+    session['summary'] = codec.loads(summary) if summary else None
+    return session
+
+def _record_answer(session_id, session, answer):
+    """Store the answer and score it in the background"""
+    index = session['question_no'] - 1
+    session['current']['answer'] = answer
+    submit_evaluation(session_id, index, session['current']['question'], answer,
+                      session.get('max_questions', 8))
+
+def _advance_session(session_id, session, next_question):
+    """Persist the answered turn, append the next one, and build the API result"""
     current_question=session['question_no']
-    session['data'][current_question-1]['answer']=answer
-    next_question=dynamic_questions_gen_model(resume_data,session,answer)
-    print(f"Next question generated: {next_question}")
-    session['data'].append({
-        'question':next_question,
-        'answer':None
-    })
     session['question_no']=current_question+1
-    print(f'This is the session:{session}')
-    r.set(session_id, json.dumps(session))
-    r.expire(session_id, 86400)
-    if session['question_no'] >= 3:
+    # O(1) per turn: rewrite one list element, append one, update the small header
+    pipe = get_store().pipeline()
+    pipe.lset(turns_key(session_id), current_question - 1, codec.dumps(session['current']))
+    pipe.rpush(turns_key(session_id), codec.dumps({'question': next_question, 'answer': None}))
+    pipe.expire(turns_key(session_id), SESSION_TTL)
+    pipe.set(session_id, _header(session), ex=SESSION_TTL)
+    pipe.execute()
+    submit_summary(session_id, current_question)
+    # next_question None: the model ended the interview ({"terminate": true})
+    if session['question_no'] >= MAX_QUESTIONS or next_question is None:
         return {
             "next_question": None,
             "stop": True
@@ -279,13 +321,71 @@ def handle_interview_session(session_id, answer,resume_data):
         "stop": False
     }
 
+def handle_interview_session(session_id, answer,resume_data,question_bank=None):
+    session = load_current_turn(session_id)
+    if not session:
+        return {"error": "Session not found."}
+    if session['question_no'] >= MAX_QUESTIONS:
+        # Retried submit after the last answer: don't record it twice
+        return {"next_question": None, "stop": True}
+    # Evaluation runs alongside question generation
+    _record_answer(session_id, session, answer)
+    # Pre-generated bank first; the LLM only for drill-downs
+    next_question=next_bank_question(session,load_bank(question_bank),answer)
+    if next_question is None:
+        next_question=dynamic_questions_gen_model(resume_data,session,answer,session_id=session_id)
+    logger.debug(f"Next question generated: {next_question}")
+    return _advance_session(session_id, session, next_question)
+
+def stream_interview_session(session_id, answer, resume_data, question_bank=None):
+    """
+    Streaming variant of handle_interview_session.
+    Yields ("token", text) as the next question arrives, then ("done", result).
+    """
+    session = load_current_turn(session_id)
+    if not session:
+        yield "error", {"error": "Session not found."}
+        return
+    if session['question_no'] >= MAX_QUESTIONS:
+        yield "done", {"next_question": None, "stop": True}
+        return
+    current_question=session['question_no']
+    _record_answer(session_id, session, answer)
+
+    # Don't stream a question nobody will be asked
+    if current_question + 1 >= MAX_QUESTIONS:
+        yield "done", _advance_session(session_id, session, None)
+        return
+
+    next_question = next_bank_question(session, load_bank(question_bank), answer)
+    if next_question:
+        yield "token", next_question
+        yield "done", _advance_session(session_id, session, next_question)
+        return
+
+    tokens = []
+    question_stream = dynamic_questions_stream(resume_data, session, answer, session_id=session_id)
+    try:
+        while True:
+            token = next(question_stream)
+            tokens.append(token)
+            yield "token", token
+    except StopIteration as done:
+        # The whole question, or None when the model ended the interview
+        next_question = done.value
+    except Exception as e:
+        logger.error(f"Question stream failed: {e}")
+        next_question = "".join(tokens).strip()
+        if not next_question:
+            next_question = fallback_question(session)
+            yield "token", next_question
+    yield "done", _advance_session(session_id, session, next_question)
+
 def get_session_report(session_id):
     """Get complete session data"""
-    data = r.get(session_id)
-    if not data:
+    session = load_session(session_id)
+    if not session:
         return {"error": "Session not found."}
-    
-    session = json.loads(data)
     return {
         "status": "completed" if session.get('end_time') else "active",
         "user_id": session["user_id"],
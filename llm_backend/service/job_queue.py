@@ -0,0 +1,46 @@
+"""
+Job queue in the shared session store, for work drained by separate
+worker processes (INGEST_QUEUE=redis, REPORT_JOBS=redis).
+
+Jobs are JSON objects LPUSHed onto a store list and RPOPed by
+`python -m service.<module>` workers, which poll while the list is empty.
+Subclasses set jobs_key and name, and implement submit() and run(job).
+"""
+import json
+import time
+import logging
+
+from service.session_store import get_store
+
+logger = logging.getLogger(__name__)
+
+
+class StoreJobQueue:
+    """Jobs in a store list, drained by separate worker processes."""
+
+    jobs_key = None
+    name = "Job"
+
+    def push(self, **job):
+        get_store().lpush(self.jobs_key, json.dumps(job))
+
+    def run(self, job):
+        raise NotImplementedError
+
+    def wait(self, user_id, timeout):
+        # The job runs in another process: callers poll the store instead
+        pass
+
+    def run_worker(self, poll_interval=0.5):
+        logger.info(f"🚀 {self.name} worker started")
+        store = get_store()
+        while True:
+            job = store.rpop(self.jobs_key)
+            if not job:
+                time.sleep(poll_interval)
+                continue
+            try:
+                self.run(json.loads(job))
+            except Exception as e:
+                # One bad job must not take the worker down
+                logger.error(f"{self.name} job failed: {e}")
@@ -125,70 +125,199 @@
 #     parsed = json.loads(json_str[start:end])
     
 #     return parsed
-from openai import OpenAI
-import json
-import os
+import time
 
-client = OpenAI(
-    api_key=os.getenv('OPENAI_API_KEY')
-)
+from service.llm_provider import complete, stream, end_session, LLMError
+from service.question_cache import get_question_cache
+from service.metrics import span
+from service.token_budget import fit_resume, fit_answer, max_tokens_for
+from service.transcript_summary import interview_context
+from service.structured_output import parse_json, QuestionStream
 
-def dynamic_questions_gen_model(resume_data, history, last_answer):
-    """Generate next interview question using OpenAI"""
-    
-    prompt = f"""
-You are continuing a professional job interview as an expert HR and Technical interviewer.
-
-# Resume Data:
-{resume_data}
-
-# Candidate's Last Answer:
-{last_answer}
+# Fallback questions based on history length
+FALLBACK_QUESTIONS = [
+    "Explain your MERN stack project architecture.",
+    "Describe a challenging bug you debugged.",
+    "How do you optimize React performance?",
+    "Tell me about a team conflict you resolved."
+]
 
-# TASK: Generate EXACTLY ONE follow-up question following these rules:
+QUESTION_RULES = """# TASK: Generate EXACTLY ONE follow-up question following these rules:
 1. **Drill-Down (Priority 1):** If candidate mentioned specific tech/project, ask HARD follow-up about that detail
-2. **Topic Rotation (Priority 2):** Switch to uncovered resume skill (Technical > HR > General)
-3. **Terminate if complete:** Output {{"terminate": true}} if fully assessed
+2. **Topic Rotation (Priority 2):** Switch to uncovered resume skill (Technical > HR > General)"""
+
+QUESTION_JSON_RULES = """3. **Terminate if complete:** Output {"terminate": true} if fully assessed
 
 Return ONLY JSON:
-{{
+{
   "question": "Single generated question text"
-}}
+}
 OR
-{{
+{
   "terminate": true
-}}
+}"""
+
+def fallback_question(history):
+    return FALLBACK_QUESTIONS[len(history) % len(FALLBACK_QUESTIONS)]
+
+
+def _question_prompt(resume_data, last_answer, output_rules, context=""):
+    """
+    (prefix, prompt): instructions + resume stay the same for a whole
+    interview, so the local model caches them per session; only the
+    interview context (rolling summary + recent turns) and the last answer
+    are new each turn.
+    """
+    prefix = f"""You are continuing a professional job interview as an expert HR and Technical interviewer.
+
+{QUESTION_RULES}
+{output_rules}
+
+# Resume Data:
+{fit_resume(resume_data)}
 """
-    
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.3,
-        max_tokens=150
-    )
-    
-    content = response.choices[0].message.content.strip()
+    if context:
+        context = f"\n# Interview So Far:\n{context}\n"
+    prompt = f"""{context}
+# Candidate's Last Answer:
+{fit_answer(last_answer)}"""
+    return prefix, prompt
+
+
+def end_session_context(session_id):
+    """Release per-interview model state (prefix cache of the local model)"""
+    end_session(session_id)
+
+
+QUESTION_BANK_PROMPT = """You are preparing a professional job interview as an expert HR and Technical interviewer.
+
+# Resume Data:
+{resume_data}
+
+# TASK: Write {count} interview questions for this candidate, most important first:
+- Hard technical questions on the candidate's strongest listed skills
+- Questions on the specific projects (architecture, trade-offs, their own contribution)
+- EXACTLY ONE behavioral question (teamwork, conflict or decision-making)
+
+Return ONLY JSON:
+{{
+  "questions": [
+    {{"question": "Question text", "type": "skill", "topic": "React"}},
+    {{"question": "Question text", "type": "project", "topic": "Project name"}},
+    {{"question": "Question text", "type": "behavioral", "topic": "Teamwork"}}
+  ]
+}}"""
+
+
+def generate_question_bank(resume_data, count=6):
+    """Ranked questions for a resume in one LLM call; [] if generation fails"""
+    try:
+        content = complete(QUESTION_BANK_PROMPT.format(resume_data=fit_resume(resume_data), count=count),
+                           kind="question_bank", temperature=0.3,
+                           max_tokens=max_tokens_for("question_bank", count))
+        questions = parse_json(content, "question_bank").get("questions", [])
+    except (LLMError, ValueError, AttributeError) as e:
+        print(f"Question bank generation failed: {e}")
+        return []
+    return [
+        {"question": q["question"].strip(), "type": q.get("type", "skill"), "topic": q.get("topic", "")}
+        for q in questions
+        if isinstance(q, dict) and isinstance(q.get("question"), str) and q["question"].strip()
+    ][:count]
+
+
+def _answers_opener(history):
+    """True when last_answer replies to the fixed first question"""
+    return isinstance(history, dict) and history.get('question_no') == 1
+
+
+def _generate_question(resume_data, history, last_answer, session_id):
+    with span("prompt_build"):
+        prefix, prompt = _question_prompt(resume_data, last_answer, QUESTION_JSON_RULES,
+                                          interview_context(history))
+    try:
+        content = complete(prompt, prefix=prefix, kind="question", session_id=session_id,
+                           temperature=0.3, max_tokens=max_tokens_for("question"))
+    except LLMError as e:
+        print(f"Question generation fallback: {e}")
+        return fallback_question(history)
     
     try:
-        parsed = json.loads(content)
+        # Local models tend to wrap the JSON in prose; parse_json digs it out
+        with span("json_parse"):
+            parsed = parse_json(content, "question")
         
         # Handle terminate case
         if parsed.get("terminate"):
             return None  # Signals end of interview
             
         # Return question
-        if "question" in parsed:
+        if isinstance(parsed.get("question"), str) and parsed["question"].strip():
             return parsed["question"]
             
         raise ValueError("Invalid JSON format")
         
-    except (json.JSONDecodeError, ValueError) as e:
+    except ValueError as e:
         print(f"JSON parse error: {e}")
-        # Fallback questions based on history length
-        fallbacks = [
-            "Explain your MERN stack project architecture.",
-            "Describe a challenging bug you debugged.",
-            "How do you optimize React performance?",
-            "Tell me about a team conflict you resolved."
-        ]
-        return fallbacks[len(history) % len(fallbacks)]
+        return fallback_question(history)
+
+
+def dynamic_questions_gen_model(resume_data, history, last_answer, session_id=None):
+    """Generate next interview question through the configured LLM provider"""
+    
+    # Answers to the opener are near-identical across candidates
+    cacheable = _answers_opener(history)
+    if cacheable:
+        cached = get_question_cache().get(last_answer, resume_data)
+        if cached:
+            return cached
+    
+    started = time.monotonic()
+    question = _generate_question(resume_data, history, last_answer, session_id)
+    if cacheable and question and question not in FALLBACK_QUESTIONS:
+        get_question_cache().put(last_answer, resume_data, question, time.monotonic() - started)
+    return question
+
+
+def dynamic_questions_stream(resume_data, history, last_answer, session_id=None):
+    """
+    Stream the next interview question as plain-text tokens. The model
+    answers in the same JSON as dynamic_questions_gen_model (so both share
+    the cached prefix); QuestionStream yields the question as it arrives.
+    Returns the whole question, or None when the model ended the interview.
+    """
+
+    cacheable = _answers_opener(history)
+    if cacheable:
+        cached = get_question_cache().get(last_answer, resume_data)
+        if cached:
+            yield cached
+            return cached
+
+    started = time.monotonic()
+    with span("prompt_build"):
+        prefix, prompt = _question_prompt(resume_data, last_answer, QUESTION_JSON_RULES,
+                                          interview_context(history))
+    parser = QuestionStream()
+    for token in stream(prompt, prefix=prefix, kind="question", session_id=session_id,
+                        temperature=0.3, max_tokens=max_tokens_for("question")):
+        piece = parser.feed(token)
+        if piece:
+            yield piece
+    try:
+        reply = parser.finish()
+    except ValueError:
+        reply = {}
+    question = reply.get("question")
+    if not (isinstance(question, str) and question.strip()):
+        if reply.get("terminate"):
+            return None
+        question = fallback_question(history)
+        yield question
+        return question
+    if not parser.found:
+        # Valid JSON the incremental scan missed: send the question whole
+        yield question
+    if cacheable:
+        get_question_cache().put(last_answer, resume_data, question, time.monotonic() - started)
+    return question
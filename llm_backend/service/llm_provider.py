@@ -0,0 +1,432 @@
+"""
+Single entry point for every LLM call.
+
+Backends:
+    openai - chat completions (OPENAI_API_KEY, OPENAI_MODEL)
+    local  - the llama.cpp model in llama_models.py, prefix-cached per session
+    mock   - deterministic canned output, for development and load runs
+
+LLM_PROVIDER picks the primary backend and LLM_FALLBACK_PROVIDER an optional
+second one. Each call is bounded by a timeout. A call that fails, or whose
+backend's circuit breaker is open, goes to the fallback. A call still running
+past the primary's observed p95 latency is hedged to the fallback, and the
+first answer wins. A slow upstream therefore degrades to the fallback instead
+of holding a worker thread until gunicorn kills it.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+import importlib.util
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from service.metrics import span
+from service.tokens import count_tokens
+from service.token_budget import record_usage
+from service.structured_output import response_format, schema_for
+
+logger = logging.getLogger(__name__)
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 20))
+HEDGE_MIN_SECONDS = float(os.getenv("LLM_HEDGE_MIN_SECONDS", 1.0))
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", 30))
+
+# p95 is only trusted (and hedging enabled) after this many samples
+MIN_LATENCY_SAMPLES = 20
+
+
+class LLMError(Exception):
+    """No backend produced a completion in time."""
+
+
+class CircuitBreaker:
+    """Opens after N consecutive failures; lets one trial call through per cooldown."""
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN_SECONDS):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        return "open" if self._opened_at is not None else "closed"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                self._opened_at = time.monotonic()  # half-open: one trial, then wait again
+                return True
+            return False
+
+    def record(self, ok):
+        with self._lock:
+            if ok:
+                self._consecutive = 0
+                self._opened_at = None
+                return
+            self._consecutive += 1
+            if self._consecutive >= self.failures and self._opened_at is None:
+                self._opened_at = time.monotonic()
+                logger.warning(f"⚠️ LLM circuit opened after {self._consecutive} failures")
+
+
+class LatencyWindow:
+    """Last N successful call durations, for the hedging threshold."""
+
+    def __init__(self, size=200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self):
+        with self._lock:
+            if len(self._samples) < MIN_LATENCY_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+
+class Provider:
+    name = None
+
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyWindow()
+
+    def available(self):
+        return True
+
+    def complete(self, prompt, prefix="", max_tokens=200, temperature=0.3, timeout=None,
+                 session_id=None, kind=None):
+        raise NotImplementedError
+
+    def stream(self, prompt, prefix="", max_tokens=200, temperature=0.3, timeout=None,
+               session_id=None, kind=None):
+        raise NotImplementedError
+
+    def end_session(self, session_id):
+        pass
+
+    def warm(self):
+        """Build clients / load models ahead of the first call."""
+
+
+class OpenAIProvider(Provider):
+    name = "openai"
+
+    def __init__(self, model=None):
+        super().__init__()
+        self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+    def available(self):
+        return bool(os.getenv("OPENAI_API_KEY"))
+
+    def warm(self):
+        from service.openai_client import get_openai_client
+        get_openai_client()
+
+    def _create(self, prompt, prefix, max_tokens, temperature, timeout, kind=None, **kwargs):
+        from service.openai_client import chat_completion
+        fmt = response_format(kind)
+        if fmt:
+            kwargs["response_format"] = fmt
+        return chat_completion(
+            self.model,
+            [{"role": "user", "content": prefix + prompt}],
+            timeout=timeout,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+
+    def complete(self, prompt, prefix="", max_tokens=200, temperature=0.3, timeout=None,
+                 session_id=None, kind=None):
+        response = self._create(prompt, prefix, max_tokens, temperature, timeout, kind=kind)
+        return response.choices[0].message.content.strip()
+
+    def stream(self, prompt, prefix="", max_tokens=200, temperature=0.3, timeout=None,
+               session_id=None, kind=None):
+        for chunk in self._create(prompt, prefix, max_tokens, temperature, timeout, kind=kind, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class LocalProvider(Provider):
+    """
+    llama.cpp model. The prefix (instructions + resume) is cached per session
+    by llama_models, so later turns only evaluate the new prompt text.
+    """
+    name = "local"
+    STOP = ["</s>", "[/INST]"]
+
+    def available(self):
+        return importlib.util.find_spec("llama_cpp") is not None
+
+    def warm(self):
+        import llama_models
+        if not llama_models.SERVER_SOCKET:
+            llama_models.get_llm()
+
+    def complete(self, prompt, prefix="", max_tokens=200, temperature=0.3, timeout=None,
+                 session_id=None, kind=None):
+        from llama_models import generate
+        output = generate(f"[INST] {prefix}", f"{prompt} [/INST]", session_id=session_id,
+                          json_schema=schema_for(kind), max_tokens=max_tokens,
+                          temperature=temperature, stop=self.STOP, timeout=timeout)
+        return output["choices"][0]["text"].strip()
+
+    def stream(self, prompt, prefix="", max_tokens=200, temperature=0.3, timeout=None,
+               session_id=None, kind=None):
+        from llama_models import generate
+        for chunk in generate(f"[INST] {prefix}", f"{prompt} [/INST]", session_id=session_id, stream=True,
+                              json_schema=schema_for(kind), max_tokens=max_tokens,
+                              temperature=temperature, stop=self.STOP, timeout=timeout):
+            yield chunk["choices"][0]["text"]
+
+    def end_session(self, session_id):
+        # Don't load the model just to forget about it
+        if "llama_models" in sys.modules:
+            sys.modules["llama_models"].forget_session(session_id)
+
+
+class MockProvider(Provider):
+    """Deterministic answers per prompt; LLM_MOCK_LATENCY_MS simulates a slow model."""
+    name = "mock"
+    QUESTIONS = [
+        "Walk me through the architecture of the project you are most proud of.",
+        "What was the hardest bug you fixed, and how did you find it?",
+        "How would you make that feature handle ten times the traffic?",
+        "Describe a time you disagreed with a teammate on a technical decision.",
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.delay = float(os.getenv("LLM_MOCK_LATENCY_MS", 0)) / 1000
+
+    def _text(self, prompt, prefix, kind):
+        seed = int(hashlib.sha1((prefix + prompt).encode("utf-8")).hexdigest(), 16)
+        question = self.QUESTIONS[seed % len(self.QUESTIONS)]
+        if kind == "question":
+            return json.dumps({"question": question})
+        if kind == "evaluation":
+            return json.dumps({
+                "evaluation": {"score": 5 + seed % 5, "feedback": "Clear answer with relevant detail"},
+                "next_question": {"question": question, "type": "Technical"},
+                "stop": False,
+            })
+        if kind == "question_bank":
+            return json.dumps({"questions": [
+                {"question": q, "type": "behavioral" if "teammate" in q else "skill", "topic": ""}
+                for q in self.QUESTIONS[seed % len(self.QUESTIONS):] + self.QUESTIONS[:seed % len(self.QUESTIONS)]
+            ]})
+        if kind == "summary":
+            return "Candidate described their main project and its architecture in reasonable depth."
+        if kind == "report":
+            return json.dumps({
+                "candidate_overview": {"name": "Candidate", "summary": "Completed technical interview"},
+                "overall_performance": {"average_score": 7.0, "performance_level": "Intermediate"},
+                "strengths": ["Communication", "Technical depth"],
+                "final_recommendation": {"decision": "Hire", "justification": "Consistent answers"},
+            })
+        return question
+
+    def complete(self, prompt, prefix="", max_tokens=200, temperature=0.3, timeout=None,
+                 session_id=None, kind=None):
+        time.sleep(self.delay)
+        return self._text(prompt, prefix, kind)
+
+    def stream(self, prompt, prefix="", max_tokens=200, temperature=0.3, timeout=None,
+               session_id=None, kind=None):
+        time.sleep(self.delay)
+        for word in self._text(prompt, prefix, kind).split(" "):
+            yield word + " "
+
+
+PROVIDERS = {"openai": OpenAIProvider, "local": LocalProvider, "mock": MockProvider}
+
+
+class LLMRouter:
+    """Primary + optional fallback with timeouts, hedging and circuit breaking."""
+
+    def __init__(self, providers, timeout=LLM_TIMEOUT_SECONDS, hedge_min=HEDGE_MIN_SECONDS):
+        self.providers = providers
+        self.timeout = timeout
+        self.hedge_min = hedge_min
+        self._executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_WORKERS", 32)),
+                                            thread_name_prefix="llm")
+
+    def available(self):
+        return any(p.available() for p in self.providers)
+
+    def _candidates(self):
+        return [p for p in self.providers if p.available()]
+
+    @staticmethod
+    def _call(provider, prompt, kwargs):
+        start = time.monotonic()
+        result = provider.complete(prompt, **kwargs)
+        provider.latency.add(time.monotonic() - start)
+        return result
+
+    def _hedge_after(self, provider):
+        p95 = provider.latency.p95()
+        return None if p95 is None else max(p95, self.hedge_min)
+
+    def complete(self, prompt, timeout=None, **kwargs):
+        """Completion text from the first backend to answer; raises LLMError."""
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        remaining_providers = iter(self._candidates())
+        pending, errors = {}, []
+
+        def launch():
+            for provider in remaining_providers:
+                if provider.breaker.allow():
+                    future = self._executor.submit(self._call, provider, prompt, dict(kwargs, timeout=timeout))
+                    pending[future] = provider
+                    return True
+            return False
+
+        if not launch():
+            raise LLMError("No LLM provider available")
+
+        hedged = False
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            wait_for = remaining
+            if not hedged:
+                hedge_after = self._hedge_after(next(iter(pending.values())))
+                if hedge_after is not None:
+                    wait_for = min(remaining, hedge_after)
+
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            if not done:
+                if not hedged:
+                    hedged = True
+                    if launch():
+                        logger.info(f"Hedging slow {kwargs.get('kind') or 'LLM'} call to a second provider")
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    provider.breaker.record(False)
+                    errors.append(f"{provider.name}: {e}")
+                    continue
+                provider.breaker.record(True)
+                return result
+            if not pending:
+                launch()
+
+        for provider in pending.values():
+            provider.breaker.record(False)
+            errors.append(f"{provider.name}: timed out after {timeout}s")
+        raise LLMError("; ".join(errors) or "No LLM provider available")
+
+    def stream(self, prompt, timeout=None, **kwargs):
+        """
+        Yield completion text chunks. Fails over only before the first chunk;
+        once text has reached the client the stream can't switch backends.
+        """
+        kwargs["timeout"] = timeout or self.timeout
+        errors = []
+        for provider in self._candidates():
+            if not provider.breaker.allow():
+                continue
+            started = False
+            try:
+                for chunk in provider.stream(prompt, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                provider.breaker.record(False)
+                if started:
+                    raise
+                errors.append(f"{provider.name}: {e}")
+                continue
+            provider.breaker.record(True)
+            return
+        raise LLMError("; ".join(errors) or "No LLM provider available")
+
+    def end_session(self, session_id):
+        for provider in self.providers:
+            provider.end_session(session_id)
+
+    def warm(self):
+        for provider in self._candidates():
+            provider.warm()
+
+    def status(self):
+        return {
+            p.name: {"available": p.available(), "breaker": p.breaker.state, "p95_seconds": p.latency.p95()}
+            for p in self.providers
+        }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_llm_router():
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                names = [os.getenv("LLM_PROVIDER", "openai"), os.getenv("LLM_FALLBACK_PROVIDER", "")]
+                providers = []
+                for name in (n.strip().lower() for n in names):
+                    if name and name not in [p.name for p in providers]:
+                        if name not in PROVIDERS:
+                            raise ValueError(f"Unknown LLM provider: {name}")
+                        providers.append(PROVIDERS[name]())
+                _router = LLMRouter(providers)
+                logger.info(f"🤖 LLM providers: {' -> '.join(p.name for p in providers)}")
+    return _router
+
+
+def _prompt_tokens(prompt, kwargs):
+    return count_tokens(kwargs.get("prefix") or "") + count_tokens(prompt)
+
+
+def complete(prompt, usage_id=None, **kwargs):
+    """usage_id: interview whose token total this call counts toward (default session_id)."""
+    with span("llm_call"):
+        text = get_llm_router().complete(prompt, **kwargs)
+    record_usage(kwargs.get("kind"), _prompt_tokens(prompt, kwargs), count_tokens(text),
+                 usage_id or kwargs.get("session_id"))
+    return text
+
+
+def stream(prompt, usage_id=None, **kwargs):
+    # Times the whole stream, first token to last
+    chunks = []
+    with span("llm_call"):
+        for chunk in get_llm_router().stream(prompt, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+    record_usage(kwargs.get("kind"), _prompt_tokens(prompt, kwargs), count_tokens("".join(chunks)),
+                 usage_id or kwargs.get("session_id"))
+
+
+def llm_available():
+    return get_llm_router().available()
+
+
+def end_session(session_id):
+    get_llm_router().end_session(session_id)
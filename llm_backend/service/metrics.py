@@ -0,0 +1,218 @@
+"""
+In-process metrics.
+
+Counters and histograms, both keyed by name + labels. Histograms use fixed
+cumulative buckets (Prometheus style), so snapshots from several workers can
+be summed bucket by bucket. render_prometheus() exposes all of them in the
+Prometheus text format (the /metrics route), counters with the _total suffix.
+
+Hot-path timing goes through span(stage): the time lands in
+stage_seconds{stage, endpoint}, where endpoint is the Flask endpoint serving
+the current request (set_endpoint), or "background" on worker threads.
+A span costs two perf_counter() calls and one bisect. METRICS=off turns
+spans into no-ops.
+"""
+import os
+import time
+import bisect
+import threading
+import contextvars
+
+# Seconds; LLM calls range from ~100 ms to tens of seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+# Seconds; stages range from sub-millisecond store reads to LLM calls
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+ENABLED = os.getenv("METRICS", "on").lower() not in ("0", "off", "false")
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None if empty)."""
+        with self._lock:
+            counts = list(self._counts)
+        total = sum(counts)
+        if not total:
+            return None
+        rank, seen = q * total, 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        with self._lock:
+            counts, total_sum = list(self._counts), self._sum
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {
+            "count": running,
+            "sum": round(total_sum, 6),
+            "buckets": cumulative,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+_histograms = {}
+_counters = {}
+_registry_lock = threading.Lock()
+
+
+def counter(name, **labels):
+    """Get or create the counter for name + labels."""
+    key = (name, tuple(sorted(labels.items())))
+    with _registry_lock:
+        if key not in _counters:
+            _counters[key] = Counter()
+        return _counters[key]
+
+
+def histogram(name, buckets=LATENCY_BUCKETS, **labels):
+    """Get or create the histogram for name + labels."""
+    key = (name, tuple(sorted(labels.items())))
+    with _registry_lock:
+        if key not in _histograms:
+            _histograms[key] = Histogram(buckets)
+        return _histograms[key]
+
+
+def snapshot(name=None):
+    """[{name, labels, count, sum, buckets, p50, p95, p99}] for every (or one) histogram."""
+    with _registry_lock:
+        items = list(_histograms.items())
+    return [
+        dict(name=key_name, labels=dict(labels), **h.snapshot())
+        for (key_name, labels), h in items
+        if name is None or key_name == name
+    ]
+
+
+def counters(prefix=""):
+    """[{name, labels, value}] for every counter whose name starts with prefix."""
+    with _registry_lock:
+        items = list(_counters.items())
+    return [
+        {"name": key_name, "labels": dict(labels), "value": round(c.value, 4)}
+        for (key_name, labels), c in items
+        if key_name.startswith(prefix)
+    ]
+
+
+# ---- spans ----
+_endpoint = contextvars.ContextVar("metrics_endpoint", default="background")
+_stage_histograms = {}  # (stage, endpoint) -> Histogram; skips the registry lock after first use
+
+
+def set_endpoint(endpoint):
+    """Label spans recorded by the current request with its endpoint."""
+    _endpoint.set(endpoint or "unknown")
+
+
+def observe_stage(stage, seconds, endpoint=None):
+    """Record a stage duration measured elsewhere (e.g. in a worker process)."""
+    if not ENABLED:
+        return
+    key = (stage, endpoint or _endpoint.get())
+    h = _stage_histograms.get(key)
+    if h is None:
+        h = _stage_histograms[key] = histogram("stage_seconds", STAGE_BUCKETS, stage=key[0], endpoint=key[1])
+    h.observe(seconds)
+
+
+def observe_request(endpoint, seconds):
+    """Whole-request latency, request_seconds{endpoint}."""
+    if ENABLED:
+        histogram("request_seconds", STAGE_BUCKETS, endpoint=endpoint or "unknown").observe(seconds)
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe_stage(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(stage):
+    """`with span("llm_call"): ...` times the block into stage_seconds."""
+    return _Span(stage) if ENABLED else _NO_SPAN
+
+
+# ---- Prometheus text format ----
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels, extra=()):
+    items = sorted(labels.items()) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def render_prometheus():
+    """Every counter and histogram in the Prometheus text exposition format (0.0.4)."""
+    lines, typed = [], set()
+    for c in sorted(counters(), key=lambda c: c["name"]):
+        name = c["name"] if c["name"].endswith("_total") else f"{c['name']}_total"
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_labels(c['labels'])} {c['value']}")
+    for h in sorted(snapshot(), key=lambda h: h["name"]):
+        name = h["name"]
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        for bound, count in h["buckets"].items():
+            lines.append(f"{name}_bucket{_labels(h['labels'], [('le', bound)])} {count}")
+        lines.append(f"{name}_sum{_labels(h['labels'])} {h['sum']}")
+        lines.append(f"{name}_count{_labels(h['labels'])} {h['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,107 @@
+"""
+Shared OpenAI client for the whole process.
+
+One httpx connection pool (keep-alive, HTTP/2 when `h2` is installed) with
+explicit connect/read timeouts. Retries are done here, not by the SDK:
+exponential backoff with full jitter, bounded by attempt count and by the
+caller's deadline, so a retry never outlives the provider timeout.
+Every call is timed into the `openai_request_seconds` histogram per model
+and endpoint.
+"""
+import os
+import time
+import random
+import logging
+import threading
+import importlib.util
+
+import httpx
+
+from service.metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+RETRY_BASE_SECONDS = float(os.getenv("OPENAI_RETRY_BASE_SECONDS", 0.25))
+RETRY_MAX_SECONDS = 4.0
+
+_http_client = None
+_openai_client = None
+_lock = threading.RLock()
+
+
+def get_http_client():
+    """Pooled keep-alive httpx client shared by every OpenAI call."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    http2=importlib.util.find_spec("h2") is not None,
+                    limits=httpx.Limits(
+                        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", 64)),
+                        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", 32)),
+                        keepalive_expiry=60,
+                    ),
+                    timeout=httpx.Timeout(
+                        connect=float(os.getenv("OPENAI_CONNECT_TIMEOUT", 3)),
+                        read=float(os.getenv("OPENAI_READ_TIMEOUT", 30)),
+                        write=10,
+                        pool=5,
+                    ),
+                )
+    return _http_client
+
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        with _lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                # OPENAI_BASE_URL is picked up by the SDK itself
+                _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"),
+                                        http_client=get_http_client(), max_retries=0)
+                print("✅ OpenAI client ready")
+    return _openai_client
+
+
+def _retryable(error):
+    import openai
+    if isinstance(error, (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code in (408, 409)
+
+
+def _backoff(attempt):
+    # Full jitter: uniform in [0, base * 2^attempt]
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt))
+
+
+def chat_completion(model, messages, timeout=None, stream=False, **kwargs):
+    """
+    chat.completions.create on the shared client with retries and timing.
+    For streams the histogram records the time until the response started.
+    """
+    client = get_openai_client()
+    deadline = time.monotonic() + timeout if timeout else None
+    latency = histogram("openai_request_seconds", model=model,
+                        endpoint="chat.completions.stream" if stream else "chat.completions")
+    attempt = 0
+    while True:
+        start = time.monotonic()
+        if deadline:
+            # timeout=None would disable the client's own timeouts, so only pass a real one
+            kwargs["timeout"] = deadline - start
+        try:
+            response = client.chat.completions.create(model=model, messages=messages, stream=stream, **kwargs)
+            latency.observe(time.monotonic() - start)
+            return response
+        except Exception as e:
+            delay = _backoff(attempt)
+            out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+            if attempt >= MAX_RETRIES or out_of_time or not _retryable(e):
+                raise
+            attempt += 1
+            logger.warning(f"OpenAI {model} call failed ({e}); retry {attempt}/{MAX_RETRIES} in {delay:.2f}s")
+            time.sleep(delay)
@@ -0,0 +1,66 @@
+"""
+Pre-generated question bank (QUESTION_BANK=on).
+
+Once a resume is parsed, one LLM call writes a ranked bank of questions
+covering skills, projects and one behavioral question. The bank is stored
+on the user hash (field "question_bank"). During the interview the next
+question comes from the bank instantly. The LLM is only called for a
+drill-down, which happens when the candidate gives a substantial answer
+(at least QUESTION_BANK_DRILL_WORDS words) to a bank question, at most
+QUESTION_BANK_MAX_DRILLS times per interview, or once the bank is used up.
+"""
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from service.session_store import get_store
+from service import codec
+
+logger = logging.getLogger(__name__)
+
+BANK_ENABLED = os.getenv("QUESTION_BANK", "off").lower() in ("1", "on", "true")
+BANK_SIZE = int(os.getenv("QUESTION_BANK_SIZE", 6))
+DRILL_WORDS = int(os.getenv("QUESTION_BANK_DRILL_WORDS", 60))
+MAX_DRILLS = int(os.getenv("QUESTION_BANK_MAX_DRILLS", 2))
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="question-bank")
+
+
+def _build_bank(user_id, resume_data):
+    from service.llm_model import generate_question_bank
+    bank = generate_question_bank(resume_data, BANK_SIZE)
+    if bank:
+        get_store().hset(f"user:{user_id}", "question_bank", codec.dumps(bank))
+    logger.info(f"Question bank for {user_id}: {len(bank)} questions")
+
+
+def submit_question_bank(user_id, resume_data):
+    """Generate the bank in the background (no-op unless QUESTION_BANK is on)."""
+    if BANK_ENABLED and resume_data:
+        _executor.submit(_build_bank, user_id, resume_data)
+
+
+def load_bank(raw):
+    try:
+        return codec.loads(raw) if raw else []
+    except (ValueError, codec.CodecError):
+        return []
+
+
+def next_bank_question(session, bank, answer):
+    """
+    Next bank question for this turn, or None when the LLM should write it
+    (drill-down or bank exhausted). Tracks progress in the session.
+    """
+    if not bank:
+        return None
+    drill = (session.get('last_from_bank') and session.get('drills', 0) < MAX_DRILLS
+             and len((answer or "").split()) >= DRILL_WORDS)
+    position = session.get('bank_next', 0)
+    if drill or position >= len(bank):
+        session['last_from_bank'] = False
+        session['drills'] = session.get('drills', 0) + int(drill)
+        return None
+    session['bank_next'] = position + 1
+    session['last_from_bank'] = True
+    return bank[position]['question']
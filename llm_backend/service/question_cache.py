@@ -0,0 +1,141 @@
+"""
+Near-duplicate cache for the follow-up to the interview opener.
+
+Most candidates answer "Tell me about yourself and your technical
+background." in much the same way, so the first generated question is
+cached. Entries are grouped by a signature of the resume's skills. Within a
+group, the answer is compared by the SimHash (64-bit, word 1- and 2-gram
+features) of its normalised text, and a hit needs a Hamming distance of at
+most QUESTION_CACHE_MAX_DISTANCE bits. Entries expire after
+QUESTION_CACHE_TTL seconds, and the cache holds at most
+QUESTION_CACHE_SIZE of them, evicting least recently used first
+(QUESTION_CACHE_SIZE=0 disables it).
+"""
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from service.metrics import counter
+
+_WORD_RE = re.compile(r"[a-z0-9+#.]+")
+_SKILLS_RE = re.compile(r"^Skills:\s*(.+)$", re.MULTILINE)
+SIGNATURE_SKILLS = 12
+STOP_WORDS = frozenset(
+    "a am an and are as at be been but by do for from had has have i im in is it its m me my of on or "
+    "so that the this to was we were with".split()
+)
+
+
+def normalize(text):
+    """Lowercased content words; punctuation, contractions and filler dropped."""
+    words = (w.strip(".") for w in _WORD_RE.findall((text or "").lower()))
+    return " ".join(w for w in words if w and w not in STOP_WORDS)
+
+
+def simhash(text, bits=64):
+    words = normalize(text).split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    weights = [0] * bits
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(bits):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+
+def skill_signature(resume_data):
+    """Order-insensitive hash of the resume's top skills (profile "Skills:" line)."""
+    match = _SKILLS_RE.search(resume_data or "")
+    if match:
+        skills = sorted({normalize(s) for s in match.group(1).split(",")[:SIGNATURE_SKILLS]} - {""})
+        basis = ",".join(skills)
+    else:
+        basis = normalize(resume_data)[:300]
+    return hashlib.sha1(basis.encode("utf-8")).hexdigest()[:16]
+
+
+class QuestionCache:
+    def __init__(self, max_entries, ttl, max_distance):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self._entries = OrderedDict()  # (signature, simhash) -> (question, latency, expires_at), LRU order
+        self._by_signature = {}  # signature -> set of simhashes
+        self._lock = threading.Lock()
+        self.hits = counter("question_cache_lookups", result="hit")
+        self.misses = counter("question_cache_lookups", result="miss")
+        self.saved = counter("question_cache_saved_seconds")
+
+    def _remove(self, key):
+        del self._entries[key]
+        fingerprints = self._by_signature[key[0]]
+        fingerprints.discard(key[1])
+        if not fingerprints:
+            del self._by_signature[key[0]]
+
+    def get(self, answer, resume_data):
+        """Cached follow-up for a near-identical answer on a similar resume, or None."""
+        if not self.max_entries:
+            return None
+        signature, fingerprint = skill_signature(resume_data), simhash(answer)
+        now = time.monotonic()
+        with self._lock:
+            best, best_distance = None, self.max_distance + 1
+            for candidate in list(self._by_signature.get(signature, ())):
+                key = (signature, candidate)
+                if self._entries[key][2] <= now:
+                    self._remove(key)
+                    continue
+                distance = bin(candidate ^ fingerprint).count("1")
+                if distance < best_distance:
+                    best, best_distance = key, distance
+            if best is None:
+                self.misses.inc()
+                return None
+            self._entries.move_to_end(best)
+            question, latency, _ = self._entries[best]
+        self.hits.inc()
+        self.saved.inc(latency)
+        return question
+
+    def put(self, answer, resume_data, question, latency):
+        """Remember a generated follow-up and how long the LLM took for it."""
+        if not self.max_entries:
+            return
+        key = (skill_signature(resume_data), simhash(answer))
+        with self._lock:
+            self._entries[key] = (question, latency, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._by_signature.setdefault(key[0], set()).add(key[1])
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self):
+        lookups = self.hits.value + self.misses.value
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "hit_rate": round(self.hits.value / lookups, 3) if lookups else 0.0,
+            "saved_seconds": round(self.saved.value, 3),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_question_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = QuestionCache(
+                    int(os.getenv("QUESTION_CACHE_SIZE", 2048)),
+                    float(os.getenv("QUESTION_CACHE_TTL", 86400)),
+                    int(os.getenv("QUESTION_CACHE_MAX_DISTANCE", 8)),
+                )
+    return _cache
@@ -0,0 +1,197 @@
+"""
+Final report generation off the request path.
+
+When the last answer is in, submit_answer only claims the report and hands
+it to a job; the candidate gets "finished, report pending" right away:
+
+    local  - a thread pool inside each web worker (default)
+    redis  - jobs pushed to the shared session store and drained by
+             `python -m service.report_jobs` worker processes
+
+The claim is report:{user_id}:status, set to "pending" with SET NX, so a
+retried submit (or a second worker) never generates the same report twice.
+A failed report is re-claimed with SET ... GET: exactly one caller swaps
+"failed" for "pending".
+The job waits for the answer evaluations, generates the report, writes
+report:{user_id} and drops the session and the status key in one pipeline.
+If the job fails the status becomes "failed", and the next submit may claim
+it again. A crashed job cannot block the user for longer than
+REPORT_LOCK_SECONDS.
+
+get_report uses report_status() and wait_for_report() (long-poll).
+"""
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from service import codec
+from service.session_store import get_store
+from service.job_queue import StoreJobQueue
+from service.interview_session import load_session, turns_key
+from service.evaluation_pipeline import wait_for_evaluations, evaluations_key
+from service.ai_model import generate_final_report
+from service.llm_model import end_session_context
+from service.report_store import save_report
+from service.metrics import span
+from service.transcript_summary import summary_key
+from service.token_budget import usage_key, flush_usage, log_interview_usage
+
+logger = logging.getLogger(__name__)
+
+JOBS_KEY = "report:jobs"
+REPORT_TTL = 86400
+LOCK_SECONDS = int(os.getenv("REPORT_LOCK_SECONDS", 300))
+
+STATUS_PENDING = "pending"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+STATUS_MISSING = "missing"
+
+
+def report_key(user_id):
+    return f"report:{user_id}"
+
+
+def status_key(user_id):
+    return f"report:{user_id}:status"
+
+
+def build_report(user_id, session_id):
+    """Generate and store the final report, then drop the session."""
+    # Give in-flight evaluations a bounded chance to land in the report
+    wait_for_evaluations(session_id)
+    session = load_session(session_id)
+    if not session:
+        get_store().delete(status_key(user_id))
+        return None
+    with span("report_generation"):
+        final_report_data = generate_final_report(session, session_id=session_id)
+    flush_usage()
+    pipe = get_store().pipeline()
+    pipe.setex(report_key(user_id), REPORT_TTL, codec.dumps(final_report_data))
+    pipe.delete(session_id)
+    pipe.delete(turns_key(session_id))
+    pipe.delete(evaluations_key(session_id))
+    pipe.delete(summary_key(session_id))
+    pipe.delete(status_key(user_id))
+    pipe.hgetall(usage_key(session_id))
+    pipe.delete(usage_key(session_id))
+    pipe.hgetall(f"user:{user_id}")
+    *_, usage, _, user_data = pipe.execute()
+    log_interview_usage(session_id, usage)
+    end_session_context(session_id)
+    # Durable copy, off the request path
+    save_report(user_id, user_data, final_report_data, session)
+    return final_report_data
+
+
+def fail_report(user_id, error):
+    logger.error(f"Report generation failed for {user_id}: {error}")
+    get_store().set(status_key(user_id), STATUS_FAILED, ex=LOCK_SECONDS)
+
+
+def _run(user_id, session_id):
+    try:
+        build_report(user_id, session_id)
+    except Exception as e:
+        fail_report(user_id, e)
+
+
+class LocalReportQueue:
+    """Thread pool owned by this web worker (report generation is I/O bound)."""
+
+    def __init__(self, workers):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="report")
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user_id, session_id):
+        with self._lock:
+            future = self._pool.submit(_run, user_id, session_id)
+            self._futures[user_id] = future
+        future.add_done_callback(lambda f: self._finished(user_id, f))
+
+    def _finished(self, user_id, future):
+        with self._lock:
+            if self._futures.get(user_id) is future:
+                del self._futures[user_id]
+
+    def wait(self, user_id, timeout):
+        with self._lock:
+            future = self._futures.get(user_id)
+        if future is not None:
+            try:
+                future.exception(timeout=timeout)
+            except Exception:
+                pass
+
+
+class RedisReportQueue(StoreJobQueue):
+    jobs_key = JOBS_KEY
+    name = "Report"
+
+    def submit(self, user_id, session_id):
+        self.push(user_id=user_id, session_id=session_id)
+
+    def run(self, job):
+        _run(job["user_id"], job["session_id"])
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_report_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                if os.getenv("REPORT_JOBS", "local").lower() == "redis":
+                    _queue = RedisReportQueue()
+                else:
+                    _queue = LocalReportQueue(int(os.getenv("REPORT_WORKERS", 4)))
+    return _queue
+
+
+def submit_report(user_id, session_id):
+    """Claim and queue the report for a finished session; False if one is already pending."""
+    store = get_store()
+    if not store.set(status_key(user_id), STATUS_PENDING, ex=LOCK_SECONDS, nx=True):
+        # Retry after a failed job: only the caller that swaps "failed" for
+        # "pending" claims it; concurrent retries see "pending" and back off
+        if store.getset(status_key(user_id), STATUS_PENDING, ex=LOCK_SECONDS) not in (STATUS_FAILED, None):
+            return False
+    get_report_queue().submit(user_id, session_id)
+    return True
+
+
+def report_status(user_id):
+    """(status, report) in one round trip; a pending job wins over an older report."""
+    pipe = get_store().pipeline()
+    pipe.get(status_key(user_id))
+    pipe.get(report_key(user_id))
+    status, report = pipe.execute()
+    if status:
+        return status, None
+    if report:
+        return STATUS_READY, codec.loads(report)
+    return STATUS_MISSING, None
+
+
+def wait_for_report(user_id, timeout, poll_interval=0.25):
+    """Long-poll: wait up to timeout seconds while the report is pending."""
+    deadline = time.monotonic() + timeout
+    get_report_queue().wait(user_id, timeout)
+    while True:
+        status, report = report_status(user_id)
+        if status != STATUS_PENDING or time.monotonic() >= deadline:
+            return status, report
+        time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    import app  # noqa: F401  binds SQLAlchemy so reports are also written to SQL
+    RedisReportQueue().run_worker()
@@ -0,0 +1,262 @@
+"""
+Durable copy of finished interviews in SQL (Candidate / FinalReport from
+models.py, DATABASE_URL; SQLite by default).
+
+Redis only keeps a report for 24 h. finish_interview() hands the report,
+transcript and candidate details to save_report(), which just puts them on a
+bounded queue (REPORT_QUEUE_SIZE). A background thread drains the queue in
+batches of up to REPORT_BATCH_SIZE, waiting at most REPORT_FLUSH_SECONDS for
+a batch to fill. Each batch is one transaction: candidates are upserted by
+email, then the reports are bulk-inserted. If another writer inserts one of
+the batch's candidates first, the unique email fails that transaction, and
+the rows are retried one at a time, so only a row that still fails is lost.
+If the queue is full the SQL write is dropped and counted, and the Redis
+copy is still served.
+
+load_report() is the SQL side of get_report, used once Redis has expired
+the report.
+
+SQLAlchemy is only imported on first use, so importing app.py stays cheap.
+The writer uses its own engine on the app's SQLALCHEMY_DATABASE_URI; Flask
+refuses db.init_app() once requests have been served. Relative SQLite paths
+resolve against the instance folder, as with Flask-SQLAlchemy. ensure_tables()
+creates missing tables, and adds the final_reports.public_id / transcript
+columns to databases created before they existed.
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+
+from service.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = int(os.getenv("REPORT_QUEUE_SIZE", 1000))
+BATCH_SIZE = int(os.getenv("REPORT_BATCH_SIZE", 100))
+FLUSH_SECONDS = float(os.getenv("REPORT_FLUSH_SECONDS", 1.0))
+
+# final_reports columns added after the table first shipped: name -> DDL type
+ADDED_COLUMNS = {"public_id": "VARCHAR(64)", "transcript": "TEXT"}
+
+_queue = queue.Queue(maxsize=QUEUE_SIZE)
+_app = None
+_engine = None
+_worker = None
+_tables_ready = False
+_lock = threading.RLock()
+
+_written = counter("report_writes", result="ok")
+_dropped = counter("report_writes", result="dropped")
+_failed = counter("report_writes", result="failed")
+
+
+def init_report_store(app):
+    """Remember the Flask app whose config the writer uses (no import, no connection yet)."""
+    global _app
+    _app = app
+
+
+def _database_url():
+    from sqlalchemy.engine import make_url
+    url = make_url(_app.config.get("SQLALCHEMY_DATABASE_URI") or "sqlite:///interview.db")
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:") \
+            and not os.path.isabs(url.database):
+        os.makedirs(_app.instance_path, exist_ok=True)
+        url = url.set(database=os.path.join(_app.instance_path, url.database))
+    return url
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                from sqlalchemy import create_engine
+                _engine = create_engine(_database_url(), pool_pre_ping=True)
+    return _engine
+
+
+def _add_missing_columns(engine):
+    from sqlalchemy import inspect, text
+    existing = {c["name"] for c in inspect(engine).get_columns("final_reports")}
+    missing = [name for name in ADDED_COLUMNS if name not in existing]
+    if not missing:
+        return
+    with engine.begin() as conn:
+        for name in missing:
+            conn.execute(text(f"ALTER TABLE final_reports ADD COLUMN {name} {ADDED_COLUMNS[name]}"))
+        if "public_id" in missing:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_final_reports_public_id ON final_reports (public_id)"))
+    logger.info(f"✅ final_reports migrated: added {', '.join(missing)}")
+
+
+def ensure_tables():
+    """Create missing tables (and columns) once per process."""
+    global _tables_ready
+    if not _tables_ready:
+        with _lock:
+            if not _tables_ready:
+                from models import db
+                engine = get_engine()
+                db.metadata.create_all(engine)
+                _add_missing_columns(engine)
+                _tables_ready = True
+
+
+def warm():
+    if _app is not None:
+        ensure_tables()
+
+
+def _start_worker():
+    global _worker
+    if _worker is None:
+        with _lock:
+            if _worker is None:
+                _worker = threading.Thread(target=_drain, name="report-writer", daemon=True)
+                _worker.start()
+
+
+def save_report(user_id, user_data, report, session):
+    """Queue a finished interview for the SQL write-behind (never blocks)."""
+    if _app is None:
+        return
+    item = {
+        "user_id": user_id,
+        "name": (user_data or {}).get("name") or "Unknown",
+        "email": (user_data or {}).get("email") or f"{user_id}@unknown.invalid",
+        "resume_text": (user_data or {}).get("resume_text", ""),
+        "resume_path": (user_data or {}).get("resume_path", ""),
+        "report": json.dumps(report),
+        "transcript": json.dumps((session or {}).get("data", [])),
+        # Naive UTC, like the DateTime columns
+        "finished_at": datetime.now(timezone.utc).replace(tzinfo=None),
+    }
+    try:
+        _queue.put_nowait(item)
+    except queue.Full:
+        _dropped.inc()
+        logger.warning(f"Report queue full, SQL copy of {user_id} dropped")
+        return
+    _start_worker()
+
+
+def _write_rows(batch):
+    from sqlalchemy import insert, select
+    from sqlalchemy.orm import Session
+    from models import Candidate, FinalReport
+    with Session(get_engine()) as session:
+        emails = {item["email"] for item in batch}
+        candidates = {
+            c.email: c
+            for c in session.execute(select(Candidate).where(Candidate.email.in_(emails))).scalars()
+        }
+        for item in batch:
+            candidate = candidates.get(item["email"])
+            if candidate is None:
+                candidate = Candidate(email=item["email"])
+                session.add(candidate)
+                candidates[item["email"]] = candidate
+            candidate.name = item["name"]
+            candidate.resume_text = item["resume_text"]
+            candidate.resume_path = item["resume_path"]
+        # New candidates go out as one multi-row INSERT; ids are needed below
+        session.flush()
+        session.execute(insert(FinalReport), [
+            {
+                "user_id": candidates[item["email"]].id,
+                "public_id": item["user_id"],
+                "report_text": item["report"],
+                "transcript": item["transcript"],
+                "created_at": item["finished_at"],
+            }
+            for item in batch
+        ])
+        session.commit()
+
+
+def _write(batch):
+    """Write a batch in one transaction; after a unique-email race, row by row."""
+    from sqlalchemy.exc import IntegrityError
+    ensure_tables()
+    try:
+        _write_rows(batch)
+        _written.inc(len(batch))
+        return
+    except IntegrityError as e:
+        logger.warning(f"Report batch of {len(batch)} conflicted with another writer, retrying per row: {e}")
+    # The conflicting candidate is committed now, so the upsert finds it
+    for item in batch:
+        try:
+            _write_rows([item])
+            _written.inc()
+        except Exception as e:
+            _failed.inc()
+            logger.error(f"Writing the report of {item['user_id']} to SQL failed: {e}")
+
+
+def _drain():
+    while True:
+        batch = [_queue.get()]
+        deadline = time.monotonic() + FLUSH_SECONDS
+        while len(batch) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            _write(batch)
+        except Exception as e:
+            _failed.inc(len(batch))
+            logger.error(f"Writing {len(batch)} report(s) to SQL failed: {e}")
+        finally:
+            for _ in batch:
+                _queue.task_done()
+
+
+def flush(timeout=10):
+    """Wait until every queued report is written (or timeout); True when drained."""
+    deadline = time.monotonic() + timeout
+    with _queue.all_tasks_done:
+        while _queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _queue.all_tasks_done.wait(remaining)
+    return True
+
+
+# Give queued reports a chance to land when the worker shuts down
+atexit.register(flush, 5)
+
+
+def load_report(user_id):
+    """{"name", "email", "report"} for the user's latest SQL report, or None."""
+    if _app is None:
+        return None
+    try:
+        from sqlalchemy import select
+        from models import Candidate, FinalReport
+        ensure_tables()
+        with get_engine().connect() as conn:
+            row = conn.execute(
+                select(Candidate.name, Candidate.email, FinalReport.report_text)
+                .join(FinalReport, FinalReport.user_id == Candidate.id)
+                .where(FinalReport.public_id == user_id)
+                .order_by(FinalReport.created_at.desc(), FinalReport.id.desc())
+                .limit(1)
+            ).first()
+    except Exception as e:
+        logger.error(f"SQL report lookup for {user_id} failed: {e}")
+        return None
+    if row is None:
+        return None
+    return {"name": row.name, "email": row.email, "report": json.loads(row.report_text)}
@@ -0,0 +1,111 @@
+"""
+Content-addressed cache of resume extraction results.
+
+Keyed by the SHA-256 of the uploaded bytes, so the same PDF re-uploaded for
+another job link (or re-sent by a recruiter) skips pdfplumber/python-docx and
+parse_resume12 entirely. Entries live in a small SQLite file, survive
+restarts, and are evicted least-recently-used once the total size exceeds
+RESUME_CACHE_MAX_BYTES.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = "data/resume_cache.sqlite3"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeCache:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            " digest TEXT PRIMARY KEY, text TEXT NOT NULL, parsed TEXT NOT NULL,"
+            " size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS resumes_lru ON resumes (last_access)")
+        self._db.commit()
+
+    def get(self, digest):
+        """Return (text, parsed) for a digest, or None on a miss."""
+        with self._lock:
+            row = self._db.execute("SELECT text, parsed FROM resumes WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE resumes SET last_access = ? WHERE digest = ?", (time.time(), digest))
+            self._db.commit()
+        return row[0], json.loads(row[1])
+
+    def put(self, digest, text, parsed):
+        parsed_json = json.dumps(parsed)
+        size = len(text.encode("utf-8")) + len(parsed_json.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO resumes (digest, text, parsed, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (digest, text, parsed_json, size, time.time()),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Drop least-recently-used entries until under max_bytes (lock held)."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM resumes").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for digest, size in self._db.execute("SELECT digest, size FROM resumes ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM resumes WHERE digest = ?", (digest,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            entries, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM resumes").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_resume_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResumeCache(
+                    os.getenv("RESUME_CACHE_PATH", DEFAULT_PATH),
+                    int(os.getenv("RESUME_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                )
+    return _cache
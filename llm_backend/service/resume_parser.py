@@ -6,7 +6,9 @@ import time
 import pdfplumber
 import docx
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator, Optional
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import logging
 import json
 
@@ -14,52 +16,73 @@ import json
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# parse_resume12 keeps this many characters for the LLM context window
+LLM_CONTEXT_CHARS = 4000
+
+# ========== PRECOMPILED PATTERNS ==========
+SECTION_HEADERS = [
+    "Objective", "Summary", "Profile", "Education", "Experience", "Work Experience",
+    "Projects", "Skills", "Technical Skills", "Achievements", "Awards",
+    "Extra[-_]?Curricular", "Activities", "Certifications", "NLP", "PCMC", "SSLC"
+]
+_HEADER_RE = re.compile("|".join(SECTION_HEADERS), re.IGNORECASE)
+# Case-sensitive scan over text.lower() is ~6x faster than IGNORECASE
+_HEADER_LOWER_RE = re.compile("|".join(h.lower() for h in SECTION_HEADERS))
+_CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+# Bullet glyphs -> "•", then every bullet marker starts a new line.
+# Plain str.replace beats translate()/regex here: absent glyphs cost a fast scan.
+_BULLET_REPLACEMENTS = (
+    ('\uf0b7', '•'), ('◦', '•'), ('▪', '•'), ('▫', '•'),
+    ('•', '\n•'), ('*', '\n*'), ('-', '\n-')
+)
+_EDUCATION_RES = [
+    re.compile(r"([^|,\n]+?)\s*[|,\n]\s*([\d.]+(?:CGPA|%)?)?\s*[|,\n]\s*(\d{4}[-\d]*)?\s*[|,\n]*(.*)", re.IGNORECASE),
+    re.compile(r"(\w+)\s+([\d.]+)\s+(\d{4}-\d{4})\s+(.*)", re.IGNORECASE)
+]
+_PROJECT_TITLE_RE = re.compile(r"[A-Z][A-Za-z\s]+(?:\(.*\))?$|\d+\.\s+[A-Z]")
+_SKILL_CATEGORY_RE = re.compile(r"([A-Za-z\s]+?):\s*(.*?)(?=\n[A-Za-z\s]+:|\n\n|$)", re.DOTALL | re.IGNORECASE)
+_SKILL_SPLIT_RE = re.compile(r'[,\n•*-]')
+_BULLET_SPLIT_RE = re.compile(r'\n[•*-]\s*')
+
 def clean_spacing(text: str) -> str:
     """Fix camelCase spacing and normalize whitespace"""
-    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    # str.split() splits on the same whitespace as \s+ and drops the ends
+    return " ".join(_CAMEL_RE.sub(" ", text).split())
 
 def normalize_bullets(text: str) -> str:
     """Convert various bullet styles to standard bullets"""
-    replacements = {
-        '\uf0b7': '•', '': '•', '◦': '•', '▪': '•', '▫': '•',
-        '•': '\n•', '*': '\n*', '-': '\n-'
-    }
-    for old, new in replacements.items():
+    for old, new in _BULLET_REPLACEMENTS:
         text = text.replace(old, new)
     return text
 
 def extract_sections(text: str) -> Dict[str, str]:
-    """Extract major resume sections using improved regex"""
-    headers = [
-        "Objective", "Summary", "Profile", "Education", "Experience", "Work Experience",
-        "Projects", "Skills", "Technical Skills", "Achievements", "Awards",
-        "Extra[-_]?Curricular", "Activities", "Certifications", "NLP", "PCMC", "SSLC"
-    ]
-    
-    # More robust section detection
-    pattern = r"(?mi)(?:" + "|".join(headers) + r")[\s:]*?(.*?)(?=(?:" + "|".join(headers) + r")[\s:]*?|$)"
-    matches = re.finditer(pattern, text, re.DOTALL | re.IGNORECASE)
-    
+    """
+    Extract major resume sections in one scan over the header matches.
+    A section runs from its header to the next header or the end of that line.
+    """
     sections = {}
-    for match in matches:
-        header = match.group(1).strip().lower().replace(" ", "_").replace("-", "_")
-        content = clean_spacing(match.group(2).strip())
-        sections[header] = content
+    lowered = text.lower()
+    # Offsets only line up when lower() kept every character 1:1; 'ſ'/'ı' fold to s/i under IGNORECASE only
+    if len(lowered) == len(text) and 'ſ' not in text and 'ı' not in text:
+        headers = list(_HEADER_LOWER_RE.finditer(lowered))
+    else:
+        headers = list(_HEADER_RE.finditer(text))
+    for i, match in enumerate(headers):
+        start = match.end()
+        stop = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        newline = text.find("\n", start, stop)
+        if newline != -1:
+            stop = newline
+        header = match.group(0).strip().lower().replace(" ", "_").replace("-", "_")
+        sections[header] = clean_spacing(text[start:stop].strip())
     
     return sections
 
 def parse_education_block(text: str) -> Dict[str, str]:
     """Parse education entries with | or comma separation"""
     # Handle common formats: "BE|8.5 CGPA|2021-2025|College Name"
-    patterns = [
-        r"([^|,\n]+?)\s*[|,\n]\s*([\d.]+(?:CGPA|%)?)?\s*[|,\n]\s*(\d{4}[-\d]*)?\s*[|,\n]*(.*)",
-        r"(\w+)\s+([\d.]+)\s+(\d{4}-\d{4})\s+(.*)"
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _EDUCATION_RES:
+        match = pattern.search(text)
         if match:
             return {
                 "stream": match.group(1).strip(),
@@ -69,31 +92,31 @@ def parse_education_block(text: str) -> Dict[str, str]:
             }
     return {"raw": text.strip()}
 
+def _is_project_title(line: str) -> bool:
+    if _PROJECT_TITLE_RE.match(line):
+        return True
+    first_word = line.split(None, 1)[0]
+    return len(first_word) <= 3 and first_word.isupper()
+
 def parse_projects(text: str) -> List[Dict[str, str]]:
     """Improved project parsing"""
-    lines = [clean_spacing(line.strip()) for line in text.split('\n') if line.strip()]
     projects = []
-    current_project = {"title": "", "description": []}
-    
-    for line in lines:
-        # Project title patterns
-        if (re.match(r"^[A-Z][A-Za-z\s]+(?:\(.*\))?$", line) or 
-            re.match(r"^\d+\.\s+[A-Z]", line) or
-            len(line.split()[0]) <= 3 and line.split()[0].isupper()):
-            
-            if current_project["title"]:
-                if current_project["description"]:
-                    current_project["description"] = " ".join(current_project["description"]).strip()
-                    projects.append(current_project)
-            
-            current_project = {"title": line.strip("•*- "), "description": []}
+    title, description = "", []
+    
+    for line in text.split('\n'):
+        if not line.strip():
+            continue
+        line = clean_spacing(line)
+        if _is_project_title(line):
+            if title and description:
+                projects.append({"title": title, "description": " ".join(description).strip()})
+            title, description = line.strip("•*- "), []
         else:
-            current_project["description"].append(line)
+            description.append(line)
     
     # Add last project
-    if current_project["title"] and current_project["description"]:
-        current_project["description"] = " ".join(current_project["description"]).strip()
-        projects.append(current_project)
+    if title and description:
+        projects.append({"title": title, "description": " ".join(description).strip()})
     
     return projects or [{"title": "Projects", "description": text.strip()}]
 
@@ -102,25 +125,19 @@ def parse_skills(text: str) -> Dict[str, List[str]]:
     skills = {"misc": []}
     
     # Category: Skills section
-    category_pattern = r"([A-Za-z\s]+?):\s*(.*?)(?=\n[A-Za-z\s]+:|\n\n|$)"
-    categories = re.findall(category_pattern, text, re.DOTALL | re.IGNORECASE)
-    
-    for category, items in categories:
+    for category, items in _SKILL_CATEGORY_RE.findall(text):
         category = category.strip().lower().replace(" ", "_")
-        skill_list = [s.strip() for s in re.split(r'[,\n•*-]', items) if s.strip()]
-        skills[category] = skill_list
+        skills[category] = [s.strip() for s in _SKILL_SPLIT_RE.split(items) if s.strip()]
     
     # Fallback: flat list
     if not any(skills.values()):
-        flat_skills = [s.strip() for s in re.split(r'[,\n•*-]', text) if s.strip()]
-        skills["misc"] = flat_skills
+        skills["misc"] = [s.strip() for s in _SKILL_SPLIT_RE.split(text) if s.strip()]
     
     return skills
 
 def parse_bullets(text: str) -> List[str]:
     """Extract bullet points"""
-    bullets = re.split(r'\n[•*-]\s*', text)
-    return [clean_spacing(b.strip()) for b in bullets if b.strip()]
+    return [clean_spacing(b.strip()) for b in _BULLET_SPLIT_RE.split(text) if b.strip()]
 
 def parse_resume12(raw_text: str) -> Dict[str, Any]:
     """Main resume parsing function - Production ready"""
@@ -160,20 +177,66 @@ def parse_resume12(raw_text: str) -> Dict[str, Any]:
         structured["extra_curricular"] = parse_bullets(sections["extra_curricular_activities"])[:10]
     
     # Add raw text for LLM context
-    structured["raw_text"] = raw_text[:4000]  # Truncate for LLM context window
+    structured["raw_text"] = raw_text[:LLM_CONTEXT_CHARS]  # Truncate for LLM context window
     
     return structured
 
 # ========== FILE EXTRACTION ==========
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """Extract text from PDF with error handling"""
-    try:
+_page_pool = None
+
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    global _page_pool
+    if _page_pool is None:
+        _page_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _page_pool
+
+def _extract_pages(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Worker: texts of pages [start, stop)"""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages[start:stop]]
+
+def iter_pdf_pages(pdf_path: str, workers: int = 1, budget: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield page texts in order.
+    workers > 1 spreads page ranges over a process pool (at most `workers` in flight);
+    budget stops once that many characters have been yielded.
+    """
+    collected = 0
+    if workers <= 1:
         with pdfplumber.open(pdf_path) as pdf:
-            text = ""
             for page in pdf.pages:
                 page_text = page.extract_text() or ""
-                text += page_text + "\n"
-            return text.strip()
+                yield page_text
+                collected += len(page_text)
+                if budget and collected >= budget:
+                    return
+        return
+
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+    # Whole ranges per worker amortise re-opening the PDF; single pages let a budget stop early
+    chunk = 1 if budget else -(-page_count // workers)
+    pool = _get_page_pool(workers)
+    in_flight = []
+    next_page = 0
+    try:
+        while next_page < page_count or in_flight:
+            while next_page < page_count and len(in_flight) < workers:
+                in_flight.append(pool.submit(_extract_pages, pdf_path, next_page, next_page + chunk))
+                next_page += chunk
+            for page_text in in_flight.pop(0).result():
+                yield page_text
+                collected += len(page_text)
+                if budget and collected >= budget:
+                    return
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+def extract_text_from_pdf(pdf_path: str, workers: int = 1, budget: Optional[int] = None) -> str:
+    """Extract text from PDF with error handling"""
+    try:
+        return "\n".join(iter_pdf_pages(pdf_path, workers, budget)).strip()
     except Exception as e:
         logger.error(f"PDF extraction failed: {e}")
         return ""
@@ -188,14 +251,14 @@ def extract_text_from_docx(docx_path: str) -> str:
         logger.error(f"DOCX extraction failed: {e}")
         return ""
 
-def extract_text(file_path: str) -> str:
-    """Universal text extraction"""
+def extract_text(file_path: str, workers: int = 1, budget: Optional[int] = None) -> str:
+    """Universal text extraction (workers/budget apply to PDFs)"""
     path = Path(file_path)
     if not path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
     
     if path.suffix.lower() == ".pdf":
-        return extract_text_from_pdf(str(path))
+        return extract_text_from_pdf(str(path), workers, budget)
     elif path.suffix.lower() in [".docx", ".doc"]:
         return extract_text_from_docx(str(path))
     else:
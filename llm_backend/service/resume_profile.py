@@ -0,0 +1,66 @@
+"""
+Compact resume "profile" sent to the question model instead of raw text.
+
+Built once at ingestion from the parse_resume12 structure: skills first, then
+projects, objective, education and achievements, cut to a token budget. If
+the parser found little, the rest of the budget is filled from the start of
+the raw text so the model never gets less context than it needs. A short resume
+whose profile would not be smaller than the text itself is used as is.
+"""
+import os
+
+from service.tokens import count_tokens, truncate_to_tokens
+
+PROFILE_TOKENS = int(os.getenv("RESUME_PROFILE_TOKENS", 350))
+MIN_STRUCTURED_TOKENS = 60
+
+
+def _skills(parsed):
+    seen = []
+    for items in (parsed.get("skills") or {}).values():
+        for skill in items:
+            skill = skill.strip(" :•*-")
+            if skill and skill.lower() not in (s.lower() for s in seen):
+                seen.append(skill)
+    return seen
+
+
+def _education(parsed):
+    entries = []
+    for level, block in (parsed.get("education") or {}).items():
+        if "raw" in block:
+            entries.append(f"{level.upper()} {block['raw']}")
+        else:
+            parts = [block.get("stream"), block.get("percentage"), block.get("duration"), block.get("institution")]
+            entries.append(f"{level.upper()} " + ", ".join(p for p in parts if p))
+    return entries
+
+
+def build_profile(parsed, raw_text, max_tokens=PROFILE_TOKENS):
+    """Token-budgeted digest of a parsed resume."""
+    lines = []
+    skills = _skills(parsed)
+    if skills:
+        lines.append("Skills: " + ", ".join(skills[:30]))
+    for project in (parsed.get("projects") or [])[:5]:
+        description = project.get("description", "")[:200]
+        lines.append(f"Project: {project.get('title', '')} - {description}".rstrip(" -"))
+    if parsed.get("objective"):
+        lines.append("Objective: " + parsed["objective"].strip(" :")[:200])
+    education = _education(parsed)
+    if education:
+        lines.append("Education: " + "; ".join(education))
+    if parsed.get("achievements"):
+        lines.append("Achievements: " + "; ".join(parsed["achievements"][:5]))
+
+    profile = truncate_to_tokens("\n".join(lines), max_tokens)
+    used = count_tokens(profile)
+    if used < MIN_STRUCTURED_TOKENS or used < max_tokens // 2:
+        excerpt = truncate_to_tokens(" ".join((raw_text or "").split()), max_tokens - used - 4)
+        if excerpt:
+            profile = f"{profile}\nResume excerpt: {excerpt}" if profile else excerpt
+    # Labels and the excerpt can outgrow a very short resume: never spend more tokens than the raw text
+    raw = (raw_text or "").strip()
+    if raw and count_tokens(raw) <= count_tokens(profile):
+        return raw
+    return profile
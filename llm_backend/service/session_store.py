@@ -0,0 +1,456 @@
+"""
+Shared session store used by app.py and the interview session service.
+
+Every backend speaks the same small Redis command subset through
+``execute(*command)`` (one round trip) and ``pipeline()`` (many commands,
+one round trip), so callers never care which one is active:
+
+    memory   - in-process dict with real TTL eviction (single worker / dev)
+    redis    - native protocol through a pooled redis-py client (REDIS_URL)
+    upstash  - Upstash REST API over a keep-alive HTTP connection pool
+
+Pick one with SESSION_STORE, otherwise it is inferred from the environment.
+"""
+import os
+import time
+import heapq
+import logging
+import threading
+import contextvars
+
+from service.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# Round trips made by the current request (None outside of a tracked request)
+_round_trips = contextvars.ContextVar("store_round_trips", default=None)
+
+
+def reset_round_trips():
+    """Start counting store round trips for the current request."""
+    _round_trips.set([0])
+
+
+def round_trips():
+    counter = _round_trips.get()
+    return counter[0] if counter else 0
+
+
+def _count_round_trip():
+    counter = _round_trips.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+# Commands timed as store_read; a pipeline with any other command is a store_write
+_READS = frozenset(("GET", "HGETALL", "LRANGE", "PING"))
+
+
+class SessionStoreError(Exception):
+    """Raised when a backend rejects a command."""
+
+
+def _to_dict(result):
+    """HGETALL comes back as a dict (redis-py) or a flat list (REST)."""
+    if not result:
+        return {}
+    if isinstance(result, dict):
+        return result
+    return dict(zip(result[::2], result[1::2]))
+
+
+class _Commands:
+    """High-level commands, shared by stores and pipelines."""
+
+    def _command(self, *command, parse=None):
+        raise NotImplementedError
+
+    def get(self, key):
+        return self._command("GET", key)
+
+    def set(self, key, value, ex=None, nx=False):
+        """True when written; with nx=True only if the key did not exist (a lock)."""
+        command = ["SET", key, value]
+        if ex:
+            command += ["EX", int(ex)]
+        if nx:
+            command.append("NX")
+        return self._command(*command, parse=bool)
+
+    def getset(self, key, value, ex=None):
+        """Write value and return the previous one, atomically (SET ... GET)."""
+        command = ["SET", key, value]
+        if ex:
+            command += ["EX", int(ex)]
+        return self._command(*command, "GET")
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value, ex=seconds)
+
+    def delete(self, key):
+        return self._command("DEL", key, parse=bool)
+
+    def expire(self, key, seconds):
+        return self._command("EXPIRE", key, int(seconds), parse=bool)
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        args = [part for pair in items.items() for part in pair]
+        return self._command("HSET", key, *args)
+
+    def hgetall(self, key):
+        return self._command("HGETALL", key, parse=_to_dict)
+
+    def hincrby(self, key, field, amount=1):
+        return self._command("HINCRBY", key, field, int(amount), parse=int)
+
+    def lpush(self, key, *values):
+        return self._command("LPUSH", key, *values)
+
+    def rpop(self, key):
+        return self._command("RPOP", key)
+
+    def rpush(self, key, *values):
+        return self._command("RPUSH", key, *values)
+
+    def lrange(self, key, start, stop):
+        return self._command("LRANGE", key, int(start), int(stop), parse=lambda r: list(r or []))
+
+    def lset(self, key, index, value):
+        return self._command("LSET", key, int(index), value, parse=bool)
+
+    def ping(self):
+        return self._command("PING", parse=bool)
+
+
+class SessionStore(_Commands):
+    """Common interface; backends implement _send() and _send_many()."""
+
+    name = "base"
+
+    def _send(self, command):
+        raise NotImplementedError
+
+    def _send_many(self, commands):
+        return [self._send(command) for command in commands]
+
+    def execute(self, *command):
+        """Run one command in one round trip."""
+        _count_round_trip()
+        with span("store_read" if command[0] in _READS else "store_write"):
+            return self._send(command)
+
+    def execute_many(self, commands):
+        """Run several commands in a single round trip."""
+        if not commands:
+            return []
+        _count_round_trip()
+        with span("store_read" if all(c[0] in _READS for c in commands) else "store_write"):
+            return self._send_many(commands)
+
+    def pipeline(self):
+        return Pipeline(self)
+
+    def _command(self, *command, parse=None):
+        result = self.execute(*command)
+        return parse(result) if parse else result
+
+
+class Pipeline(_Commands):
+    """Buffers commands and sends them together on execute().
+
+        pipe = r.pipeline()
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, ttl)
+        pipe.execute()
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._commands = []
+        self._parsers = []
+
+    def _command(self, *command, parse=None):
+        self._commands.append(command)
+        self._parsers.append(parse)
+        return self
+
+    def execute(self):
+        commands, parsers = self._commands, self._parsers
+        self._commands, self._parsers = [], []
+        results = self.store.execute_many(commands)
+        return [parse(result) if parse else result for parse, result in zip(parsers, results)]
+
+
+class MemoryStore(SessionStore):
+    """In-process store with TTL eviction, safe to share between threads."""
+
+    name = "memory"
+
+    def __init__(self, sweep_every=256):
+        self.data = {}
+        self._expires = {}
+        self._heap = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._sweep_every = sweep_every
+        self._commands = {
+            "GET": self._get,
+            "SET": self._set,
+            "DEL": self._del,
+            "EXPIRE": self._expire,
+            "HSET": self._hset,
+            "HGETALL": self._hgetall,
+            "HINCRBY": self._hincrby,
+            "LPUSH": self._lpush,
+            "RPOP": self._rpop,
+            "RPUSH": self._rpush,
+            "LRANGE": self._lrange,
+            "LSET": self._lset,
+            "PING": lambda: "PONG",
+        }
+
+    def _run(self, command):
+        handler = self._commands.get(str(command[0]).upper())
+        if handler is None:
+            raise SessionStoreError(f"Unsupported command: {command[0]}")
+        return handler(*command[1:])
+
+    def _send(self, command):
+        with self._lock:
+            return self._run(command)
+
+    def _send_many(self, commands):
+        with self._lock:
+            return [self._run(command) for command in commands]
+
+    # ---- expiry bookkeeping (caller holds the lock) ----
+    def _alive(self, key):
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._evict(key)
+            return False
+        return key in self.data
+
+    def _evict(self, key):
+        self.data.pop(key, None)
+        self._expires.pop(key, None)
+
+    def _set_ttl(self, key, seconds):
+        deadline = time.monotonic() + seconds
+        self._expires[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes % self._sweep_every == 0:
+            self._sweep()
+
+    def _sweep(self):
+        """Drop every key whose deadline has passed, then compact the heap."""
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now:
+            deadline, key = heapq.heappop(self._heap)
+            # A later EXPIRE/SET may have moved or cleared the deadline
+            if self._expires.get(key) == deadline:
+                self._evict(key)
+        # Every EXPIRE pushes a new entry: rebuild once stale ones outnumber live deadlines
+        if len(self._heap) > 2 * len(self._expires):
+            self._heap = [(deadline, key) for key, deadline in self._expires.items()]
+            heapq.heapify(self._heap)
+
+    # ---- commands ----
+    def _get(self, key):
+        return self.data.get(key) if self._alive(key) else None
+
+    def _set(self, key, value, *options):
+        options = [str(o).upper() if isinstance(o, str) else o for o in options]
+        if "NX" in options and self._alive(key):
+            return None
+        previous = self.data.get(key) if self._alive(key) else None
+        self.data[key] = value
+        self._expires.pop(key, None)
+        if "EX" in options:
+            self._set_ttl(key, int(options[options.index("EX") + 1]))
+        self._wrote()
+        return previous if "GET" in options else "OK"
+
+    def _del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                self._evict(key)
+                removed += 1
+        return removed
+
+    def _expire(self, key, seconds):
+        if not self._alive(key):
+            return 0
+        self._set_ttl(key, int(seconds))
+        self._wrote()
+        return 1
+
+    def _hset(self, key, *args):
+        if not self._alive(key):
+            self.data[key] = {}
+        bucket = self.data[key]
+        added = 0
+        for field, value in zip(args[::2], args[1::2]):
+            added += field not in bucket
+            bucket[field] = value
+        self._wrote()
+        return added
+
+    def _hgetall(self, key):
+        return dict(self.data[key]) if self._alive(key) else {}
+
+    def _hincrby(self, key, field, amount):
+        if not self._alive(key):
+            self.data[key] = {}
+        bucket = self.data[key]
+        bucket[field] = str(int(bucket.get(field, 0)) + int(amount))
+        self._wrote()
+        return int(bucket[field])
+
+    def _lpush(self, key, *values):
+        if not self._alive(key):
+            self.data[key] = []
+        self.data[key][:0] = reversed(values)
+        self._wrote()
+        return len(self.data[key])
+
+    def _rpop(self, key):
+        if not self._alive(key) or not self.data[key]:
+            return None
+        value = self.data[key].pop()
+        if not self.data[key]:
+            self._evict(key)
+        return value
+
+    def _rpush(self, key, *values):
+        if not self._alive(key):
+            self.data[key] = []
+        self.data[key].extend(values)
+        self._wrote()
+        return len(self.data[key])
+
+    def _lrange(self, key, start, stop):
+        if not self._alive(key):
+            return []
+        items = self.data[key]
+        start, stop = int(start), int(stop)
+        # Redis: inclusive stop, negative indexes count from the end
+        stop = len(items) + stop if stop < 0 else stop
+        return items[max(0, len(items) + start if start < 0 else start):stop + 1]
+
+    def _lset(self, key, index, value):
+        if not self._alive(key):
+            raise SessionStoreError("ERR no such key")
+        try:
+            self.data[key][int(index)] = value
+        except IndexError:
+            raise SessionStoreError("ERR index out of range")
+        self._wrote()
+        return "OK"
+
+
+class RedisStore(SessionStore):
+    """Native Redis protocol with a shared, bounded connection pool."""
+
+    name = "redis"
+
+    def __init__(self, url):
+        import redis
+
+        self.pool = redis.ConnectionPool.from_url(
+            url,
+            max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", 20)),
+            socket_connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", 2)),
+            socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", 5)),
+            health_check_interval=30,
+            decode_responses=True,
+        )
+        self.client = redis.Redis(connection_pool=self.pool)
+
+    def _send(self, command):
+        return self.client.execute_command(*command)
+
+    def _send_many(self, commands):
+        pipe = self.client.pipeline(transaction=False)
+        for command in commands:
+            pipe.execute_command(*command)
+        return pipe.execute()
+
+
+class UpstashStore(SessionStore):
+    """Upstash REST API; one keep-alive HTTP client for the whole process."""
+
+    name = "upstash"
+
+    def __init__(self, url, token):
+        import httpx
+
+        self.http = httpx.Client(
+            base_url=url.rstrip("/"),
+            headers={"Authorization": f"Bearer {token}"},
+            timeout=httpx.Timeout(float(os.getenv("UPSTASH_TIMEOUT", 5)), connect=2.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+
+    @staticmethod
+    def _result(body):
+        if "error" in body:
+            raise SessionStoreError(body["error"])
+        return body.get("result")
+
+    def _send(self, command):
+        return self._result(self.http.post("/", json=list(command)).json())
+
+    def _send_many(self, commands):
+        response = self.http.post("/pipeline", json=[list(command) for command in commands])
+        return [self._result(body) for body in response.json()]
+
+
+def create_store(backend=None):
+    """Build a store for the given backend name (or the one the env implies)."""
+    backend = (backend or os.getenv("SESSION_STORE") or "").lower()
+    if not backend:
+        if os.getenv("UPSTASH_REDIS_REST_URL"):
+            backend = "upstash"
+        elif os.getenv("REDIS_URL"):
+            backend = "redis"
+        else:
+            backend = "memory"
+
+    if backend == "upstash":
+        store = UpstashStore(os.getenv("UPSTASH_REDIS_REST_URL"), os.getenv("UPSTASH_REDIS_REST_TOKEN"))
+    elif backend == "redis":
+        store = RedisStore(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    elif backend == "memory":
+        return MemoryStore()
+    else:
+        raise ValueError(f"Unknown SESSION_STORE backend: {backend}")
+
+    store.ping()
+    return store
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Process-wide store shared by every module (falls back to memory)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    _store = create_store()
+                except Exception as e:
+                    logger.warning(f"Session store unavailable, using memory fallback: {e}")
+                    _store = MemoryStore()
+                logger.info(f"✅ Session store ready: {_store.name}")
+    return _store
@@ -0,0 +1,235 @@
+"""
+Structured (JSON) output for the LLM calls that return JSON.
+
+Each such call kind has a JSON schema. With LLM_STRUCTURED_OUTPUT=schema
+(default) the providers constrain decoding to it:
+
+    openai  - response_format json_schema (strict); "json" asks for JSON mode only
+    local   - a llama.cpp grammar built from the schema (in-process model; the
+              batching llama_server.py samples unconstrained)
+    mock    - already returns valid JSON
+
+parse_json() is the one place replies are parsed. It tries, in order: the
+reply as is; the first JSON object inside markdown fences or prose; and a
+repair of output cut off at max_tokens (open strings and brackets closed,
+trailing commas and half-written members dropped). Each outcome is counted as
+llm_json_parse{kind,result=ok|repaired|failed}. A reply that would have cost a
+canned fallback (and a wasted call) is usually still usable.
+
+QuestionStream pulls the "question" string out of a streamed JSON reply as
+it arrives, so the streaming endpoint can use the same prompt and schema as
+the plain one.
+"""
+import os
+import re
+import json
+import logging
+
+from service.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+MODE = os.getenv("LLM_STRUCTURED_OUTPUT", "schema").lower()
+# Repair attempts that cut back to an earlier comma
+MAX_REPAIR_CUTS = 8
+
+
+def _object(**properties):
+    # strict mode: every property required, nothing else allowed
+    return {"type": "object", "properties": properties,
+            "required": list(properties), "additionalProperties": False}
+
+
+_STRING = {"type": "string"}
+
+SCHEMAS = {
+    "question": _object(question={"type": ["string", "null"]}, terminate={"type": "boolean"}),
+    "evaluation": _object(
+        evaluation=_object(score={"type": "number"}, feedback=_STRING),
+        next_question=_object(question=_STRING, type=_STRING),
+        stop={"type": "boolean"},
+    ),
+    "question_bank": _object(
+        questions={"type": "array", "items": _object(question=_STRING, type=_STRING, topic=_STRING)},
+    ),
+    "report": _object(
+        candidate_overview=_object(name=_STRING, summary=_STRING),
+        overall_performance=_object(average_score={"type": "number"}, performance_level=_STRING),
+        strengths={"type": "array", "items": _STRING},
+        final_recommendation=_object(decision=_STRING, justification=_STRING),
+    ),
+}
+
+
+def schema_for(kind):
+    """JSON schema constraining this call kind, or None."""
+    if MODE != "schema":
+        return None
+    return SCHEMAS.get(kind)
+
+
+def response_format(kind):
+    """OpenAI response_format for this call kind, or None."""
+    if kind not in SCHEMAS or MODE not in ("schema", "json"):
+        return None
+    if MODE == "json":
+        return {"type": "json_object"}
+    return {"type": "json_schema", "json_schema": {"name": kind, "schema": SCHEMAS[kind], "strict": True}}
+
+
+# ---- tolerant parsing ----
+_FENCE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_DANGLING = re.compile(r'(?:,\s*|(?<=[{\[])\s*)(?:"(?:[^"\\]|\\.)*"\s*:?\s*)?$')
+_decoder = json.JSONDecoder()
+
+
+def _close(fragment):
+    """fragment with open strings and brackets closed."""
+    stack, in_string, escape = [], False, False
+    for ch in fragment:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]" and stack:
+            stack.pop()
+    if in_string:
+        fragment += "\\" if escape else ""
+        fragment += '"'
+    fragment = _DANGLING.sub("", fragment.rstrip())
+    return fragment + "".join("}" if ch == "{" else "]" for ch in reversed(stack))
+
+
+def _repair(fragment):
+    fragment = _TRAILING_COMMA.sub(r"\1", fragment)
+    for _ in range(MAX_REPAIR_CUTS):
+        try:
+            return json.loads(_close(fragment))
+        except ValueError:
+            cut = fragment.rfind(",")
+            if cut <= 0:
+                break
+            fragment = fragment[:cut]
+    raise ValueError("Unrecoverable JSON")
+
+
+def _parse(text):
+    """(value, repaired)"""
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object in reply")
+    fragment = _FENCE.sub("", text[start:])
+    try:
+        return _decoder.raw_decode(fragment)[0], True
+    except ValueError:
+        return _repair(fragment), True
+
+
+def parse_json(text, kind=None):
+    """Parse an LLM JSON reply tolerantly; raises ValueError (counted) when nothing usable is left."""
+    kind = kind or "text"
+    try:
+        value, repaired = _parse((text or "").strip())
+        if not isinstance(value, dict):
+            raise ValueError(f"Expected a JSON object, got {type(value).__name__}")
+    except ValueError as e:
+        counter("llm_json_parse", kind=kind, result="failed").inc()
+        logger.warning(f"Unparseable {kind} reply ({e}): {(text or '')[:200]!r}")
+        raise
+    counter("llm_json_parse", kind=kind, result="repaired" if repaired else "ok").inc()
+    return value
+
+
+# ---- streaming ----
+_QUESTION_KEY = re.compile(r'"question"\s*:\s*"')
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class QuestionStream:
+    """
+    Incremental extraction of the "question" string from a streamed JSON
+    reply: feed() each chunk and get back the newly decoded question text.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.question = ""
+        self.found = False
+        self.done = False
+        self._pos = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = _QUESTION_KEY.search(self.text)
+            if not match:
+                return ""
+            self.found = True
+            self._pos = match.end()
+        text, i, out = self.text, self._pos, []
+        while i < len(text):
+            ch = text[i]
+            if ch == '"':
+                self.done = True
+                i += 1
+                break
+            if ch != "\\":
+                out.append(ch)
+                i += 1
+                continue
+            # Escapes may be split across chunks: wait for the rest
+            if i + 1 >= len(text):
+                break
+            if text[i + 1] != "u":
+                out.append(_ESCAPES.get(text[i + 1], text[i + 1]))
+                i += 2
+                continue
+            if i + 6 > len(text):
+                break
+            code = int(text[i + 2:i + 6], 16) if re.fullmatch(r"[0-9a-fA-F]{4}", text[i + 2:i + 6]) else 0xFFFD
+            if 0xD800 <= code < 0xDC00:
+                # Surrogate pair: \\uD83D\\uDE00
+                if i + 12 > len(text):
+                    break
+                low = text[i + 8:i + 12]
+                if text[i + 6:i + 8] == "\\u" and re.fullmatch(r"[dD][c-fC-F][0-9a-fA-F]{2}", low):
+                    code = 0x10000 + ((code - 0xD800) << 10) + (int(low, 16) - 0xDC00)
+                    i += 6
+                else:
+                    code = 0xFFFD
+            out.append(chr(code))
+            i += 6
+        self._pos = i
+        piece = "".join(out)
+        self.question += piece
+        return piece
+
+    def finish(self, kind="question"):
+        """
+        The whole reply as parse_json would return it, with "question" set to
+        what was streamed. ValueError when the reply had no question and is no
+        JSON either (plain text is never passed on as a question).
+        """
+        try:
+            reply = parse_json(self.text, kind)
+        except ValueError:
+            if not self.found:
+                raise
+            reply = {}
+        if self.found:
+            reply["question"] = self.question.strip()
+        return reply
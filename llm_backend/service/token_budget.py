@@ -0,0 +1,156 @@
+"""
+Per-call token budgets and usage accounting.
+
+Candidate text is fitted to a budget before it goes into a prompt, so one
+very long answer (or resume) cannot blow up latency or cost:
+
+    question     resume QUESTION_RESUME_TOKENS, last answer ANSWER_TOKENS
+    evaluation   question QUESTION_TOKENS, answer ANSWER_TOKENS
+    report       compact transcript of REPORT_TRANSCRIPT_TOKENS; short answers
+                 stay whole and the long ones share what is left; turns already
+                 folded into the rolling summary (transcript_summary) are
+                 replaced by it
+
+max_tokens comes from the JSON each call asks for (OUTPUT_TOKENS), not from a
+generous constant.
+
+Usage is counted locally (service.tokens) around every llm_provider call. It
+is logged per call and added to the llm_tokens{kind,type} counters. It is also
+summed per interview in the "{session_id}:usage" hash, which build_report logs
+and drops when the interview ends. That hash is written by a background thread,
+so accounting costs no store round trip on the request path.
+"""
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from service.tokens import count_tokens, truncate_to_tokens, trim_middle
+from service.session_store import get_store
+from service.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+RESUME_TOKENS = int(os.getenv("QUESTION_RESUME_TOKENS", 1200))
+ANSWER_TOKENS = int(os.getenv("ANSWER_TOKENS", 600))
+QUESTION_TOKENS = int(os.getenv("QUESTION_TOKENS", 150))
+REPORT_TRANSCRIPT_TOKENS = int(os.getenv("REPORT_TRANSCRIPT_TOKENS", 3000))
+USAGE_TTL = 86400
+
+# Expected completion per call kind: the JSON the prompt asks for, with headroom
+OUTPUT_TOKENS = {
+    "question": 120,       # {"question": "..."}; local models may add a little prose
+    "evaluation": 160,     # score, one-line feedback, next question
+    "question_bank": 50,   # per question: {"question", "type", "topic"}
+    "report": 500,         # overview, performance, strengths, recommendation
+    "summary": int(os.getenv("SUMMARY_TOKENS", 300)),  # rolling transcript summary
+}
+DEFAULT_OUTPUT_TOKENS = 200
+
+_usage_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="token-usage")
+
+
+def max_tokens_for(kind, count=1):
+    """max_tokens for a call of this kind producing count items."""
+    return OUTPUT_TOKENS.get(kind, DEFAULT_OUTPUT_TOKENS) * count + (20 if count > 1 else 0)
+
+
+def fit_resume(resume_data):
+    return truncate_to_tokens(resume_data or "", RESUME_TOKENS)
+
+
+def fit_answer(answer):
+    return trim_middle(answer or "", ANSWER_TOKENS)
+
+
+def fit_question(question):
+    return truncate_to_tokens(question or "", QUESTION_TOKENS)
+
+
+def _turn_text(number, question, answer, evaluation):
+    lines = [f"Q{number}: {question}", f"A{number}: {answer}"]
+    if isinstance(evaluation, dict) and evaluation.get("score") is not None:
+        lines.append(f"Score: {evaluation['score']}/10 - {evaluation.get('feedback', '')}")
+    return "\n".join(lines)
+
+
+def _earlier_turns(turns, summary):
+    """Rolling summary in place of the turns it covers, plus their scores."""
+    scores = ", ".join(
+        f"Q{i + 1} {turn['evaluation']['score']}/10"
+        for i, turn in enumerate(turns)
+        if isinstance(turn.get("evaluation"), dict) and turn["evaluation"].get("score") is not None
+    )
+    return f"Q1-Q{len(turns)} (summary): {summary}" + (f"\nScores: {scores}" if scores else "")
+
+
+def format_transcript(turns, max_tokens=REPORT_TRANSCRIPT_TOKENS, summary=None):
+    """
+    Q/A/score lines for the answered turns, trimmed to fit max_tokens.
+    summary ({"through", "text"} from transcript_summary) replaces the turns it covers.
+    """
+    turns = turns or []
+    through = (summary or {}).get("through", 0) if (summary or {}).get("text") else 0
+    earlier = _earlier_turns(turns[:through], summary["text"]) if through else ""
+    answered = [(number, turn) for number, turn in enumerate(turns[through:], through + 1) if turn.get("answer")]
+    if not answered:
+        return earlier or "(no answers)"
+    numbers = [number for number, _ in answered]
+    answered = [turn for _, turn in answered]
+    questions = [fit_question(turn["question"]) for turn in answered]
+    fixed = count_tokens(earlier) + sum(count_tokens(_turn_text(n, q, "", turn.get("evaluation")))
+                                        for n, q, turn in zip(numbers, questions, answered))
+    # Short answers keep every token; the rest split what is left evenly
+    remaining = max(len(answered) * 32, max_tokens - fixed)
+    by_size = sorted(range(len(answered)), key=lambda i: count_tokens(answered[i]["answer"]))
+    answers = {}
+    for position, i in enumerate(by_size):
+        share = remaining // (len(answered) - position)
+        answers[i] = trim_middle(answered[i]["answer"], share)
+        remaining -= count_tokens(answers[i])
+    return "\n\n".join(filter(None, [earlier] + [
+        _turn_text(numbers[i], questions[i], answers[i], answered[i].get("evaluation"))
+        for i in range(len(answered))
+    ]))
+
+
+def usage_key(session_id):
+    """Per-interview token totals: prompt, completion, calls."""
+    return f"{session_id}:usage"
+
+
+def _add_to_session(session_id, prompt_tokens, completion_tokens):
+    try:
+        pipe = get_store().pipeline()
+        pipe.hincrby(usage_key(session_id), "prompt", prompt_tokens)
+        pipe.hincrby(usage_key(session_id), "completion", completion_tokens)
+        pipe.hincrby(usage_key(session_id), "calls", 1)
+        pipe.expire(usage_key(session_id), USAGE_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Token usage for {session_id} not recorded: {e}")
+
+
+def record_usage(kind, prompt_tokens, completion_tokens, session_id=None):
+    """Count one LLM call: log line, llm_tokens counters and the interview's total."""
+    kind = kind or "text"
+    counter("llm_tokens", kind=kind, type="prompt").inc(prompt_tokens)
+    counter("llm_tokens", kind=kind, type="completion").inc(completion_tokens)
+    logger.info(f"🧮 {kind}: {prompt_tokens} prompt + {completion_tokens} completion tokens")
+    if session_id:
+        _usage_writer.submit(_add_to_session, session_id, prompt_tokens, completion_tokens)
+
+
+def flush_usage(timeout=5):
+    """Wait for queued per-interview usage writes from this process."""
+    try:
+        _usage_writer.submit(lambda: None).result(timeout=timeout)
+    except Exception:
+        pass
+
+
+def log_interview_usage(session_id, usage):
+    """Log the totals read from usage_key(session_id); returns them as ints."""
+    totals = {field: int((usage or {}).get(field, 0)) for field in ("prompt", "completion", "calls")}
+    logger.info(f"🧮 Interview {session_id}: {totals['calls']} LLM calls, "
+                f"{totals['prompt']} prompt + {totals['completion']} completion tokens")
+    return totals
@@ -0,0 +1,64 @@
+"""
+Local prompt-token counting.
+
+Uses tiktoken (o200k_base, the gpt-4o family encoding) when it is installed
+and its encoding file is available, otherwise ~4 characters per token.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.info(f"tiktoken unavailable, estimating tokens from length: {e}")
+    return _encoding
+
+
+def count_tokens(text):
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to at most max_tokens tokens."""
+    if not text or max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+def trim_middle(text, max_tokens, marker=" [...] "):
+    """Fit text into max_tokens keeping its start and end (long answers conclude at the end)."""
+    if not text or count_tokens(text) <= max_tokens:
+        return text or ""
+    budget = max_tokens - count_tokens(marker)
+    if budget <= 0:
+        return truncate_to_tokens(text, max_tokens)
+    head = truncate_to_tokens(text, budget * 2 // 3)
+    tail_budget = budget - count_tokens(head)
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        tail = encoding.decode(tokens[-tail_budget:]) if tail_budget > 0 else ""
+    else:
+        tail = text[-tail_budget * CHARS_PER_TOKEN:] if tail_budget > 0 else ""
+    return head + marker + tail
@@ -0,0 +1,146 @@
+"""
+Rolling transcript summary for long interviews.
+
+The last SUMMARY_KEEP_TURNS answered turns stay verbatim. Older turns are
+folded into a running summary of at most SUMMARY_TOKENS, stored as
+"{session_id}:summary" = {"through": n, "text": ...} where n is the number of
+turns folded so far. After each answer a background thread folds whatever has
+fallen out of the verbatim window with one LLM call (kind "summary"). If no
+LLM is available or the call fails, it appends an extractive line per turn
+instead. The request thread never waits for it.
+
+The question prompt gets interview_context(session): the summary plus the
+recent turns. The report prompt gets the summary in place of the folded
+turns (see token_budget.format_transcript). Both stay flat no matter how
+long the interview runs.
+"""
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from service import codec
+from service.session_store import get_store
+from service.llm_provider import complete, llm_available, LLMError
+from service.tokens import truncate_to_tokens, trim_middle
+from service.token_budget import fit_question, max_tokens_for
+
+logger = logging.getLogger(__name__)
+
+KEEP_TURNS = int(os.getenv("SUMMARY_KEEP_TURNS", 2))
+SUMMARY_TOKENS = int(os.getenv("SUMMARY_TOKENS", 300))
+RECENT_ANSWER_TOKENS = int(os.getenv("SUMMARY_RECENT_ANSWER_TOKENS", 300))
+# Extractive fallback: this much of each folded answer
+FOLD_ANSWER_TOKENS = 60
+SUMMARY_TTL = 86400
+
+SUMMARY_PROMPT = """You are keeping notes on a job interview for the hiring panel.
+
+# Notes So Far:
+{summary}
+
+# New Turns:
+{turns}
+
+Update the notes with the new turns: topics covered, what the candidate claimed or built, strengths and gaps.
+Return only the updated notes, plain text, at most {words} words."""
+
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("SUMMARY_WORKERS", 4)),
+                           thread_name_prefix="summary")
+# session_id -> answered turns not yet folded (0: job running, nothing new)
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def summary_key(session_id):
+    return f"{session_id}:summary"
+
+
+def _turn_lines(first_number, turns, answer_tokens):
+    return "\n".join(
+        f"Q{first_number + i}: {fit_question(turn.get('question'))}\n"
+        f"A{first_number + i}: {trim_middle(turn.get('answer') or '', answer_tokens)}"
+        for i, turn in enumerate(turns)
+    )
+
+
+def _extractive(summary, first_number, turns):
+    text = "\n".join(filter(None, [summary, _turn_lines(first_number, turns, FOLD_ANSWER_TOKENS)]))
+    return trim_middle(text, SUMMARY_TOKENS)
+
+
+def fold_turns(summary, first_number, turns, session_id=None):
+    """New summary text with turns (numbered from first_number) folded in."""
+    if not llm_available():
+        return _extractive(summary, first_number, turns)
+    prompt = SUMMARY_PROMPT.format(summary=summary or "(none yet)",
+                                   turns=_turn_lines(first_number, turns, SUMMARY_TOKENS),
+                                   words=SUMMARY_TOKENS * 3 // 4)
+    try:
+        text = complete(prompt, kind="summary", temperature=0.2,
+                        max_tokens=max_tokens_for("summary"), usage_id=session_id)
+    except LLMError as e:
+        logger.warning(f"Summary fallback for {session_id}: {e}")
+        return _extractive(summary, first_number, turns)
+    return truncate_to_tokens(text.strip(), SUMMARY_TOKENS) or _extractive(summary, first_number, turns)
+
+
+def _fold(session_id, answered):
+    until = answered - KEEP_TURNS
+    if until <= 0:
+        return
+    # Imported here: interview_session calls into this module
+    from service.interview_session import turns_key
+    store = get_store()
+    raw = store.get(summary_key(session_id))
+    summary = codec.loads(raw) if raw else {"through": 0, "text": ""}
+    if until <= summary["through"]:
+        return
+    turns = [codec.loads(t) for t in store.lrange(turns_key(session_id), summary["through"], until - 1)]
+    if not turns:
+        # Session already finished and dropped
+        return
+    text = fold_turns(summary["text"], summary["through"] + 1, turns, session_id)
+    store.set(summary_key(session_id), codec.dumps({"through": summary["through"] + len(turns), "text": text}),
+              ex=SUMMARY_TTL)
+
+
+def _run(session_id):
+    while True:
+        with _pending_lock:
+            answered = _pending.get(session_id)
+            if not answered:
+                _pending.pop(session_id, None)
+                return
+            _pending[session_id] = 0
+        try:
+            _fold(session_id, answered)
+        except Exception as e:
+            logger.warning(f"Summary update for {session_id} failed: {e}")
+
+
+def submit_summary(session_id, answered):
+    """Fold turns older than the verbatim window in the background; answered = turns answered so far."""
+    if answered <= KEEP_TURNS:
+        return
+    with _pending_lock:
+        running = session_id in _pending
+        _pending[session_id] = max(answered, _pending.get(session_id) or 0)
+    # One job per session folds everything new, so turns are folded in order
+    if not running:
+        _pool.submit(_run, session_id)
+
+
+def interview_context(session):
+    """Summary + recent turns (session['summary'], session['recent']) for the question prompt."""
+    if not isinstance(session, dict):
+        return ""
+    summary = session.get('summary') or {}
+    recent = [turn for turn in session.get('recent') or [] if turn.get('answer')]
+    parts = []
+    if summary.get('text'):
+        parts.append(f"Earlier turns (summary): {summary['text']}")
+    if recent:
+        first_number = session.get('question_no', len(recent) + 1) - len(recent)
+        parts.append(_turn_lines(first_number, recent, RECENT_ANSWER_TOKENS))
+    return "\n\n".join(parts)
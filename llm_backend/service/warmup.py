@@ -0,0 +1,97 @@
+"""
+Background warm-up of lazily initialised dependencies.
+
+Importing app.py does no network or heavy work: the session store connects,
+the resume cache opens, the SQL tables are created, tiktoken loads its
+encoding and the LLM clients (or the local model) are built on first use. Once a worker is up (gunicorn's
+post_worker_init hook in gunicorn.conf.py, or app.py's __main__),
+start_warmup() initialises them so the first real request does not pay
+for it:
+
+    WARMUP=background  - on a thread, while the worker already serves (default)
+    WARMUP=eager       - before the worker accepts requests
+    WARMUP=off         - leave everything to first use
+
+readiness() reports per-component state for the health endpoint.
+"""
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PENDING, READY, FAILED, SKIPPED = "pending", "ready", "failed", "skipped"
+
+
+def _session_store():
+    from service.session_store import get_store
+    get_store().ping()
+
+
+def _resume_cache():
+    from service.resume_cache import get_resume_cache
+    get_resume_cache()
+
+
+def _tokenizer():
+    from service.tokens import count_tokens
+    count_tokens("warm up")
+
+
+def _database():
+    from service.report_store import warm
+    warm()
+
+
+def _llm():
+    from service.llm_provider import get_llm_router
+    get_llm_router().warm()
+
+
+STEPS = [
+    ("session_store", _session_store),
+    ("resume_cache", _resume_cache),
+    ("tokenizer", _tokenizer),
+    ("database", _database),
+    ("llm", _llm),
+]
+
+_state = {name: PENDING for name, _ in STEPS}
+_started = False
+_lock = threading.Lock()
+
+
+def _run():
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+            _state[name] = READY
+        except Exception as e:
+            # The component still initialises (or falls back) on first use
+            _state[name] = f"{FAILED}: {e}"
+            logger.warning(f"Warm-up of {name} failed: {e}")
+        logger.info(f"🔥 {name} warmed in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def start_warmup(mode=None):
+    """Warm every component once per process, according to WARMUP."""
+    global _started
+    mode = (mode or os.getenv("WARMUP", "background")).lower()
+    with _lock:
+        if _started:
+            return
+        _started = True
+    if mode == "off":
+        _state.update({name: SKIPPED for name in _state})
+    elif mode == "eager":
+        _run()
+    else:
+        threading.Thread(target=_run, name="warmup", daemon=True).start()
+
+
+def readiness():
+    """{"ready": bool, "components": {name: state}}"""
+    components = dict(_state)
+    return {"ready": PENDING not in components.values(), "components": components}
@@ -0,0 +1,110 @@
+"""Store value codec: round trips, header dispatch and legacy plain-JSON values."""
+import json
+
+import pytest
+
+from service import codec
+from service.codec import CodecError
+
+SESSION = {
+    "user_id": "u1",
+    "question_no": 3,
+    "max_questions": 8,
+    "score": 7.5,
+    "stop": False,
+    "end_time": None,
+    "data": [
+        {"question": "Tell me about yourself.", "answer": "Je suis développeur — 🚀", "evaluation": None},
+        {"question": "Why Redis?", "answer": "x" * 3000, "evaluation": {"score": 8, "feedback": "Good"}},
+    ],
+}
+
+CODECS = [
+    "json",
+    pytest.param("orjson", marks=pytest.mark.skipif(codec.orjson is None, reason="orjson not installed")),
+    pytest.param("msgpack", marks=pytest.mark.skipif(codec.msgpack is None, reason="msgpack not installed")),
+]
+needs_zstd = pytest.mark.skipif(codec.zstandard is None, reason="zstandard not installed")
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_round_trip_uncompressed(name):
+    value = codec.dumps(SESSION, codec=name, compress_min_bytes=0)
+    assert isinstance(value, str)
+    assert value.startswith(f"~1{codec.CODECS[name][0]}-:")
+    assert codec.loads(value) == SESSION
+
+
+@needs_zstd
+@pytest.mark.parametrize("name", CODECS)
+def test_round_trip_compressed(name):
+    value = codec.dumps(SESSION, codec=name, compress_min_bytes=1)
+    assert value.startswith(f"~1{codec.CODECS[name][0]}z:")
+    assert len(value) < len(json.dumps(SESSION))
+    assert codec.loads(value) == SESSION
+
+
+@needs_zstd
+def test_only_large_values_are_compressed():
+    assert codec.dumps({"a": 1}, codec="json", compress_min_bytes=2048)[3] == "-"
+    assert codec.dumps(SESSION, codec="json", compress_min_bytes=2048)[3] == "z"
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_reader_dispatches_on_the_header_not_the_setting(name, monkeypatch):
+    value = codec.dumps(SESSION, codec=name, compress_min_bytes=0)
+    monkeypatch.setenv("SESSION_CODEC", "json")
+    assert codec.loads(value) == SESSION
+
+
+@pytest.mark.parametrize("legacy", [
+    json.dumps(SESSION),
+    json.dumps(SESSION, indent=2, ensure_ascii=False),
+    json.dumps(SESSION).encode("utf-8"),
+    json.dumps("plain string"),
+    json.dumps([1, 2, 3]),
+])
+def test_legacy_plain_json_is_read(legacy):
+    assert codec.loads(legacy) == json.loads(legacy)
+
+
+def test_none_stays_none():
+    assert codec.loads(None) is None
+
+
+@pytest.mark.skipif(codec.orjson is None, reason="orjson not installed")
+def test_orjson_value_is_readable_without_orjson(monkeypatch):
+    value = codec.dumps(SESSION, codec="orjson", compress_min_bytes=0)
+    monkeypatch.setattr(codec, "orjson", None)
+    assert codec.loads(value) == SESSION
+
+
+@pytest.mark.skipif(codec.msgpack is None, reason="msgpack not installed")
+def test_missing_msgpack_is_a_codec_error(monkeypatch):
+    value = codec.dumps(SESSION, codec="msgpack", compress_min_bytes=0)
+    monkeypatch.setattr(codec, "msgpack", None)
+    with pytest.raises(CodecError):
+        codec.loads(value)
+
+
+@needs_zstd
+def test_missing_zstandard_is_a_codec_error(monkeypatch):
+    value = codec.dumps(SESSION, codec="json", compress_min_bytes=1)
+    monkeypatch.setattr(codec, "zstandard", None)
+    with pytest.raises(CodecError):
+        codec.loads(value)
+
+
+@pytest.mark.parametrize("value", ["~2o-:{}", "~1x-:{}", "~1o-;{}"])
+def test_unknown_headers_are_rejected(value):
+    with pytest.raises(CodecError):
+        codec.loads(value)
+
+
+def test_default_codec_setting(monkeypatch):
+    monkeypatch.setenv("SESSION_CODEC", "yaml")
+    with pytest.raises(CodecError):
+        codec.default_codec()
+    monkeypatch.setenv("SESSION_CODEC", "JSON")
+    assert codec.default_codec() == "json"
+    assert codec.dumps({"a": 1}, compress_min_bytes=0) == '~1j-:{"a":1}'
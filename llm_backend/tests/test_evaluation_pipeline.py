@@ -0,0 +1,57 @@
+"""Waiting for answer evaluations through the store, as a report worker process does."""
+import threading
+import time
+
+import pytest
+
+from service import codec, evaluation_pipeline, session_store
+from service.evaluation_pipeline import apply_evaluations, evaluations_key, wait_for_evaluations
+from service.interview_session import turns_key
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = session_store.MemoryStore()
+    monkeypatch.setattr(session_store, "_store", store)
+    monkeypatch.setattr(evaluation_pipeline, "EVALUATION_POLL_SECONDS", 0.01)
+    store.rpush(turns_key("s1"),
+                codec.dumps({"question": "Q1", "answer": "A1"}),
+                codec.dumps({"question": "Q2", "answer": "A2"}),
+                codec.dumps({"question": "Q3", "answer": None}))
+    return store
+
+
+def _finish(store, index, evaluation, after=0.0):
+    def write():
+        time.sleep(after)
+        store.hset(evaluations_key("s1"), str(index), codec.dumps(evaluation))
+    thread = threading.Thread(target=write)
+    thread.start()
+    return thread
+
+
+def test_waits_for_evaluations_written_by_another_process(store):
+    _finish(store, 0, {"score": 7})
+    late = _finish(store, 1, {"score": 8}, after=0.2)
+    started = time.monotonic()
+    assert wait_for_evaluations("s1", timeout=2)
+    assert time.monotonic() - started >= 0.15
+    late.join()
+
+
+def test_gives_up_after_the_timeout(store):
+    _finish(store, 0, {"score": 7}).join()
+    assert not wait_for_evaluations("s1", timeout=0.1)
+
+
+def test_failed_evaluation_does_not_block_the_report(store, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("model down")
+
+    monkeypatch.setattr(evaluation_pipeline, "evaluate_answer", broken)
+    evaluation_pipeline.submit_evaluation("s1", 0, "Q1", "A1").result()
+    evaluation_pipeline.submit_evaluation("s1", 1, "Q2", "A2").result()
+    assert wait_for_evaluations("s1", timeout=0.5)
+
+    session = {"data": [{"evaluation": None}, {"evaluation": None}]}
+    assert apply_evaluations(session, store.hgetall(evaluations_key("s1"))) == session
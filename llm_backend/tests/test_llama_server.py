@@ -0,0 +1,26 @@
+"""Fitting requests into one slot of the batching llama server."""
+import pytest
+
+from llama_server import fit_to_slot
+
+
+@pytest.mark.parametrize("max_tokens", [1, 150, 999, 1000, 1023, 1024, 5000])
+@pytest.mark.parametrize("prompt_length", [1, 10, 900, 1024, 4000])
+def test_prompt_and_completion_fit_the_slot(prompt_length, max_tokens):
+    tokens = list(range(prompt_length))
+    fitted, allowed = fit_to_slot(tokens, max_tokens, budget=1024)
+    assert 1 <= allowed <= 512
+    assert len(fitted) + allowed <= 1024
+    assert fitted[0] == 0
+    assert fitted[-1] == tokens[-1]
+
+
+def test_short_request_is_untouched():
+    tokens = list(range(100))
+    assert fit_to_slot(tokens, 150, budget=1024) == (tokens, 150)
+
+
+def test_long_prompt_keeps_bos_and_its_end():
+    fitted, allowed = fit_to_slot(list(range(2000)), 150, budget=1024)
+    assert allowed == 150
+    assert fitted == [0] + list(range(2000 - 873, 2000))
@@ -0,0 +1,32 @@
+"""Client side of llama_server.py: a silent server must not hang the caller."""
+import socket
+import threading
+
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+import llama_models
+from service.llm_provider import LLMError
+
+
+@pytest.fixture
+def silent_server(tmp_path, monkeypatch):
+    path = str(tmp_path / "llama.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(4)
+    accepted = []
+    threading.Thread(target=lambda: accepted.extend(server.accept() for _ in range(2)), daemon=True).start()
+    monkeypatch.setattr(llama_models, "SERVER_SOCKET", path)
+    yield path
+    for conn, _ in accepted:
+        conn.close()
+    server.close()
+
+
+def test_silent_server_raises_llm_error(silent_server):
+    with pytest.raises(LLMError):
+        llama_models.generate("[INST] ", "hello [/INST]", timeout=0.2)
+    with pytest.raises(LLMError):
+        list(llama_models.generate("[INST] ", "hello [/INST]", stream=True, timeout=0.2))
@@ -0,0 +1,162 @@
+"""LLMRouter failover, circuit breaking and p95 hedging over mock providers."""
+import time
+
+import pytest
+
+from service.llm_provider import CircuitBreaker, LLMError, LLMRouter, MockProvider, MIN_LATENCY_SAMPLES
+
+
+class Scripted(MockProvider):
+    """MockProvider with a name, injected latency and failures; logs every call."""
+
+    def __init__(self, name, calls, delay=0.0, fail=False, failures=2, cooldown=0.2):
+        super().__init__()
+        self.name = name
+        self.calls = calls
+        self.delay = delay
+        self.fail = fail
+        self.breaker = CircuitBreaker(failures=failures, cooldown=cooldown)
+
+    def complete(self, prompt, **kwargs):
+        self.calls.append(self.name)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return self.name
+
+    def stream(self, prompt, **kwargs):
+        self.calls.append(self.name)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        yield from (self.name, "!")
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+def test_primary_answers_without_touching_fallback(calls):
+    primary, fallback = Scripted("primary", calls), Scripted("fallback", calls)
+    assert LLMRouter([primary, fallback], timeout=1).complete("q") == "primary"
+    assert calls == ["primary"]
+
+
+def test_failed_primary_fails_over_in_order(calls):
+    primary, fallback = Scripted("primary", calls, fail=True), Scripted("fallback", calls)
+    assert LLMRouter([primary, fallback], timeout=1).complete("q") == "fallback"
+    assert calls == ["primary", "fallback"]
+
+
+def test_every_provider_failing_raises(calls):
+    router = LLMRouter([Scripted("primary", calls, fail=True), Scripted("fallback", calls, fail=True)], timeout=1)
+    with pytest.raises(LLMError, match="primary: primary down; fallback: fallback down"):
+        router.complete("q")
+    assert calls == ["primary", "fallback"]
+
+
+def test_breaker_opens_half_opens_and_closes(calls):
+    primary, fallback = Scripted("primary", calls, fail=True), Scripted("fallback", calls)
+    router = LLMRouter([primary, fallback], timeout=1)
+
+    for _ in range(2):
+        router.complete("q")
+    assert primary.breaker.state == "open"
+
+    # Open: the primary is skipped
+    calls.clear()
+    assert router.complete("q") == "fallback"
+    assert calls == ["fallback"]
+
+    # Half-open after the cooldown: one trial call; failing it keeps the breaker open
+    time.sleep(0.25)
+    calls.clear()
+    router.complete("q")
+    router.complete("q")
+    assert calls == ["primary", "fallback", "fallback"]
+    assert primary.breaker.state == "open"
+
+    # A successful trial closes it again
+    time.sleep(0.25)
+    primary.fail = False
+    calls.clear()
+    assert router.complete("q") == "primary"
+    assert primary.breaker.state == "closed"
+    assert router.complete("q") == "primary"
+    assert calls == ["primary", "primary"]
+
+
+def test_breaker_counts_consecutive_failures_only(calls):
+    primary = Scripted("primary", calls, fail=True, failures=3)
+    router = LLMRouter([primary, Scripted("fallback", calls)], timeout=1)
+    router.complete("q")
+    router.complete("q")
+    primary.fail = False
+    router.complete("q")
+    primary.fail = True
+    router.complete("q")
+    router.complete("q")
+    assert primary.breaker.state == "closed"
+
+
+def _warm(provider, seconds):
+    for _ in range(MIN_LATENCY_SAMPLES):
+        provider.latency.add(seconds)
+
+
+def test_slow_primary_is_hedged_after_its_p95(calls):
+    primary, fallback = Scripted("primary", calls, delay=0.6), Scripted("fallback", calls)
+    _warm(primary, 0.05)
+    router = LLMRouter([primary, fallback], timeout=2, hedge_min=0.01)
+
+    started = time.monotonic()
+    assert router.complete("q") == "fallback"
+    assert time.monotonic() - started < 0.4
+    assert calls == ["primary", "fallback"]
+
+
+def test_hedge_waits_for_hedge_min(calls):
+    primary, fallback = Scripted("primary", calls, delay=0.15), Scripted("fallback", calls)
+    _warm(primary, 0.01)
+    router = LLMRouter([primary, fallback], timeout=2, hedge_min=0.5)
+    assert router.complete("q") == "primary"
+    assert calls == ["primary"]
+
+
+def test_no_hedging_before_enough_samples(calls):
+    primary, fallback = Scripted("primary", calls, delay=0.3), Scripted("fallback", calls)
+    for _ in range(MIN_LATENCY_SAMPLES - 1):
+        primary.latency.add(0.01)
+    router = LLMRouter([primary, fallback], timeout=2, hedge_min=0.01)
+    assert router.complete("q") == "primary"
+    assert calls == ["primary"]
+
+
+def test_timeout_counts_against_the_breaker(calls):
+    primary = Scripted("primary", calls, delay=0.3, failures=1)
+    router = LLMRouter([primary], timeout=0.1)
+    with pytest.raises(LLMError, match="timed out"):
+        router.complete("q")
+    assert primary.breaker.state == "open"
+
+
+def test_stream_fails_over_before_the_first_chunk(calls):
+    primary, fallback = Scripted("primary", calls, fail=True), Scripted("fallback", calls)
+    assert list(LLMRouter([primary, fallback], timeout=1).stream("q")) == ["fallback", "!"]
+    assert calls == ["primary", "fallback"]
+
+
+def test_stream_does_not_switch_after_text_was_sent(calls):
+    class Broken(Scripted):
+        def stream(self, prompt, **kwargs):
+            self.calls.append(self.name)
+            yield "half"
+            raise RuntimeError("connection reset")
+
+    router = LLMRouter([Broken("primary", calls), Scripted("fallback", calls)], timeout=1)
+    chunks = []
+    with pytest.raises(RuntimeError):
+        for chunk in router.stream("q"):
+            chunks.append(chunk)
+    assert chunks == ["half"]
+    assert calls == ["primary"]
@@ -0,0 +1,31 @@
+"""Prometheus exposition and request timing."""
+import time
+
+import app as app_module
+from service.metrics import counter, histogram, render_prometheus, STAGE_BUCKETS
+
+
+def test_counters_are_exported_with_total_suffix():
+    counter("test_events", kind="a").inc(2)
+    lines = render_prometheus().splitlines()
+    assert "# TYPE test_events_total counter" in lines
+    assert 'test_events_total{kind="a"} 2' in lines
+    assert not any(line.startswith("test_events{") for line in lines)
+
+
+def test_streamed_request_is_timed_to_the_end_of_the_body(monkeypatch):
+    def slow_stream(session_id, answer, resume_data, question_bank=None):
+        yield "token", "Why"
+        time.sleep(0.3)
+        yield "done", {"next_question": "Why?", "stop": False}
+
+    monkeypatch.setattr(app_module, "stream_interview_session", slow_stream)
+    timed = histogram("request_seconds", STAGE_BUCKETS, endpoint="submit_answer_stream")
+    before = timed.snapshot()["sum"]
+
+    response = app_module.app.test_client().post("/api/flask/submit_answer_stream/u1",
+                                                 json={"session_id": "s1", "answer": "Because"})
+    assert "event: done" in response.get_data(as_text=True)
+    response.close()
+
+    assert timed.snapshot()["sum"] - before >= 0.3
@@ -0,0 +1,47 @@
+"""Claiming final report jobs in the shared store."""
+import threading
+
+import pytest
+
+from service import report_jobs
+from service.session_store import MemoryStore
+
+
+@pytest.fixture
+def claims(monkeypatch):
+    store = MemoryStore()
+    submitted = []
+
+    class Queue:
+        def submit(self, user_id, session_id):
+            submitted.append(user_id)
+
+    monkeypatch.setattr(report_jobs, "get_store", lambda: store)
+    monkeypatch.setattr(report_jobs, "_queue", Queue())
+    return store, submitted
+
+
+def test_pending_report_is_claimed_once(claims):
+    store, submitted = claims
+    assert report_jobs.submit_report("u1", "s1")
+    assert not report_jobs.submit_report("u1", "s1")
+    assert submitted == ["u1"]
+
+
+def test_concurrent_retries_after_failure_claim_once(claims):
+    store, submitted = claims
+    store.set(report_jobs.status_key("u1"), report_jobs.STATUS_FAILED, ex=60)
+    barrier = threading.Barrier(16)
+
+    def retry():
+        barrier.wait()
+        report_jobs.submit_report("u1", "s1")
+
+    threads = [threading.Thread(target=retry) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert submitted == ["u1"]
+    assert store.get(report_jobs.status_key("u1")) == report_jobs.STATUS_PENDING
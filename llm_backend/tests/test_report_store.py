@@ -0,0 +1,109 @@
+"""SQL write-behind of finished interviews, against a temporary SQLite file."""
+import os
+import queue
+
+import pytest
+from flask import Flask
+
+from service import report_store
+from service.metrics import counter
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'reports.db'}")
+    app = Flask(__name__, instance_path=str(tmp_path / "instance"))
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ["DATABASE_URL"]
+    monkeypatch.setattr(report_store, "_engine", None)
+    monkeypatch.setattr(report_store, "FLUSH_SECONDS", 0.05)
+    monkeypatch.setattr(report_store, "_tables_ready", False)
+    report_store.init_report_store(app)
+    yield report_store
+    report_store.flush(5)
+    report_store.get_engine().dispose()
+
+
+def _user(name, email):
+    return {"name": name, "email": email, "resume_text": "resume", "resume_path": "uploads/r.pdf"}
+
+
+def test_report_round_trip(store):
+    session = {"data": [{"question": "Q1", "answer": "A1"}]}
+    store.save_report("uid-1", _user("Ada", "ada@example.com"), {"decision": "Hire"}, session)
+    assert store.flush(5)
+
+    loaded = store.load_report("uid-1")
+    assert loaded == {"name": "Ada", "email": "ada@example.com", "report": {"decision": "Hire"}}
+    assert store.load_report("unknown") is None
+
+
+def test_same_email_updates_candidate(store):
+    store.save_report("uid-1", _user("Ada", "ada@example.com"), {"n": 1}, {})
+    assert store.flush(5)
+    store.save_report("uid-2", _user("Ada Lovelace", "ada@example.com"), {"n": 2}, {})
+    assert store.flush(5)
+
+    with store.get_engine().connect() as conn:
+        rows = conn.exec_driver_sql("SELECT name FROM users WHERE email = 'ada@example.com'").all()
+    assert rows == [("Ada Lovelace",)]
+    # Both interviews keep their own report
+    assert store.load_report("uid-1")["report"] == {"n": 1}
+    assert store.load_report("uid-2") == {"name": "Ada Lovelace", "email": "ada@example.com",
+                                          "report": {"n": 2}}
+
+
+def test_full_queue_is_dropped_and_counted(store, monkeypatch):
+    monkeypatch.setattr(store, "_queue", queue.Queue(maxsize=1))
+    monkeypatch.setattr(store, "_start_worker", lambda: None)
+    dropped = counter("report_writes", result="dropped")
+    before = dropped.value
+
+    store.save_report("uid-1", _user("Ada", "ada@example.com"), {}, {})
+    store.save_report("uid-2", _user("Bob", "bob@example.com"), {}, {})
+
+    assert dropped.value == before + 1
+    assert store._queue.qsize() == 1
+
+
+def test_old_table_gets_new_columns(store):
+    with store.get_engine().begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+                             "email VARCHAR(120) NOT NULL UNIQUE, resume_text TEXT NOT NULL, "
+                             "resume_path VARCHAR(255) NOT NULL, created_at DATETIME)")
+        conn.exec_driver_sql("CREATE TABLE final_reports (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, "
+                             "report_text TEXT NOT NULL, created_at DATETIME)")
+
+    store.save_report("uid-1", _user("Ada", "ada@example.com"), {"decision": "Hire"}, {"data": []})
+    assert store.flush(5)
+    assert store.load_report("uid-1")["report"] == {"decision": "Hire"}
+
+
+def test_concurrent_candidate_insert_only_retries_the_batch(store):
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    store.ensure_tables()
+    written, failed = counter("report_writes", result="ok"), counter("report_writes", result="failed")
+    before = written.value, failed.value
+    raced = []
+
+    def other_writer(session, *args):
+        # Another process commits the same email between our SELECT and INSERT
+        if not raced:
+            raced.append(True)
+            with store.get_engine().begin() as conn:
+                conn.exec_driver_sql("INSERT INTO users (name, email, resume_text, resume_path) "
+                                     "VALUES ('Ada (other worker)', 'ada@example.com', '', '')")
+
+    event.listen(Session, "before_flush", other_writer)
+    try:
+        store.save_report("uid-1", _user("Ada", "ada@example.com"), {"n": 1}, {})
+        store.save_report("uid-2", _user("Bob", "bob@example.com"), {"n": 2}, {})
+        assert store.flush(5)
+    finally:
+        event.remove(Session, "before_flush", other_writer)
+
+    assert raced
+    assert store.load_report("uid-1") == {"name": "Ada", "email": "ada@example.com", "report": {"n": 1}}
+    assert store.load_report("uid-2")["report"] == {"n": 2}
+    assert (written.value, failed.value) == (before[0] + 2, before[1])
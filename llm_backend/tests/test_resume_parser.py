@@ -0,0 +1,33 @@
+"""
+parse_resume12 against benchmarks/golden/resume_corpus.json.
+
+The expected structures were generated by the parser as it stood after the
+extract_sections group fix (see the resume cache change), not by the original
+code: that one raised IndexError on every resume with a section header, so
+only the two error cases ("too_short", "empty") match it. Regenerate after an
+intended change with python -m benchmarks.bench_resume_parser --update-golden.
+"""
+import json
+import os
+
+import pytest
+
+from service.resume_parser import extract_sections, parse_resume12
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "benchmarks", "golden", "resume_corpus.json")
+
+with open(GOLDEN_PATH, encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=[case["name"] for case in CORPUS])
+def test_golden_corpus(case):
+    assert parse_resume12(case["text"]) == case["expected"]
+
+
+def test_section_headers_do_not_crash():
+    sections = extract_sections("Objective: build things\nSkills: Python, SQL\n")
+    # The original non-capturing header group raised IndexError here
+    assert set(sections) == {"objective", "skills"}
+    assert "Python, SQL" in sections["skills"]
@@ -0,0 +1,127 @@
+"""MemoryStore commands, TTL eviction and pipeline semantics."""
+import pytest
+
+from service import session_store
+from service.session_store import MemoryStore, SessionStoreError, reset_round_trips, round_trips
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(clock):
+    return MemoryStore(sweep_every=16)
+
+
+def test_key_expires_after_its_ttl(store, clock):
+    store.set("k", "v", ex=10)
+    clock.now += 9.9
+    assert store.get("k") == "v"
+    clock.now += 0.2
+    assert store.get("k") is None
+    assert "k" not in store.data
+
+
+def test_expire_refreshes_and_set_without_ex_persists(store, clock):
+    store.set("k", "v", ex=10)
+    clock.now += 8
+    assert store.expire("k", 10)
+    clock.now += 8
+    assert store.get("k") == "v"
+    store.set("k", "v2")
+    clock.now += 100
+    assert store.get("k") == "v2"
+    assert not store.expire("missing", 10)
+
+
+def test_sweep_evicts_keys_nobody_reads(store, clock):
+    for i in range(8):
+        store.set(f"old{i}", "v", ex=5)
+    clock.now += 6
+    for i in range(16):
+        store.set(f"new{i}", "v")
+    assert not any(key.startswith("old") for key in store.data)
+
+
+def test_refreshed_keys_do_not_grow_the_heap(store, clock):
+    store.set("session", "v", ex=60)
+    store.hset("session:turns", "a", "1")
+    for _ in range(1000):
+        store.expire("session", 60)
+        store.expire("session:turns", 60)
+        clock.now += 1
+    assert store.get("session") == "v"
+    assert len(store._heap) <= 2 * len(store._expires) + 16
+
+
+def test_deleted_keys_leave_no_heap_entries_behind(store):
+    for i in range(100):
+        store.set(f"k{i}", "v", ex=60)
+        store.delete(f"k{i}")
+    assert store.data == {}
+    assert len(store._heap) <= 16
+
+
+def test_set_nx_and_getset(store, clock):
+    assert store.set("lock", "a", ex=5, nx=True)
+    assert not store.set("lock", "b", ex=5, nx=True)
+    assert store.getset("lock", "c", ex=5) == "a"
+    assert store.get("lock") == "c"
+    clock.now += 100
+    assert store.set("lock", "d", ex=5, nx=True)
+    assert store.getset("fresh", "x") is None
+
+
+def test_lists_and_hashes(store):
+    store.rpush("l", "a", "b", "c")
+    assert store.lrange("l", 0, -1) == ["a", "b", "c"]
+    assert store.lrange("l", -2, -1) == ["b", "c"]
+    assert store.lset("l", 1, "B")
+    assert store.lrange("l", 0, 1) == ["a", "B"]
+    with pytest.raises(SessionStoreError):
+        store.lset("l", 5, "x")
+    with pytest.raises(SessionStoreError):
+        store.lset("missing", 0, "x")
+    assert store.hincrby("h", "n", 2) == 2
+    assert store.hincrby("h", "n") == 3
+    assert store.hgetall("h") == {"n": "3"}
+    assert store.hgetall("missing") == {}
+
+
+def test_pipeline_runs_nothing_until_execute(store):
+    reset_round_trips()
+    pipe = store.pipeline()
+    pipe.set("k", "v", ex=60)
+    pipe.rpush("l", "a", "b")
+    pipe.hincrby("h", "n", 5)
+    pipe.get("k")
+    pipe.lrange("l", 0, -1)
+    pipe.hgetall("h")
+    assert store.get("k") is None
+    assert round_trips() == 1
+
+    assert pipe.execute() == [True, 2, 5, "v", ["a", "b"], {"n": "5"}]
+    assert round_trips() == 2
+
+
+def test_pipeline_is_empty_after_execute(store):
+    reset_round_trips()
+    pipe = store.pipeline()
+    assert pipe.execute() == []
+    assert round_trips() == 0
+    pipe.set("k", "v")
+    pipe.execute()
+    assert pipe.execute() == []
+    assert round_trips() == 1
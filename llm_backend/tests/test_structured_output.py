@@ -0,0 +1,133 @@
+"""Tolerant JSON parsing and incremental question extraction."""
+import json
+
+import pytest
+
+from service import llm_model
+from service.metrics import counter
+from service.structured_output import QuestionStream, parse_json
+
+
+def _count(result, kind="question"):
+    return counter("llm_json_parse", kind=kind, result=result).value
+
+
+def test_valid_reply_is_ok():
+    before = _count("ok")
+    assert parse_json('{"question": "Why?", "terminate": false}', "question") == \
+        {"question": "Why?", "terminate": False}
+    assert _count("ok") == before + 1
+
+
+@pytest.mark.parametrize("text, expected", [
+    # cut off at max_tokens: open string, open object, open array
+    ('{"question": "How did you sca', {"question": "How did you sca"}),
+    ('{"evaluation": {"score": 8, "feedback": "Good', {"evaluation": {"score": 8, "feedback": "Good"}}),
+    # a cut-off array item can't be told from a dangling key: it is dropped
+    ('{"strengths": ["APIs", "SQ', {"strengths": ["APIs"]}),
+    # half-written member and dangling key dropped
+    ('{"question": "Why?", "terminate": fa', {"question": "Why?"}),
+    ('{"question": "Why?", "termin', {"question": "Why?"}),
+    # trailing commas
+    ('{"question": "Why?", "terminate": false,}', {"question": "Why?", "terminate": False}),
+    ('{"strengths": ["a", "b",], }', {"strengths": ["a", "b"]}),
+])
+def test_truncated_and_trailing_comma_replies_are_repaired(text, expected):
+    before = _count("repaired", "report")
+    assert parse_json(text, "report") == expected
+    assert _count("repaired", "report") == before + 1
+
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"question": "Why?", "terminate": false}\n```',
+    'Sure! Here is the question:\n```\n{"question": "Why?", "terminate": false}\n```\nGood luck.',
+    'Here you go: {"question": "Why?", "terminate": false} Hope that helps.',
+])
+def test_fenced_and_wrapped_replies(text):
+    assert parse_json(text, "question") == {"question": "Why?", "terminate": False}
+
+
+@pytest.mark.parametrize("text", ["", "What is your biggest weakness?", "[1, 2, 3]", '"just a string"'])
+def test_non_object_replies_fail_and_are_counted(text):
+    before = _count("failed", "question")
+    with pytest.raises(ValueError):
+        parse_json(text, "question")
+    assert _count("failed", "question") == before + 1
+
+
+def _stream(chunks):
+    parser = QuestionStream()
+    pieces = [parser.feed(chunk) for chunk in chunks]
+    return parser, "".join(pieces)
+
+
+def test_question_streams_across_chunks():
+    parser, streamed = _stream(['{"ques', 'tion": "How do', ' you test', '?", "terminate": false}'])
+    assert streamed == "How do you test?"
+    assert parser.done
+    assert parser.finish() == {"question": "How do you test?", "terminate": False}
+
+
+def test_escapes_split_across_chunks():
+    reply = json.dumps({"question": 'Say "hi"\nthen café — ok?'}, ensure_ascii=True)
+    # One character per chunk splits every escape sequence
+    parser, streamed = _stream(list(reply))
+    assert streamed == 'Say "hi"\nthen café — ok?'
+    assert parser.finish()["question"] == streamed
+
+
+def test_surrogate_pair_split_across_chunks():
+    reply = json.dumps({"question": "Ship it \U0001F680?"}, ensure_ascii=True)
+    assert "\\ud83d\\ude80" in reply
+    split = reply.index("\\ude80") - 3
+    for chunks in (list(reply), [reply[:split], reply[split:]]):
+        parser, streamed = _stream(chunks)
+        assert streamed == "Ship it \U0001F680?"
+
+
+def test_lone_surrogate_becomes_replacement_character():
+    parser, streamed = _stream(['{"question": "bad \\ud83d end"}'])
+    assert streamed == "bad � end"
+
+
+def test_truncated_stream_keeps_streamed_question():
+    parser, streamed = _stream(['{"question": "How would you sh'])
+    assert parser.finish() == {"question": "How would you sh"}
+
+
+def test_plain_text_stream_is_not_a_question():
+    parser, streamed = _stream(["Great answer! ", "Next: what is Docker?"])
+    assert streamed == ""
+    with pytest.raises(ValueError):
+        parser.finish()
+
+
+@pytest.mark.parametrize("reply", [
+    "What is Docker?",                         # prose, no JSON
+    '{"question": null, "terminate": false}',  # schema-valid, no question
+    '{"answer": "Docker"}',                    # wrong shape
+    '{"question": "   "}',
+])
+def test_unusable_question_reply_falls_back(monkeypatch, reply):
+    monkeypatch.setattr(llm_model, "complete", lambda *args, **kwargs: reply)
+    history = {"question_no": 2}
+    assert llm_model.dynamic_questions_gen_model("resume", history, "answer") == \
+        llm_model.fallback_question(history)
+
+
+def test_unusable_streamed_reply_falls_back(monkeypatch):
+    monkeypatch.setattr(llm_model, "stream", lambda *args, **kwargs: iter(["What ", "is Docker?"]))
+    history = {"question_no": 2}
+    questions = llm_model.dynamic_questions_stream("resume", history, "answer")
+    pieces = []
+    with pytest.raises(StopIteration) as done:
+        while True:
+            pieces.append(next(questions))
+    # Prose is never streamed to the candidate as the question
+    assert pieces == [llm_model.fallback_question(history)]
+    assert done.value.value == llm_model.fallback_question(history)
+
+
+def test_terminate_ends_the_interview(monkeypatch):
+    monkeypatch.setattr(llm_model, "complete", lambda *args, **kwargs: '{"question": null, "terminate": true}')
+    assert llm_model.dynamic_questions_gen_model("resume", {"question_no": 2}, "answer") is None
@@ -0,0 +1,53 @@
+"""Rolling summary over an interview longer than the verbatim window."""
+import time
+
+import pytest
+
+from service import codec, interview_session, llm_model, session_store, transcript_summary
+from service.transcript_summary import KEEP_TURNS, summary_key
+
+
+@pytest.fixture
+def interview(monkeypatch):
+    prompts = []
+
+    def complete(prompt, prefix="", **kwargs):
+        prompts.append(prefix + prompt)
+        return '{"question": "Question %d?", "terminate": false}' % len(prompts)
+
+    monkeypatch.setattr(session_store, "_store", session_store.MemoryStore())
+    monkeypatch.setattr(interview_session, "MAX_QUESTIONS", KEEP_TURNS + 6)
+    monkeypatch.setattr(llm_model, "complete", complete)
+    # Extractive summaries: no LLM call from the background thread
+    monkeypatch.setattr(transcript_summary, "llm_available", lambda: False)
+    session_id, _ = interview_session.start_interview_session("u1")
+    return session_id, prompts
+
+
+def _wait_for_summary(session_id, through, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        raw = session_store.get_store().get(summary_key(session_id))
+        if raw and codec.loads(raw)["through"] >= through:
+            return codec.loads(raw)
+        time.sleep(0.01)
+    raise AssertionError(f"summary never reached turn {through}")
+
+
+def test_long_interview_folds_old_turns_into_the_prompt(interview):
+    session_id, prompts = interview
+    answers = KEEP_TURNS + 4
+    for number in range(1, answers + 1):
+        result = interview_session.handle_interview_session(session_id, f"Answer number {number}", "resume")
+        assert not result["stop"]
+
+    summary = _wait_for_summary(session_id, answers - KEEP_TURNS)
+    assert summary["through"] == answers - KEEP_TURNS
+    assert "Answer number 1" in summary["text"]
+
+    interview_session.handle_interview_session(session_id, "Answer number last", "resume")
+    prompt = prompts[-1]
+    assert f"Earlier turns (summary): {summary['text']}" in prompt
+    # Recent turns stay verbatim; folded ones only appear through the summary
+    assert f"A{answers}: Answer number {answers}" in prompt
+    assert "A1: Answer number 1" not in prompt.replace(summary["text"], "")